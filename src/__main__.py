@@ -2,13 +2,17 @@
 
 # Standard library imports
 import getopt
+import os
 import sys
 import time
 
 # Language imports
-from etc import (colourise)
-from interpreter import checks
-from maple import (arborist, data, planter, xylem)
+from etc import (colourise, global_values)
+from interpreter import (
+    batch, checkpoint, checks, cluster, daemon, engine, forkserver, pool,
+    sandbox, stream
+)
+from maple import (arborist, data, sap, seedbank, xylem)
 from maple.error import (messenger)
 
 '''Copyright 2024-2025 Bryan Smith.
@@ -54,18 +58,36 @@ checks.check_python_version()
 # Get the system arguments
 sys_args = sys.argv[1:]
 # Set the options here:
+#   -a [address] (cluster worker)
+#   -b [records] (run the script for each record in a file)
+#   -c [address] (cluster coordinator)
 #   -d (dev mode)
 #   -e [error_code] (error code elaboration for [error_code])
+#   -f (fork server)
+#   -g (profile guided optimisation)
 #   -h (help)
+#   -i (sub-interpreters)
+#   -j [workers] (run many scripts on a pool of workers)
+#   -k (keep checkpoints)
+#   -l (list eliminated stores)
+#   -n (no output cache)
 #   -p (performance check)
+#   -q (quick start from a snapshot)
 #   -r (reliner)
+#   -s (render cache statistics)
+#   -t (text filter over the input)
+#   -u (drop unreachable lines)
 #   -v (version)
-short_opts = 'de:hprv'
+#   -w (warm daemon)
+#   -x (sandbox)
+#   --resume (resume from the last checkpoint)
+short_opts = 'a:b:c:de:fghij:klnpqrstuvwx'
+long_opts = ['resume']
 
 # Try to get the options and arguments
 try:
     # Get the options and arguments
-    opts, args = getopt.getopt(sys_args, short_opts)
+    opts, args = getopt.getopt(sys_args, short_opts, long_opts)
 # If the flag is invalid, error out
 except getopt.GetoptError:
     messenger.simple_error(
@@ -94,6 +116,94 @@ dev_mode = modes['dev_mode']
 # Whether we are running a performance check
 performance_check = modes['performance_check']
 
+# Whether unreachable lines are dropped from memory as well as execution
+drop_unreachable = modes['drop_unreachable']
+
+# Whether the eliminated set statements are listed before execution
+list_eliminated = modes['list_eliminated']
+
+# Whether lines are counted and the counts from the last run are used to
+# optimise the script
+profile_guided = modes['profile_guided']
+
+# Whether the output of deterministic scripts is cached and replayed
+output_cache = modes['output_cache']
+
+# Whether the render cache statistics are output once the script finishes
+render_cache_stats = modes['render_cache_stats']
+
+# Whether the script is run as a filter over the lines of the input
+filter_mode = modes['filter']
+
+# Whether checkpoints are kept and whether the script carries on from the
+# last one
+checkpointing = modes['checkpoint']
+resume = modes['resume']
+
+# Whether the script starts from a snapshot of its first statements. Anything
+# that changes how the script is loaded or has to see it loaded does without.
+warm_start = modes['snapshot'] and not (
+    dev_mode or list_eliminated or profile_guided or filter_mode or resume
+)
+
+# If asked to start the daemon or the fork server, serve scripts until it is
+# stopped
+if modes['daemon']:
+    sys.exit(daemon.serve(
+        global_values.DAEMON_SOCKET, modes['workers'] or os.cpu_count()
+    ))
+if modes['fork_server']:
+    sys.exit(forkserver.serve(
+        global_values.DAEMON_SOCKET, modes['workers'] or os.cpu_count()
+    ))
+
+# If asked, run the script in the sandbox, passing on its input and output
+if modes['sandbox']:
+    sys.exit(sandbox.run_script(
+        script_name, inputs=sys.stdin, output=sys.stdout
+    ))
+
+# If passed a file of records, run the script once for each record
+if modes['records'] is not None:
+    if not args:
+        messenger.simple_error(
+            'No script passed to the interpreter.', error_code=9
+        )
+    sys.exit(batch.run_batch(
+        script_name, modes['records'], modes['workers'] or 1
+    ))
+
+# If asked to coordinate a cluster, hand the scripts (read from the input if
+# passed -) out to the workers that connect. If asked to be a worker, run the
+# scripts the coordinator sends.
+if modes['coordinator'] is not None:
+    if args == ['-']:
+        args = [line.strip() for line in sys.stdin if line.strip()]
+    sys.exit(cluster.coordinate(args, modes['coordinator']))
+if modes['cluster_worker'] is not None:
+    sys.exit(cluster.run_workers(
+        modes['cluster_worker'], modes['workers'] or os.cpu_count()
+    ))
+
+# If asked for workers or passed more than one script, run the scripts on a
+# pool of workers rather than running a script here
+if modes['workers'] is not None or modes['subinterpreters'] or \
+        len(args) > 1:
+    if not args:
+        messenger.simple_error(
+            'No script passed to the interpreter.', error_code=9
+        )
+    sys.exit(pool.run_scripts(
+        args,
+        modes['workers'] or os.cpu_count(),
+        use_subinterpreters=modes['subinterpreters']
+    ))
+
+# If the script is piped in (ie. passed as -) or is a named pipe, execute it
+# as it is read rather than waiting for all of it
+if stream.is_streamed(script_name):
+    sys.exit(stream.run_stream(script_name))
+
 
 def main():
     """Start the ball rolling by opening the script, doing some quick checks
@@ -114,6 +224,10 @@ def main():
         with open(script_name, 'r') as script:
             # Read the script
             contents = script.read()
+
+        # If performance check is enabled, calculate the timing of the
+        # tokenisation and tree planting instead of executing the script.
+        if performance_check:
             # Split the script into lines which will themselves serves as
             # branches in Maple.
             lines_of_script = contents.split('\n')
@@ -130,67 +244,155 @@ def main():
             # might be triggered by a comment are removed
             lines_for_parsing = arborist.prune_comments(lines_of_script)
 
-            # Now, we turn over to the planter to start building, bit by bit,
-            # the tokens first and then the TOKEN_TREE which serves as the
-            # basis for executing commands. If performance check is enabled,
-            # calculate the timing of the tokenisation instead.
-            if performance_check:
-                start_time = time.time()
-                # Run a tokenisation performance check
-                tokenisation_data = data.perf_tokenisation(lines_for_parsing)
-                # Print a new line
-                print('\r')
-                # Run a tree planting performance check
-                tree_data = data.perf_tree_planting()
-                # Print a new line
-                print('\n')
-                # Print out the data
-                data.print_dev_data(
-                    script_name,
-                    tokenisation_data['average'],
-                    tokenisation_data['median'],
-                    tokenisation_data['stdev'],
-                    tree_data['average'],
-                    tree_data['median'],
-                    tree_data['stdev']
+            start_time = time.time()
+            # Run a tokenisation performance check
+            tokenisation_data = data.perf_tokenisation(lines_for_parsing)
+            # Print a new line
+            print('\r')
+            # Run a tree planting performance check
+            tree_data = data.perf_tree_planting()
+            # Print a new line
+            print('\n')
+            # Print out the data
+            data.print_dev_data(
+                script_name,
+                tokenisation_data['average'],
+                tokenisation_data['median'],
+                tokenisation_data['stdev'],
+                tree_data['average'],
+                tree_data['median'],
+                tree_data['stdev']
+            )
+            end_time = time.time()
+            perf_total_time = end_time - start_time
+            print(
+                colourise.cyan(
+                    f':: Total Run Time: {perf_total_time} seconds'
                 )
-                end_time = time.time()
-                perf_total_time = end_time - start_time
-                print(
-                    colourise.cyan(
-                        f':: Total Run Time: {perf_total_time} seconds'
-                    )
+            )
+            # Exit as we aren't executing the script
+            sys.exit(0)
+
+        # If asked, look for a snapshot of the script from an earlier run,
+        # which holds the program it was loaded into
+        snapshot = None
+        if warm_start:
+            cache_key = seedbank.get_cache_key(contents)
+            snapshot = seedbank.load_snapshot(
+                cache_key, script_name, drop_unreachable
+            )
+
+        # Otherwise, load the script into a program: the engine checks the
+        # script, plants the TOKEN_TREE which serves as the basis for
+        # executing commands and works out anything it can ahead of time. If
+        # asked, the profile from the last run is used to optimise the lines
+        # that are executed the most. Loops that can't be left are checked
+        # for below, once dev mode has had a chance to show the script.
+        profile = None
+        if profile_guided:
+            profile = data.load_profile(script_name, contents)
+        if snapshot is not None:
+            program = snapshot['program']
+        else:
+            # Keep the warnings with the program so that a snapshot can write
+            # them out again
+            loader = sap.Run(None)
+            token = sap.CURRENT_RUN.set(loader)
+            try:
+                program = engine.load_program(
+                    contents,
+                    script_name,
+                    drop_unreachable=drop_unreachable,
+                    profile=profile,
+                    check_cycles=False
                 )
-                # Exit as we aren't executing the script
-                sys.exit(0)
-            # Otherwise, tokenise and build the TOKEN_TREE without calculating
-            # how long it takes.
+            finally:
+                sap.CURRENT_RUN.reset(token)
+
+        # If asked, list the set statements that were removed
+        if list_eliminated:
+            data.print_eliminated_stores()
+
+        # If developer mode is enabled...
+        if dev_mode:
+            data.get_token_data(script_name)
+            data.get_flow_data(script_name)
+            # Exit as we aren't executing the script
+            sys.exit(0)
+
+        # Make sure that the script can't get stuck in a loop that it can
+        # never leave before anything is executed (a snapshot was only taken
+        # of a script that passed)
+        if snapshot is None:
+            checks.run_cycle_checks()
+
+        # Each run of the program keeps its own variables. If asked, lines
+        # are counted this time around for the next profile. A filter reads
+        # and writes in large blocks (replacing any bytes that aren't valid
+        # text) and its output is flushed once it finishes.
+        if filter_mode:
+            run = sap.Run(
+                program,
+                output=open(
+                    sys.stdout.fileno(), 'w',
+                    buffering=1 if sys.stdout.isatty() else
+                    global_values.FILTER_BUFFER_SIZE,
+                    errors='replace',
+                    closefd=False
+                ),
+                input_stream=open(
+                    sys.stdin.fileno(), 'r',
+                    buffering=global_values.FILTER_BUFFER_SIZE,
+                    errors='replace',
+                    closefd=False
+                ),
+                profiling=profile_guided,
+                filtering=True
+            )
+        else:
+            run = sap.Run(program, profiling=profile_guided)
+        if checkpointing:
+            run.checkpointer = checkpoint.Checkpointer(script_name, contents)
+
+        try:
+            # If the script always writes the same output, replay the output
+            # from the last time it was executed or, if there isn't one,
+            # record the output this time around. A filter's output depends
+            # on its input so it is never cached. A run that is resumed
+            # carries on from its checkpoint and one with a snapshot carries
+            # on from the snapshot.
+            if resume:
+                checkpoint.resume(run, script_name, contents)
+            elif snapshot is not None:
+                seedbank.start_from_snapshot(run, snapshot)
+            elif output_cache and not filter_mode and not checkpointing and \
+                    seedbank.is_deterministic_script(program.token_tree):
+                cache_key = seedbank.get_cache_key(contents)
+                seedbank.replay_output(cache_key)
+                seedbank.record_output(cache_key, lambda: xylem.execute(run))
+            # If asked, keep a snapshot once the script gets past the
+            # statements that are the same every time
+            elif warm_start:
+                seedbank.take_snapshot(run, cache_key, drop_unreachable)
+            # Start executing statements from the start of the program
             else:
-                # Build the tokens
-                token_planter = planter.build_tokens(lines_for_parsing)
-                # If index 0 is True, it means that the tokeniser has errored
-                # out so report the error.
-                if token_planter[0] is True:
-                    # Index 3 is the line number, index 1 is the error message
-                    messenger.line_error(
-                        token_planter[1],
-                        line_no=token_planter[3],
-                        error_code=8
-                    )
-                # Plant the tree
-                planter.build_tree()
-
-            # If developer mode is enabled...
-            if dev_mode:
-                data.get_token_data(script_name)
-                # Exit as we aren't executing the script
-                sys.exit(0)
-
-            # Start executing statements by checking where we need to start
-            # Since we are starting here at the start, we don't pass a value to
-            # set_execution_location() since we aren't starting at a specific
-            # spot.
-            xylem.set_execution_location()
+                xylem.execute(run)
+        # Once the script finishes (or is interrupted), save the profile and
+        # output the render cache statistics if asked
+        finally:
+            if filter_mode:
+                run.output.flush()
+            if profile_guided:
+                data.save_profile(script_name, contents, run)
+            if render_cache_stats:
+                data.print_render_cache_stats(run)
+
+        # The checkpoint is no longer needed once the script has finished
+        if checkpointing:
+            run.checkpointer.finish(run)
+
+        # Exit in the same way as the script did
+        sys.exit(run.exit_status)
 
     except FileNotFoundError:
         # This will catch any call where there is no script passed and/or one
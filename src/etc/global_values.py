@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 # Standard library imports
+import os
 import platform
 
 '''Copyright 2024-2025 Bryan Smith.
@@ -53,3 +54,80 @@ PYTHON_VERSION = platform.python_version_tuple()
 PYTHON_VERSION_MINIMUM = '3.12'
 # Minimum Python version (minor)
 PYTHON_VERSION_MINIMUM_MINOR = 12
+
+# The folder that the output of deterministic scripts is cached in, which can
+# be changed with the HELASUNO_CACHE_DIR environment variable
+OUTPUT_CACHE_DIR = os.environ.get(
+    f'{LANG_NAME.upper()}_CACHE_DIR',
+    os.path.join(
+        os.environ.get(
+            'XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')
+        ),
+        LANG_NAME_LOWER
+    )
+)
+# The maximum number of cached outputs to keep
+OUTPUT_CACHE_MAX_ENTRIES = 256
+# The largest output (in bytes) that is cached
+OUTPUT_CACHE_MAX_BYTES = 1048576
+
+# The extension of the profile that is kept next to a script when it is run
+# with profile guided optimisation (eg. script.hs.hsprof)
+PROFILE_EXTENSION = f'.{LANG_NAME_ACRONYM}prof'
+# The number of times a line has to be executed to be treated as hot
+PROFILE_HOT_LINE_COUNT = 10
+
+# The number of lines a script run on an asyncio event loop executes before
+# giving the other scripts on the loop a turn
+ASYNC_YIELD_LINES = 1000
+
+# The number of statements a script run by the scheduler executes in each of
+# its turns
+SCHEDULER_QUANTUM = 100
+# The number of seconds between checks on a get statement that is waiting for
+# its input while the scheduler gives the other scripts their turns
+SCHEDULER_INPUT_POLL = 0.01
+
+# The socket the daemon listens on (see the -w flag), which can be changed
+# with the HELASUNO_SOCKET environment variable
+DAEMON_SOCKET = os.environ.get(
+    f'{LANG_NAME.upper()}_SOCKET',
+    os.path.join(
+        os.environ.get('XDG_RUNTIME_DIR', '/tmp'),
+        f'{LANG_NAME_LOWER}-{os.getuid()}.sock'
+    )
+)
+# The number of seconds a script run by the daemon can take
+DAEMON_TIMEOUT = 300
+# The number of seconds the daemon waits for a client to send its request
+DAEMON_REQUEST_TIMEOUT = 10
+
+# The port the coordinator of a cluster listens on when one isn't given (see
+# the -c and -a flags)
+CLUSTER_PORT = 7410
+# The number of scripts a worker is sent at a time
+CLUSTER_BATCH = 16
+# The number of times a script is run again when its worker is lost
+CLUSTER_RETRIES = 2
+# The number of seconds a worker keeps trying to reach the coordinator
+CLUSTER_CONNECT_TIMEOUT = 30
+
+# The number of bytes a filter reads and writes at a time (see the -t flag)
+FILTER_BUFFER_SIZE = 1 << 16
+
+# The limits a script run in the sandbox has by default (see the -x flag):
+# the number of statements it can execute, the number of seconds it can run
+# for, the number of bytes of memory it can allocate and the number of bytes
+# it can write
+SANDBOX_STATEMENTS = 1000000
+SANDBOX_TIMEOUT = 10
+SANDBOX_MEMORY = 256 * 1024 * 1024
+SANDBOX_OUTPUT = 1024 * 1024
+# The number of seconds after its timeout a sandboxed script is killed if it
+# is still going (eg. stuck in a long calculation)
+SANDBOX_GRACE = 1
+
+# The extension of the checkpoint kept next to a script (see the -k flag)
+# and the fewest seconds between checkpoints
+CHECKPOINT_EXTENSION = f'.{LANG_NAME_ACRONYM}ckpt'
+CHECKPOINT_INTERVAL = 5
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import collections
+import concurrent.futures
+import csv
+import io
+import itertools
+import json
+import sys
+import warnings
+
+# Language imports
+from etc import colourise
+from interpreter import engine
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that runs one script over every record in a file of records (see
+the -b flag), each run starting with no variables and reading the fields of
+its record with its get statements, in order:
+
+    hs -b people.csv greet.hs
+    hs -b people.ndjson -j 4 greet.hs
+
+Records are either CSV (a row for each record) or NDJSON (a JSON array or
+object on each line, with the values of an object taken in order). The script
+is loaded once and the output of each run is written out in the same order
+as the records, as the records are read, so only a handful of records are
+ever held at once however many there are. With -j, records are sent to a
+pool of worker processes in chunks, with only a few chunks waiting at a time.
+'''
+
+# The number of records sent to a worker at a time
+CHUNK_SIZE = 256
+# The number of chunks each worker has waiting at a time
+CHUNKS_PER_WORKER = 2
+
+# The program each worker process runs for its records (see load_worker())
+worker_program = None
+
+
+def get_format(records_name: str, first_line: str) -> str:
+    """Work out whether records are CSV or NDJSON, going by the name of the
+    file and then by the first line
+
+    Args:
+        records_name [str]: the name of the file, - for the input
+        first_line [str]: the first line of the file
+
+    Returns:
+        str: csv or ndjson
+
+    Raises:
+        None
+    """
+    extension = records_name.lower().rpartition('.')[2]
+    if extension == 'csv':
+        return 'csv'
+    if extension in ('ndjson', 'jsonl', 'json'):
+        return 'ndjson'
+    return 'ndjson' if first_line.lstrip()[:1] in ('[', '{') else 'csv'
+
+
+def get_fields(value) -> list:
+    """Get the fields of an NDJSON record as the lines get statements read
+
+    Args:
+        value: the decoded record
+
+    Returns:
+        list: the fields, each as text
+
+    Raises:
+        None
+    """
+    if isinstance(value, dict):
+        value = list(value.values())
+    elif not isinstance(value, list):
+        value = [value]
+    return [
+        field if isinstance(field, str) else
+        '' if field is None else json.dumps(field)
+        for field in value
+    ]
+
+
+def read_records(stream, records_name: str = '-'):
+    """Read records one at a time from a stream
+
+    Args:
+        stream: the stream (eg. an open file)
+        records_name [str]: the name of the file (to tell CSV from NDJSON),
+            defaults to - for the input
+
+    Returns:
+        generator: the fields of each record
+
+    Raises:
+        ScriptExit: if an NDJSON record isn't valid JSON
+    """
+    first_line = stream.readline()
+    lines = itertools.chain([first_line], stream)
+    if get_format(records_name, first_line) == 'csv':
+        yield from csv.reader(lines)
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield get_fields(json.loads(line))
+        except ValueError:
+            messenger.simple_error(
+                f'Record {line_number} of ' +
+                f'{"the input" if records_name == "-" else records_name} ' +
+                'is not valid JSON.',
+                error_code=33
+            )
+
+
+def run_record(program, fields: list) -> tuple:
+    """Run a program for one record
+
+    Args:
+        program [seed.Program]: the program
+        fields [list]: the fields of the record, read by get statements in
+            order
+
+    Returns:
+        tuple: the exit status and output of the run
+
+    Raises:
+        None
+    """
+    result = engine.run_program(program, inputs=fields)
+    return result.exit_status, result.output
+
+
+def load_worker(source: str, script_name: str):
+    """Load the program in a worker process, unless it was forked from a
+    process that already has it
+
+    Args:
+        source [str]: the source of the script
+        script_name [str]: the name of the script
+
+    Returns:
+        N/A
+
+    Raises:
+        LoadError: if the script has an error
+    """
+    global worker_program
+    if worker_program is None:
+        worker_program = engine.compile_program(source, script_name)
+
+
+def run_chunk(records: list) -> list:
+    """Run the program of this worker process for a chunk of records
+
+    Args:
+        records [list]: the fields of each record
+
+    Returns:
+        list: the exit status and output of each run
+
+    Raises:
+        None
+    """
+    return [run_record(worker_program, fields) for fields in records]
+
+
+def run_records(source: str, script_name: str, records, workers: int = 1,
+                output=None) -> int:
+    """Load a script once and run it for each record, writing out the output
+    of each run in the order of the records
+
+    Args:
+        source [str]: the source of the script
+        script_name [str]: the name of the script
+        records: the fields of each record (eg. from read_records())
+        workers [int]: the number of worker processes, defaults to 1 to run
+            every record in this process
+        output: the stream the output is written to, defaults to None for
+            sys.stdout
+
+    Returns:
+        int: 0 if every run exited with 0 and 1 otherwise (including when
+            the script has an error)
+
+    Raises:
+        ScriptExit: if the records can't be read
+    """
+    global worker_program
+    output = sys.stdout if output is None else output
+
+    # Load the script, writing out any warnings (or the error) once rather
+    # than for every record
+    load_output = io.StringIO()
+    try:
+        program = engine.compile_program(
+            source, script_name, output=load_output
+        )
+    # A script with an error isn't run for any record and fails in the same
+    # way as it does in a pool (see pool.run_source())
+    except engine.LoadError as load_error:
+        output.write(load_error.output)
+        return 1
+    output.write(load_output.getvalue())
+    exit_status = 0
+
+    # Run every record here
+    if workers == 1:
+        for fields in records:
+            status, text = run_record(program, fields)
+            output.write(text)
+            exit_status = exit_status or status
+        output.flush()
+        return int(exit_status != 0)
+
+    # Otherwise hand chunks of records to the workers, which are forked with
+    # the program already loaded where they can be, keeping only a few chunks
+    # waiting so that the records are read as they are needed
+    worker_program = program
+    chunks = iter(lambda: list(itertools.islice(records, CHUNK_SIZE)), [])
+    waiting = collections.deque()
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=load_worker, initargs=(source, script_name)
+    ) as executor:
+        while True:
+            for chunk in itertools.islice(
+                chunks, workers * CHUNKS_PER_WORKER - len(waiting)
+            ):
+                waiting.append(executor.submit(run_chunk, chunk))
+            if not waiting:
+                break
+            # Write out the oldest chunk once it is done
+            for status, text in waiting.popleft().result():
+                output.write(text)
+                exit_status = exit_status or status
+            output.flush()
+    worker_program = None
+    return int(exit_status != 0)
+
+
+def run_batch(script_name: str, records_name: str, workers: int = 1) -> int:
+    """Run a script for each record in a file of records (see the -b flag)
+
+    Args:
+        script_name [str]: the name of the script
+        records_name [str]: the name of the file of records, - for the input
+        workers [int]: the number of worker processes, defaults to 1
+
+    Returns:
+        int: 0 if every run exited with 0 and 1 otherwise (including when
+            the script has an error)
+
+    Raises:
+        ScriptExit: if the script or the records can't be read
+    """
+    # Calculating text like "1 is 1" warns each time it is calculated, which
+    # would bury the output of the records
+    warnings.simplefilter('ignore', SyntaxWarning)
+
+    try:
+        with open(script_name, 'r') as script:
+            source = script.read()
+    except OSError:
+        messenger.simple_error(
+            'The script could not be found. Double check that the file ' +
+            'exists.',
+            error_code=9
+        )
+
+    # Read the records as they are needed
+    if records_name == '-':
+        return run_records(
+            source, script_name, read_records(sys.stdin), workers
+        )
+    try:
+        stream = open(records_name, 'r', newline='')
+    except OSError as error:
+        messenger.simple_error(
+            f'The records in {colourise.yellow(records_name)} could not be ' +
+            f'read ({error.strerror}).',
+            error_code=33
+        )
+    with stream:
+        return run_records(
+            source, script_name, read_records(stream, records_name), workers
+        )
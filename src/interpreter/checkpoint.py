@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+
+# Language imports
+from etc import (colourise, global_values)
+from maple import (sap, values, xylem)
+from maple.error import messenger
+from statements import stmt_pause
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that keeps checkpoints of a long running script next to it (see the
+-k flag), so that it can carry on from where it was after it is stopped (see
+the --resume flag) rather than starting again from the top:
+
+    hs -k script.hs              (stopped partway through)
+    hs --resume script.hs        (carries on from the last checkpoint)
+
+A checkpoint is written when the script reaches a pause or a get statement,
+as that is where a script that runs for a long time spends it, at most once
+every CHECKPOINT_INTERVAL seconds (or for any pause longer than that). It
+keeps the line the script is at (and how far through a pause it was, by the
+clock), its variables, the lines hoisted out of the loop it is in, the number
+of lines of input it has read and the number of statements it has executed.
+The output is flushed before each checkpoint so nothing the script wrote is
+lost. Each checkpoint is written to a file of its own and moved over the last
+one so that a checkpoint is never left half written. The checkpoint is removed
+once the script finishes, unless it was interrupted.
+'''
+
+
+def get_checkpoint_path(script_name: str) -> str:
+    """Get the path of the checkpoint that is kept next to a script
+
+    Args:
+        script_name [str]: the script
+
+    Returns:
+        str: the path of the checkpoint
+
+    Raises:
+        None
+    """
+    return f'{script_name}{global_values.CHECKPOINT_EXTENSION}'
+
+
+def get_script_hash(contents: str) -> str:
+    """Get the hash of a script so that a checkpoint is only resumed for the
+    script that it was made from
+
+    Args:
+        contents [str]: the source of the script
+
+    Returns:
+        str: the hash
+
+    Raises:
+        None
+    """
+    return hashlib.sha256(
+        contents.encode('utf-8', 'surrogateescape')
+    ).hexdigest()
+
+
+class Checkpointer:
+    """Writes the checkpoints of a run (see sap.Run.checkpointer)
+    """
+
+    def __init__(self, script_name: str, contents: str,
+                 interval: float = global_values.CHECKPOINT_INTERVAL):
+        # Where the checkpoints are written and the script they are for
+        self.path = get_checkpoint_path(script_name)
+        self.script_hash = get_script_hash(contents)
+        # The fewest seconds between checkpoints and when the last one was
+        # written
+        self.interval = interval
+        self.last_saved = None
+
+    def is_due(self, seconds: float = 0) -> bool:
+        """Check whether a checkpoint is due
+
+        Args:
+            seconds [float]: the number of seconds the script is about to
+                wait for, defaults to 0
+
+        Returns:
+            bool: whether to write a checkpoint
+
+        Raises:
+            None
+        """
+        return self.last_saved is None or seconds >= self.interval or \
+            time.monotonic() - self.last_saved >= self.interval
+
+    def at_pause(self, run, tokens: list, step: int, seconds: float):
+        """Write a checkpoint, if one is due, as a pause starts waiting
+
+        Args:
+            run [sap.Run]: the run
+            tokens [list]: the tokens of the pause statement
+            step [int]: the step of the pause (see stmt_pause.pause_steps())
+            seconds [float]: the number of seconds the step waits for
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        if self.is_due(seconds):
+            self.save(run, tokens[0]['script_line_number'], {
+                'step': step,
+                'step_end': time.time() + seconds
+            })
+
+    def at_get(self, run, tokens: list):
+        """Write a checkpoint, if one is due, before a get statement reads
+        its line
+
+        Args:
+            run [sap.Run]: the run
+            tokens [list]: the tokens of the get statement
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        if self.is_due():
+            self.save(run, tokens[0]['script_line_number'], None)
+
+    def save(self, run, line_number: str, pause: dict):
+        """Write a checkpoint of a run, replacing the last one in one go
+
+        Args:
+            run [sap.Run]: the run
+            line_number [str]: the line the run is at
+            pause [dict]: the step of the pause the run is in and when it
+                ends by the clock, None if it isn't in a pause
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+
+        # Make sure everything written so far is out before noting that it
+        # has been
+        run.get_output().flush()
+
+        # Variables are kept as Python literals so that lists, tuples and
+        # the like come back as they were. The reserved variables are set
+        # again when the run is resumed.
+        checkpoint = {
+            'lang_version': global_values.LANG_VERSION,
+            'script_hash': self.script_hash,
+            'time': time.time(),
+            'line_number': line_number,
+            'pause': pause,
+            'skip_lines': list(run.skip_lines),
+            'variables': {
+                name: repr(value) for name, value in run.variables.items()
+                if not name.startswith(values.VARIABLE_PROHIBITED_PREFIX)
+            },
+            'lines_read': run.lines_read,
+            'statements_executed': run.statements_executed
+        }
+
+        # Write the checkpoint out in full before moving it into place. A
+        # checkpoint that can't be written is skipped rather than stopping
+        # the script.
+        temporary_path = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary_path, 'w') as checkpoint_file:
+                json.dump(checkpoint, checkpoint_file)
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+            os.replace(temporary_path, self.path)
+        except OSError:
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+        self.last_saved = time.monotonic()
+
+    def finish(self, run):
+        """Remove the checkpoint once the script has finished, unless it
+        was interrupted (eg. with Ctrl-C) so that it can still be resumed
+
+        Args:
+            run [sap.Run]: the run
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        if any(
+            diagnostic['error_code'] == 1 for diagnostic in run.diagnostics
+        ):
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def load_checkpoint(script_name: str, contents: str) -> dict:
+    """Load the checkpoint of a script
+
+    Args:
+        script_name [str]: the script
+        contents [str]: the source of the script
+
+    Returns:
+        dict: the checkpoint (see Checkpointer.save())
+
+    Raises:
+        ScriptExit: if there isn't a checkpoint or it is for a different
+            version of the script or of the language
+    """
+    path = get_checkpoint_path(script_name)
+    try:
+        with open(path, 'r') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        valid = checkpoint['script_hash'] == get_script_hash(contents) and \
+            checkpoint['lang_version'] == global_values.LANG_VERSION
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        messenger.simple_error(
+            f'The checkpoint {colourise.yellow(path)} could not be read ' +
+            f'({error}).',
+            error_code=36
+        )
+    if not valid:
+        messenger.simple_error(
+            f'The checkpoint {colourise.yellow(path)} was made by a ' +
+            'different version of the script or of the language.',
+            error_code=36
+        )
+    return checkpoint
+
+
+def restore(run, checkpoint: dict):
+    """Put a run back into the state it was in at a checkpoint
+
+    Args:
+        run [sap.Run]: a run that hasn't started
+        checkpoint [dict]: the checkpoint
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Bring the variables back, keeping any that aren't literals as text
+    for name, text in checkpoint['variables'].items():
+        try:
+            run.variables[name] = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            run.variables[name] = text
+    run.statements_executed = checkpoint['statements_executed']
+
+    # Move past the lines of input that were already read, unless they are
+    # being typed in
+    stream = run.input_stream or sys.stdin
+    if not stream.isatty():
+        for _ in range(checkpoint['lines_read']):
+            if not stream.readline():
+                break
+    run.lines_read = checkpoint['lines_read']
+
+
+def finish_pause(run, tokens: list, pause: dict):
+    """Wait out the rest of the pause a run was in at its checkpoint
+
+    Args:
+        run [sap.Run]: the run
+        tokens [list]: the tokens of the pause statement
+        pause [dict]: the step of the pause and when it ends by the clock
+
+    Returns:
+        N/A
+
+    Raises:
+        ScriptExit: if the pause stops the run
+    """
+    for step, (text, seconds) in enumerate(stmt_pause.pause_steps(tokens)):
+        # The steps before were finished and the text of the step the run
+        # was in was already written
+        if step < pause['step']:
+            continue
+        if step == pause['step']:
+            seconds = max(pause['step_end'] - time.time(), 0)
+        elif text is not None:
+            run.write(text)
+        if run.checkpointer is not None:
+            run.checkpointer.at_pause(run, tokens, step, seconds)
+        time.sleep(seconds)
+
+
+def resume(run, script_name: str, contents: str) -> int:
+    """Carry on a run of a script from its last checkpoint
+
+    Args:
+        run [sap.Run]: a run of the script that hasn't started
+        script_name [str]: the script
+        contents [str]: the source of the script
+
+    Returns:
+        int: the exit status of the run
+
+    Raises:
+        ScriptExit: if the checkpoint can't be resumed
+    """
+    checkpoint = load_checkpoint(script_name, contents)
+    lines = dict(run.program.lines)
+    line_number = checkpoint['line_number']
+    if line_number not in lines:
+        messenger.simple_error(
+            f'The checkpoint is at line {line_number}, which the script ' +
+            'does not have.',
+            error_code=36
+        )
+    restore(run, checkpoint)
+
+    # A run that was in a pause finishes it and then carries on from the
+    # line after
+    start_location = int(line_number)
+    if checkpoint['pause'] is not None:
+        token = sap.CURRENT_RUN.set(run)
+        try:
+            finish_pause(run, lines[line_number], checkpoint['pause'])
+        except messenger.ScriptExit as exit_call:
+            run.exit_status = 0 if exit_call.code is None else exit_call.code
+            return run.exit_status
+        finally:
+            sap.CURRENT_RUN.reset(token)
+        start_location += 1
+
+    # Carry on from the line, skipping any lines hoisted out of the loop the
+    # run was in
+    return xylem.execute(
+        run, start_location, tuple(checkpoint['skip_lines'])
+    )
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 # Language imports
-from maple import arborist
+from maple import (arborist, phloem, tree)
 from maple.error import (codes, messenger)
 from etc import (colourise, interpreter_flags, global_values)
 
@@ -89,7 +89,24 @@ def check_flags(opts, script_name):
 
     modes = {
         'dev_mode': False,
-        'performance_check': False
+        'drop_unreachable': False,
+        'profile_guided': False,
+        'list_eliminated': False,
+        'output_cache': True,
+        'performance_check': False,
+        'render_cache_stats': False,
+        'workers': None,
+        'daemon': False,
+        'fork_server': False,
+        'subinterpreters': False,
+        'coordinator': None,
+        'cluster_worker': None,
+        'records': None,
+        'filter': False,
+        'sandbox': False,
+        'checkpoint': False,
+        'resume': False,
+        'snapshot': False
     }
 
     # Loop over the options
@@ -100,10 +117,20 @@ def check_flags(opts, script_name):
         opt_value = opt[1]
         # Match the flags
         match opt_flag:
+            case '-a':
+                modes['cluster_worker'] = opt_value
+            case '-b':
+                modes['records'] = opt_value
+            case '-c':
+                modes['coordinator'] = opt_value
             case '-d':
                 modes['dev_mode'] = True
             case '-e':
                 codes.error_elaborator(opt_value)
+            case '-f':
+                modes['fork_server'] = True
+            case '-g':
+                modes['profile_guided'] = True
             case '-h':
                 print(colourise.yellow('\n:: HELP ::'))
                 print(
@@ -117,7 +144,8 @@ def check_flags(opts, script_name):
                 print(textwrap.fill(
                     f'{colourise.cyan("-d")}  ' +
                     'Run in developer mode. This outputs information about ' +
-                    'tokenisation and other "inner workings."',
+                    'tokenisation, the control flow graph (as text and as ' +
+                    'Graphviz DOT) and other "inner workings."',
                     subsequent_indent='\t'
                 ))
                 print(textwrap.fill(
@@ -127,11 +155,49 @@ def check_flags(opts, script_name):
                     'interpreter are working.',
                     subsequent_indent='\t'
                 ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-s")}  ' +
+                    'Output render cache statistics. This runs the script ' +
+                    'and outputs how often the output of write statements ' +
+                    'was reused rather than rendered again.',
+                    subsequent_indent='\t'
+                ))
                 print(colourise.green('\n\nUSER FLAGS'))
                 print(
                     'These are flags that are helpful for people writing ' +
                     'scripts and/or general users.\n'
                 )
+                print(textwrap.fill(
+                    f'{colourise.cyan("-a [address]")}  ' +
+                    'Cluster worker. This connects to the coordinator at ' +
+                    'the address (eg. 127.0.0.1:7410) and runs the scripts ' +
+                    'it sends until there are none left. Combine with ' +
+                    f'{colourise.cyan("-j")} to start that many workers.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-b [records]")}  ' +
+                    'Batch records. This loads the script once and runs it ' +
+                    'for each record in a CSV or NDJSON file (or the input ' +
+                    f'if passed {colourise.cyan("-")}), with the fields of ' +
+                    'the record read by its get statements in order, and ' +
+                    'writes out the output of each run in the order of the ' +
+                    'records. Combine with ' +
+                    f'{colourise.cyan("-j")} to spread the records over ' +
+                    'that many worker processes.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-c [address]")}  ' +
+                    'Cluster coordinator. This listens on the address (eg. ' +
+                    '127.0.0.1:7410) and hands the scripts passed to the ' +
+                    'interpreter out to the workers that connect, writing ' +
+                    'out the output of each script and finishing with a ' +
+                    'summary of exit statuses, timings and throughput. Pass ' +
+                    f'{colourise.cyan("-")} to read the scripts from the ' +
+                    'input, one to a line.',
+                    subsequent_indent='\t'
+                ))
                 print(textwrap.fill(
                     f'{colourise.cyan("-e [error code]")}  ' +
                     'Get elaborations on errors. If you find yourself ' +
@@ -140,22 +206,183 @@ def check_flags(opts, script_name):
                     'code (where relevant).',
                     subsequent_indent='\t'
                 ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-f")}  ' +
+                    'Fork server. This starts a daemon in the same way as ' +
+                    f'{colourise.cyan("-w")} but runs each script in a ' +
+                    'child process forked from the daemon, so a script ' +
+                    'that crashes or never stops only takes its own child ' +
+                    f'with it. Combine with {colourise.cyan("-j")} to set ' +
+                    'the number of children running at once.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-g")}  ' +
+                    'Profile guided optimisation. This counts how many ' +
+                    'times each line and jump is executed and saves the ' +
+                    'counts next to the script (eg. script.hs' +
+                    f'{global_values.PROFILE_EXTENSION}). The next run with ' +
+                    'this flag uses the counts to speed up the lines that ' +
+                    'are executed the most.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-i")}  ' +
+                    'Sub-interpreters. This runs many scripts at once in ' +
+                    f'the same way as {colourise.cyan("-j")} but on ' +
+                    'sub-interpreters within the one process, each with a ' +
+                    'GIL of its own, rather than on worker processes.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-j [workers]")}  ' +
+                    'Run many scripts at once. This runs each script passed ' +
+                    'to the interpreter on a pool of worker processes, ' +
+                    'writes out the output of each script in one piece and ' +
+                    'finishes with a summary of exit statuses and timings. ' +
+                    'Passing more than one script does the same with a ' +
+                    'worker for each processor.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-k")}  ' +
+                    'Keep checkpoints. This writes a checkpoint of the ' +
+                    'script next to it (eg. script.hs' +
+                    f'{global_values.CHECKPOINT_EXTENSION}) as it reaches ' +
+                    'pause and get statements, at most every ' +
+                    f'{global_values.CHECKPOINT_INTERVAL} seconds, so that ' +
+                    'it can be resumed if it is stopped.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-l")}  ' +
+                    'List eliminated stores. This lists the set statements ' +
+                    'that are skipped because the value they assign is ' +
+                    'never used before the script is executed.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-n")}  ' +
+                    'No output cache. Scripts that always write the same ' +
+                    'output (ie. no get or pause statements and no time ' +
+                    'based variables) have their output cached and replayed ' +
+                    'on later runs. This executes the script every time.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-q")}  ' +
+                    'Quick start. This keeps a snapshot of the script in ' +
+                    'the output cache once it reaches its first get or ' +
+                    'pause statement (or anything else that can change from ' +
+                    'run to run), so that later runs skip loading the ' +
+                    'script and the statements before it.',
+                    subsequent_indent='\t'
+                ))
                 print(textwrap.fill(
                     f'{colourise.cyan("-r")}  ' +
                     'Reline script. This relines the script before ' +
                     'execution, ensuring that the script follows convention.',
                     subsequent_indent='\t'
                 ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-t")}  ' +
+                    'Text filter. This runs the script as a filter over the ' +
+                    'lines of the input: each get statement reads the next ' +
+                    'line as it is (without writing its prompt) and also ' +
+                    'keeps it in hs_line, and the script stops once the ' +
+                    'input runs out. The input and output are read and ' +
+                    'written in large blocks so that big files pass ' +
+                    'through quickly.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-u")}  ' +
+                    'Drop unreachable lines. Lines that can never be ' +
+                    'executed are always left out of the execution of the ' +
+                    'script and this also drops them from memory and from ' +
+                    'anything built from the script.',
+                    subsequent_indent='\t'
+                ))
                 print(textwrap.fill(
                     f'{colourise.cyan("-v")}  ' +
                     'Version information. This outputs information about ' +
                     'the language.',
                     subsequent_indent='\t'
                 ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-w")}  ' +
+                    'Warm daemon. This starts a daemon that keeps the ' +
+                    'interpreter loaded and runs scripts sent to it by ' +
+                    'tools/hs_client.py over a Unix socket in a pool of ' +
+                    'worker processes, keeping each script loaded for ' +
+                    f'next time. Combine with {colourise.cyan("-j")} to ' +
+                    'set the number of workers, which is the number of ' +
+                    'scripts it runs at once.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-x")}  ' +
+                    'Sandbox. This runs a script that can\'t be trusted in ' +
+                    'a child process with limits on the statements it ' +
+                    'executes, how long it runs for, the memory it uses and ' +
+                    'the output it writes (see the SANDBOX_ values in ' +
+                    'src/etc/global_values.py). Each limit stops the script ' +
+                    'with an error code of its own.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("--resume")}  ' +
+                    'Resume the script. This carries on from the last ' +
+                    f'checkpoint written with {colourise.cyan("-k")}, ' +
+                    'rather than starting from the top, and keeps writing ' +
+                    'checkpoints.',
+                    subsequent_indent='\t'
+                ))
+                print(textwrap.fill(
+                    f'{colourise.cyan("-")}  ' +
+                    'Piped in script. Passing - as the script (or the name ' +
+                    'of a named pipe) executes the script as its lines ' +
+                    'arrive, with jumps forward waiting for their line, so ' +
+                    'that a generated script starts writing its output ' +
+                    'straight away.',
+                    subsequent_indent='\t'
+                ))
                 print('')
                 sys.exit(0)
+            case '-i':
+                modes['subinterpreters'] = True
+            case '-j':
+                # The number of workers has to be a whole number above zero
+                if not opt_value.isdecimal() or int(opt_value) < 1:
+                    messenger.simple_error(
+                        'The number of workers passed with ' +
+                        f'{colourise.yellow("-j")} needs to be a whole ' +
+                        'number that is at least 1.'
+                    )
+                modes['workers'] = int(opt_value)
+            case '-k':
+                modes['checkpoint'] = True
+            case '-l':
+                modes['list_eliminated'] = True
+            case '-n':
+                modes['output_cache'] = False
             case '-p':
                 modes['performance_check'] = True
+            case '-q':
+                modes['snapshot'] = True
+            case '-s':
+                modes['render_cache_stats'] = True
+            case '-t':
+                modes['filter'] = True
+            case '-u':
+                modes['drop_unreachable'] = True
+            case '-w':
+                modes['daemon'] = True
+            case '-x':
+                modes['sandbox'] = True
+            case '--resume':
+                modes['checkpoint'] = True
+                modes['resume'] = True
             case '-r':
                 interpreter_flags.reline(script_name)
             case '-v':
@@ -284,3 +511,103 @@ def run_arborist_checks(lines_of_script):
             'line with an integer greater than 0.',
             error_code=7
         )
+
+
+def run_reachability_checks(drop_from_caches=False):
+    '''A function to find and prune the lines of the planted tree that can
+    never be executed, warning about each run of them
+
+    Args:
+        drop_from_caches [bool]: whether the unreachable lines should also be
+            dropped from the token list, defaults to False
+
+    Returns:
+        None
+
+    Raises:
+        None
+    '''
+
+    # Get the runs of unreachable lines
+    unreachable_lines = arborist.find_unreachable_lines()
+
+    # Get the last line of the script. A script has to finish with an end
+    # statement so it isn't worth warning about if it can't be reached
+    # (eg. a script that loops forever).
+    try:
+        last_line = tree.LINE_NUMBERS[-1]
+    except IndexError:
+        last_line = None
+
+    for run in unreachable_lines:
+        # Leave out the required end statement
+        reported_lines = [line for line in run if line != last_line]
+        # If there is nothing left to report, move along
+        if not reported_lines:
+            continue
+        # Warn about the run of lines
+        messenger.line_warning(
+            'The following lines can never be reached and will not be ' +
+            f'executed: {", ".join(reported_lines)}.',
+            line_no=reported_lines[0],
+            error_code=26
+        )
+
+    # Prune the unreachable lines
+    arborist.prune_unreachable_lines(unreachable_lines, drop_from_caches)
+
+
+def run_cycle_checks(token_tree: dict = None):
+    '''A function to find any jump cycles in the planted tree that the script
+    can never leave, erroring out before any statement is executed rather
+    than waiting for the script to run out of recursion. A cycle with a
+    pause statement is only warned about as it waits on the clock each time
+    around (eg. a script that checks on something every so often).
+
+    Args:
+        token_tree [dict]: the token tree to check, defaults to the
+            tree.TOKEN_TREE
+
+    Returns:
+        None
+
+    Raises:
+        None
+    '''
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    # Find the cycles that have no way out
+    cycles = phloem.find_inescapable_cycles(
+        phloem.build_flow_graph(token_tree), token_tree
+    )
+
+    # Warn about the cycles that pause, leaving the rest until afterwards
+    stuck_cycles = []
+    for cycle in cycles:
+        if not any(
+            phloem.get_statement_name(token_tree[line_no]) == 'pause'
+            for line_no in cycle
+        ):
+            stuck_cycles.append(cycle)
+            continue
+        messenger.line_warning(
+            'The script will be stuck in a loop that it can never leave, ' +
+            'pausing each time around. There is no end or get statement on ' +
+            f'the following lines: {", ".join(cycle)}.',
+            line_no=cycle[-1],
+            error_code=27
+        )
+
+    # Only the first of the other cycles is reported as reporting an error
+    # exits
+    for cycle in stuck_cycles:
+        messenger.line_error(
+            'The script will be stuck in a loop that it can never leave. ' +
+            'There is no end, get or pause statement on the following ' +
+            f'lines: {", ".join(cycle)}.',
+            line_no=cycle[-1],
+            error_code=27
+        )
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import asyncio
+import collections
+import json
+import multiprocessing
+import os
+import select
+import socket
+import time
+import warnings
+
+# Language imports
+from etc import (colourise, global_values)
+from interpreter import (daemon, forkserver, pool)
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that spreads a batch of scripts over workers that connect to a
+coordinator over TCP, on the same machine or on others (see the -c and -a
+flags):
+
+    hs -c 127.0.0.1:7410 scripts/*.hs      (the coordinator)
+    hs -a 127.0.0.1:7410 -j 4              (four workers on each machine)
+
+The coordinator reads each script and sends its source, so the workers don't
+need to see the same files. Scripts are sent to a worker in batches, which
+the worker works through in order. A worker that runs out of scripts once
+there are none left to hand out steals the back half of the batch of the
+worker with the most left, and that worker is told to skip them. If a worker
+is lost (or the interpreter crashes while running a script), its scripts are
+handed out again, up to CLUSTER_RETRIES times for the script it was running.
+The coordinator writes out the output of each script as it comes back and
+finishes with a summary of how the scripts went and how quickly.
+
+The coordinator and the workers use the same messages as the daemon (see
+interpreter/daemon.py), with the text of each being JSON:
+
+    r  the worker is ready, with the name of the worker
+    j  a batch of scripts for the worker, each with its number, name and
+       source
+    c  the numbers of scripts the worker is to skip
+    d  the number of a script the worker has finished and how it went
+    q  there are no scripts left so the worker can stop
+
+Anyone who can reach the coordinator can join as a worker, so it listens on
+127.0.0.1 unless it is given another address.
+'''
+
+
+def parse_address(address: str) -> tuple:
+    """Get the host and port from an address like host:port, :port or port
+
+    Args:
+        address [str]: the address
+
+    Returns:
+        tuple: the host (127.0.0.1 if it isn't given) and the port
+            (CLUSTER_PORT if it isn't given)
+
+    Raises:
+        ValueError: if the port isn't a number
+    """
+    host, _, port = address.rpartition(':')
+    if not host and not port.isdecimal():
+        host, port = port, ''
+    return host or '127.0.0.1', int(port) if port else \
+        global_values.CLUSTER_PORT
+
+
+class Job:
+    """A script the coordinator is to have run
+    """
+
+    def __init__(self, job_id: int, script_name: str):
+        # The number the script is known by and the name of the script
+        self.job_id = job_id
+        self.script_name = script_name
+        # The number of times the script has been run again
+        self.attempts = 0
+        # How the script went once it has finished (see pool.run_script())
+        self.summary = None
+
+
+class WorkerState:
+    """What the coordinator knows about a worker
+    """
+
+    def __init__(self, name: str, writer):
+        # The name of the worker and the connection to it
+        self.name = name
+        self.writer = writer
+        # The numbers of the scripts the worker has been sent and hasn't
+        # finished, in the order it works through them
+        self.outstanding = collections.deque()
+        # The number of scripts the worker has finished and stolen
+        self.completed = 0
+        self.stolen = 0
+
+
+class Coordinator:
+    """Hands scripts out to workers and collects how they went
+    """
+
+    def __init__(self, script_names: list,
+                 batch: int = global_values.CLUSTER_BATCH,
+                 retries: int = global_values.CLUSTER_RETRIES,
+                 show_output=True):
+        # The scripts, along with the numbers of those that haven't been
+        # handed out
+        self.jobs = [
+            Job(job_id, script_name)
+            for job_id, script_name in enumerate(script_names)
+        ]
+        self.pending = collections.deque(range(len(self.jobs)))
+        self.remaining = len(self.jobs)
+        # The number of scripts sent at a time and the number of times a
+        # script is run again
+        self.batch = batch
+        self.retries = retries
+        # Whether the output of each script is written out as it comes back
+        self.show_output = show_output
+        # The workers that have joined, those that are still connected and
+        # those that have nothing to do
+        self.joined = []
+        self.workers = []
+        self.idle = []
+        # How the run went
+        self.retried = 0
+        self.steals = 0
+        self.start_time = time.perf_counter()
+        self.finished = None
+
+    def finish(self, job: Job, summary: dict):
+        """Keep how a script went, unless it has already finished (eg. when
+        a worker ran a script that was stolen from it)
+
+        Args:
+            job [Job]: the script
+            summary [dict]: how it went
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        if job.summary is not None:
+            return
+        job.summary = summary
+        self.remaining -= 1
+        if self.show_output:
+            pool.print_output(job.script_name, summary)
+        if self.remaining == 0:
+            self.finished.set()
+
+    def make_message(self, job: Job) -> dict:
+        """Read a script for sending to a worker
+
+        Args:
+            job [Job]: the script
+
+        Returns:
+            dict: the number, name and source of the script, None if the
+                script can't be read (in which case it has finished)
+
+        Raises:
+            None
+        """
+        try:
+            with open(job.script_name, 'r') as script:
+                source = script.read()
+        except OSError:
+            self.finish(job, {
+                'exit_status': 1,
+                'output': 'The script could not be found. Double check ' +
+                'that the file exists.\n',
+                'errors': 1,
+                'run_time': 0.0
+            })
+            return None
+        return {'job': job.job_id, 'name': job.script_name, 'source': source}
+
+    def assign(self, worker: WorkerState):
+        """Send a worker that has nothing to do its next batch of scripts,
+        stealing from another worker if there are none left to hand out
+
+        Args:
+            worker [WorkerState]: the worker
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        if not self.remaining:
+            return
+        messages = []
+        while self.pending and len(messages) < self.batch:
+            job = self.jobs[self.pending.popleft()]
+            if job.summary is not None:
+                continue
+            message = self.make_message(job)
+            if message is not None:
+                messages.append(message)
+                worker.outstanding.append(job.job_id)
+
+        # Steal from the worker with the most left. The first script of a
+        # batch is left alone as the worker is likely to be running it.
+        if not messages:
+            victim = max(
+                self.workers, key=lambda other: len(other.outstanding),
+                default=None
+            )
+            if victim is not None and len(victim.outstanding) > 1:
+                stolen = [
+                    victim.outstanding.pop()
+                    for _ in range(max(1, (len(victim.outstanding) - 1) // 2))
+                ]
+                daemon.send(victim.writer, b'c', json.dumps(stolen))
+                for job_id in reversed(stolen):
+                    message = self.make_message(self.jobs[job_id])
+                    if message is not None:
+                        messages.append(message)
+                        worker.outstanding.append(job_id)
+                self.steals += 1
+                worker.stolen += len(stolen)
+
+        # Send the batch, or leave the worker waiting for scripts to be
+        # handed out again (eg. when another worker is lost)
+        if messages:
+            daemon.send(worker.writer, b'j', json.dumps(messages))
+        elif worker not in self.idle:
+            self.idle.append(worker)
+
+    def requeue(self, worker: WorkerState):
+        """Hand out the scripts of a worker that has been lost again, giving
+        up on the script it was running once it has been tried too many
+        times
+
+        Args:
+            worker [WorkerState]: the worker
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        for position, job_id in enumerate(reversed(worker.outstanding)):
+            job = self.jobs[job_id]
+            if job.summary is not None:
+                continue
+            # The first script is the one the worker was running
+            if position == len(worker.outstanding) - 1:
+                job.attempts += 1
+                if job.attempts > self.retries:
+                    self.finish(job, {
+                        'exit_status': 1,
+                        'output': 'The script was given up on as the ' +
+                        f'worker running it was lost {job.attempts} ' +
+                        'times.\n',
+                        'errors': 1,
+                        'run_time': 0.0
+                    })
+                    continue
+                self.retried += 1
+            self.pending.appendleft(job_id)
+        worker.outstanding.clear()
+
+        # Give the scripts to the workers that are waiting
+        for idle in list(self.idle):
+            self.idle.remove(idle)
+            self.assign(idle)
+
+    def complete(self, worker: WorkerState, result: dict):
+        """Keep how a script a worker has finished went, running it again if
+        the interpreter crashed while running it
+
+        Args:
+            worker [WorkerState]: the worker
+            result [dict]: the number of the script and how it went
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        job = self.jobs[result['job']]
+        summary = result['summary']
+        if job.job_id in worker.outstanding:
+            worker.outstanding.remove(job.job_id)
+        # Only count the script if it hadn't already been finished elsewhere
+        if job.summary is None:
+            worker.completed += 1
+
+        if summary.pop('crashed', False) and job.summary is None and \
+                job.attempts < self.retries:
+            job.attempts += 1
+            self.retried += 1
+            self.pending.appendleft(job.job_id)
+            for idle in list(self.idle):
+                self.idle.remove(idle)
+                self.assign(idle)
+        else:
+            self.finish(job, summary)
+
+        # Send the next batch once the worker has finished this one
+        if not worker.outstanding and self.remaining:
+            self.assign(worker)
+
+    async def handle_worker(self, reader, writer):
+        """Hand scripts out to a worker until there are none left
+
+        Args:
+            reader [asyncio.StreamReader]: the connection from the worker
+            writer [asyncio.StreamWriter]: the connection to the worker
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        worker = None
+        try:
+            while True:
+                kind, text = await daemon.receive(reader)
+                match kind:
+                    # A worker has joined
+                    case b'r':
+                        worker = WorkerState(text, writer)
+                        # Time the scripts from when the first worker joins
+                        if not self.joined:
+                            self.start_time = time.perf_counter()
+                        self.joined.append(worker)
+                        self.workers.append(worker)
+                        if self.remaining:
+                            self.assign(worker)
+                        else:
+                            daemon.send(writer, b'q')
+                    # A worker has finished a script
+                    case b'd' if worker is not None:
+                        self.complete(worker, json.loads(text))
+                await writer.drain()
+        # The worker has gone away
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+            if worker is not None:
+                if worker in self.idle:
+                    self.idle.remove(worker)
+                self.workers.remove(worker)
+                self.requeue(worker)
+
+    async def run(self, host: str, port: int):
+        """Listen for workers until every script has finished
+
+        Args:
+            host [str]: the host to listen on
+            port [int]: the port to listen on
+
+        Returns:
+            N/A
+
+        Raises:
+            OSError: if the coordinator can't listen on the address
+        """
+        self.finished = asyncio.Event()
+        if not self.jobs:
+            self.finished.set()
+        server = await asyncio.start_server(self.handle_worker, host, port)
+        print(
+            f'{global_values.LANG_NAME} coordinator listening on ' +
+            f'{host}:{port} ({len(self.jobs)} scripts)',
+            flush=True
+        )
+        async with server:
+            await self.finished.wait()
+            # Let the workers know there is nothing left to do
+            for worker in self.workers:
+                daemon.send(worker.writer, b'q')
+                await worker.writer.drain()
+
+    def print_metrics(self, total_time: float):
+        """Write out how quickly the scripts were run and by whom
+
+        Args:
+            total_time [float]: the number of seconds the scripts took
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        print(colourise.yellow('\n:: CLUSTER ::'))
+        print(
+            f'\tScripts: {len(self.jobs)}  ' +
+            f'Throughput: {len(self.jobs) / max(total_time, 1e-9):,.1f} ' +
+            'scripts/s'
+        )
+        print(f'\tRetries: {self.retried}  Steals: {self.steals}')
+        width = max((len(worker.name) for worker in self.joined), default=0)
+        for worker in self.joined:
+            print(
+                f'\t{worker.name.ljust(width)}  ' +
+                f'scripts {worker.completed}  stolen {worker.stolen}'
+            )
+
+
+def coordinate(script_names: list, address: str) -> int:
+    """Run a batch of scripts on the workers that connect to an address
+
+    Args:
+        script_names [list]: the names of the scripts
+        address [str]: the address to listen on (see parse_address())
+
+    Returns:
+        int: 0 if every script exited with 0 and 1 otherwise
+
+    Raises:
+        None
+    """
+    coordinator = Coordinator(script_names)
+    try:
+        host, port = parse_address(address)
+        asyncio.run(coordinator.run(host, port))
+    except (OSError, ValueError) as error:
+        messenger.simple_error(
+            f'The coordinator could not listen on {address} ({error}).',
+            error_code=32
+        )
+
+    # Write out how the scripts went and how quickly
+    total_time = time.perf_counter() - coordinator.start_time
+    exit_status = pool.print_summary(
+        f'{len(coordinator.joined)} workers',
+        [(job.script_name, job.summary) for job in coordinator.jobs],
+        total_time
+    )
+    coordinator.print_metrics(total_time)
+    return exit_status
+
+
+def connect(address: str):
+    """Connect to a coordinator, trying again until it is up or
+    CLUSTER_CONNECT_TIMEOUT seconds have passed
+
+    Args:
+        address [str]: the address of the coordinator (see parse_address())
+
+    Returns:
+        socket.socket: the connection
+
+    Raises:
+        ScriptExit: if the coordinator can't be reached
+    """
+    give_up_time = time.monotonic() + global_values.CLUSTER_CONNECT_TIMEOUT
+    while True:
+        try:
+            return socket.create_connection(parse_address(address))
+        except (OSError, ValueError) as error:
+            if isinstance(error, ValueError) or \
+                    time.monotonic() > give_up_time:
+                messenger.simple_error(
+                    f'The coordinator at {address} could not be reached ' +
+                    f'({error}).',
+                    error_code=32
+                )
+            time.sleep(0.5)
+
+
+def work(address: str):
+    """Run the scripts a coordinator sends until it has none left
+
+    Args:
+        address [str]: the address of the coordinator
+
+    Returns:
+        N/A
+
+    Raises:
+        ScriptExit: if the coordinator can't be reached
+    """
+    # Calculating text like "1 is 1" warns each time it is calculated, which
+    # would bury what the worker writes out
+    warnings.simplefilter('ignore', SyntaxWarning)
+    connection = connect(address)
+    connection.sendall(daemon.encode_message(
+        b'r', f'{socket.gethostname()}:{os.getpid()}'
+    ))
+    batch = collections.deque()
+    skipped = set()
+
+    def handle(kind: bytes, text: str) -> bool:
+        # Keep a batch or the scripts to skip, returning False to stop
+        match kind:
+            case b'j':
+                batch.extend(json.loads(text))
+            case b'c':
+                skipped.update(json.loads(text))
+            case b'q':
+                return False
+        return True
+
+    with connection:
+        try:
+            while True:
+                # Wait for scripts if there are none, otherwise just pick up
+                # anything the coordinator has sent in the meantime
+                while not batch or \
+                        select.select([connection], [], [], 0)[0]:
+                    if not handle(*forkserver.receive(connection)):
+                        return
+                job = batch.popleft()
+                if job['job'] in skipped:
+                    continue
+
+                # Run the script, noting if the interpreter crashed so that
+                # it can be run again
+                try:
+                    summary = pool.run_source(job['source'], job['name'])
+                except Exception as error:
+                    summary = {
+                        'exit_status': 1,
+                        'output': f'{type(error).__name__}: {error}\n',
+                        'errors': 1,
+                        'run_time': 0.0,
+                        'crashed': True
+                    }
+                connection.sendall(daemon.encode_message(
+                    b'd', json.dumps({'job': job['job'], 'summary': summary})
+                ))
+        # The coordinator has gone away
+        except ConnectionError:
+            return
+
+
+def run_workers(address: str, workers: int) -> int:
+    """Run a number of workers for a coordinator, each in a process of its
+    own
+
+    Args:
+        address [str]: the address of the coordinator
+        workers [int]: the number of workers
+
+    Returns:
+        int: the exit status
+
+    Raises:
+        None
+    """
+    if workers == 1:
+        work(address)
+        return 0
+    processes = [
+        multiprocessing.Process(target=work, args=(address,))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return 0
@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import asyncio
+import contextlib
+import io
+import os
+import signal
+import socket
+import warnings
+
+# Language imports
+from etc import global_values
+from interpreter import engine
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that keeps the interpreter loaded and runs scripts sent to it over a
+Unix socket (see the -w flag and tools/hs_client.py), so that running a script
+doesn't pay for starting Python and importing the interpreter each time.
+Each client is handed to one of a pool of worker processes forked when the
+daemon starts (see Worker), so scripts that keep the processor busy run side
+by side, and each worker keeps the scripts it has loaded until they change.
+
+The client and the daemon send each other messages made up of a letter for
+the kind of message, the length of the text in four bytes and the text. The
+client starts by sending the script (s) along with the longest it can run for:
+
+    s "300\\n/path/to/script.hs"
+
+and the daemon sends back what the script writes as it runs (o), asks the
+client for a line of input (i) whenever a get statement needs one, which the
+client answers with the line (l), and finishes with the exit status (x):
+
+    o "Name? "
+    i ""
+    l "World\\n"        (an empty line when there is no more input)
+    o "Hello World\\n"
+    x "0"
+
+This keeps the client from having to import anything to read the messages
+(eg. json imports re), which would take longer than the rest of the client.
+'''
+
+# The number of bytes that hold the length of a message
+LENGTH_BYTES = 4
+
+
+def encode_message(kind: bytes, text: str = '') -> bytes:
+    """Make a message to send over the socket
+
+    Args:
+        kind [bytes]: the kind of message (eg. b'o' for output)
+        text [str]: the text of the message, defaults to an empty string
+
+    Returns:
+        bytes: the message
+
+    Raises:
+        None
+    """
+    payload = text.encode('utf-8')
+    return kind + len(payload).to_bytes(LENGTH_BYTES) + payload
+
+
+def parse_request(text: str) -> tuple:
+    """Get the script and the longest it can run for from the text of a
+    request (s) message
+
+    Args:
+        text [str]: the text of the message
+
+    Returns:
+        tuple: the path of the script and the timeout, None for the daemon's
+            limit
+
+    Raises:
+        ValueError: if the request isn't valid
+    """
+    timeout, script_name = text.split('\n', 1)
+    timeout = float(timeout) if timeout else None
+    if timeout is not None and timeout.is_integer():
+        timeout = int(timeout)
+    return script_name, timeout
+
+
+def send(writer, kind: bytes, text: str = ''):
+    """Send a message to a client
+
+    Args:
+        writer [asyncio.StreamWriter]: the connection to the client
+        kind [bytes]: the kind of message (eg. b'o' for output)
+        text [str]: the text of the message, defaults to an empty string
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    writer.write(encode_message(kind, text))
+
+
+async def receive(reader) -> tuple:
+    """Wait for a message from a client
+
+    Args:
+        reader [asyncio.StreamReader]: the connection from the client
+
+    Returns:
+        tuple: the kind of message and its text
+
+    Raises:
+        asyncio.IncompleteReadError: if the client has gone away
+    """
+    header = await reader.readexactly(1 + LENGTH_BYTES)
+    payload = await reader.readexactly(int.from_bytes(header[1:]))
+    return header[:1], payload.decode('utf-8', 'replace')
+
+
+class ClientOutput:
+    """Passes everything a script writes on to the client as it is written
+    """
+
+    def __init__(self, writer):
+        # The connection to the client
+        self.writer = writer
+
+    def write(self, text: str):
+        # Stop the script if the client has gone away
+        if self.writer.is_closing():
+            raise ConnectionResetError('The client has gone away')
+        if text:
+            send(self.writer, b'o', text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class ClientInput:
+    """Asks the client for each line of input a script needs (see
+    sap.Run.read_line_async())
+    """
+
+    def __init__(self, reader, writer):
+        # The connection to the client
+        self.reader = reader
+        self.writer = writer
+
+    async def readline(self) -> str:
+        send(self.writer, b'i')
+        await self.writer.drain()
+        # A client that has gone away has no more input
+        try:
+            kind, line = await receive(self.reader)
+        except asyncio.IncompleteReadError:
+            return ''
+        return line if kind == b'l' else ''
+
+
+class ProgramCache:
+    """The scripts the daemon has loaded, kept until the script changes
+    """
+
+    def __init__(self):
+        # The program (or the error from loading it) and the warnings from
+        # loading it keyed by the path of the script, along with the
+        # modification time and size it was loaded at
+        self.programs = {}
+
+    def get(self, script_name: str):
+        """Get a script as a program, loading it if it hasn't been loaded or
+        has changed since it was
+
+        Args:
+            script_name [str]: the path of the script
+
+        Returns:
+            tuple: the program and the warnings from loading it as they would
+                have been written out
+
+        Raises:
+            OSError: if the script can't be read
+            LoadError: if the script has an error
+        """
+        stat = os.stat(script_name)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        # Load the script if need be, keeping an error as it is for next time
+        cached = self.programs.get(script_name)
+        if cached is None or cached[0] != stamp:
+            with open(script_name, 'r') as script:
+                contents = script.read()
+            warnings = io.StringIO()
+            try:
+                loaded = engine.compile_program(
+                    contents, script_name, output=warnings
+                )
+            except engine.LoadError as load_error:
+                loaded = load_error
+            cached = (stamp, loaded, warnings.getvalue())
+            self.programs[script_name] = cached
+
+        # Return the program or raise the error
+        if isinstance(cached[1], engine.LoadError):
+            raise cached[1]
+        return cached[1], cached[2]
+
+    def load(self, script_name: str) -> tuple:
+        """Get a script as a program along with what the interpreter would
+        write out while loading it, including the error if it can't be loaded
+
+        Args:
+            script_name [str]: the path of the script
+
+        Returns:
+            tuple: the program (None if it can't be loaded) and the warnings or
+                errors from loading it
+
+        Raises:
+            None
+        """
+        try:
+            return self.get(script_name)
+        except OSError:
+            return None, 'The script could not be found. Double check ' + \
+                'that the file exists.\n'
+        except engine.LoadError as load_error:
+            return None, load_error.output
+
+
+class Daemon:
+    """Runs the scripts sent to it by clients, one at a time in each worker
+    (see Worker)
+    """
+
+    def __init__(self, timeout: float):
+        # The scripts that have been loaded
+        self.program_cache = ProgramCache()
+        # The longest a script can run for
+        self.timeout = timeout
+
+    async def serve_connection(self, connection):
+        """Run the script a client has sent over a connection that has been
+        handed to a worker
+
+        Args:
+            connection [socket.socket]: the connection to the client
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        reader, writer = await asyncio.open_unix_connection(sock=connection)
+        await self.handle_client(reader, writer)
+        # Make sure everything has been sent before moving on
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        """Run the script a client has sent
+
+        Args:
+            reader [asyncio.StreamReader]: the connection from the client
+            writer [asyncio.StreamWriter]: the connection to the client
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        try:
+            # Get the request, giving up on clients that don't send one
+            try:
+                kind, request = await asyncio.wait_for(
+                    receive(reader), global_values.DAEMON_REQUEST_TIMEOUT
+                )
+                script_name, timeout = parse_request(request)
+            except (TimeoutError, ValueError):
+                return
+            if kind != b's':
+                return
+
+            exit_status = await self.run_script(
+                script_name, timeout, reader, writer
+            )
+            send(writer, b'x', str(exit_status))
+            await writer.drain()
+        # Carry on with other clients if this one went away
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def run_script(self, script_name: str, timeout, reader,
+                         writer) -> int:
+        """Run a script for a client
+
+        Args:
+            script_name [str]: the path of the script
+            timeout [float]: the longest the client wants the script to run
+                for, None for the daemon's limit
+            reader [asyncio.StreamReader]: the connection from the client
+            writer [asyncio.StreamWriter]: the connection to the client
+
+        Returns:
+            int: the exit status of the script
+
+        Raises:
+            None
+        """
+
+        # Get the script, passing on any warnings or errors from loading it
+        # as they would be written out by the interpreter
+        program, load_output = self.program_cache.load(script_name)
+        if load_output:
+            send(writer, b'o', load_output)
+        if program is None:
+            return 1
+
+        # Run it, passing the output on to the client as it is written.
+        # Calculating text like "1 is 1" warns each time it is calculated,
+        # which would fill up the log of a daemon that runs for days.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', SyntaxWarning)
+            result = await engine.run_program_async(
+                program,
+                inputs=ClientInput(reader, writer),
+                output=ClientOutput(writer),
+                timeout=min(timeout or self.timeout, self.timeout)
+            )
+        return result.exit_status
+
+
+class Worker:
+    """A process forked from the daemon that runs the scripts of the clients
+    it is handed, one at a time, so that a script that keeps the processor
+    busy doesn't hold up the scripts in the other workers
+    """
+
+    def __init__(self, timeout: float, daemon_sockets=()):
+        # The daemon hands clients to the worker and the worker says when it
+        # is done with each one over a pair of sockets
+        self.channel, worker_channel = socket.socketpair()
+        self.pid = os.fork()
+        if self.pid == 0:
+            # In the worker, serve clients and leave without going back
+            # through anything the daemon set up (eg. removing the socket)
+            exit_status = 1
+            try:
+                # Let go of the daemon's sockets so that they close when the
+                # daemon does
+                self.channel.close()
+                for daemon_socket in daemon_sockets:
+                    daemon_socket.close()
+                exit_status = run_worker(worker_channel, timeout)
+            finally:
+                os._exit(exit_status)
+        worker_channel.close()
+        self.channel.setblocking(False)
+
+    def __repr__(self):
+        return f'<Worker (pid {self.pid})>'
+
+    async def serve(self, connection) -> bool:
+        """Hand a client to the worker and wait for the worker to finish with
+        it. The daemon's copy of the connection is closed once it has been
+        handed over.
+
+        Args:
+            connection [socket.socket]: the connection to the client
+
+        Returns:
+            bool: True if the worker is ready for another client, False if it
+                has gone (eg. it was killed)
+
+        Raises:
+            None
+        """
+        try:
+            with connection:
+                socket.send_fds(self.channel, [b'c'], [connection.fileno()])
+            done = await asyncio.get_running_loop().sock_recv(self.channel, 1)
+        except OSError:
+            return False
+        return done == b'd'
+
+    def stop(self):
+        """Stop the worker and wait for it to finish
+
+        Args:
+            N/A
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        self.channel.close()
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(self.pid, signal.SIGTERM)
+        with contextlib.suppress(ChildProcessError):
+            os.waitpid(self.pid, 0)
+
+
+def run_worker(channel, timeout: float) -> int:
+    """Run the scripts of the clients the daemon hands a worker, one at a
+    time, until the daemon goes away
+
+    Args:
+        channel [socket.socket]: the worker's end of the pair of sockets it
+            shares with the daemon
+        timeout [float]: the longest a script can run for
+
+    Returns:
+        int: the exit status of the worker
+
+    Raises:
+        None
+    """
+
+    # Leave Ctrl-C to the daemon, which stops the workers itself, and stop
+    # straight away when it does
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.set_wakeup_fd(-1)
+    channel.setblocking(True)
+
+    # Scripts are kept loaded by the worker from one client to the next
+    runner = Daemon(timeout)
+    with asyncio.Runner() as event_loop:
+        while True:
+            # Wait for a client, stopping once the daemon has gone
+            try:
+                _, fds, _, _ = socket.recv_fds(channel, 1, 1)
+            except OSError:
+                return 0
+            if not fds:
+                return 0
+            event_loop.run(
+                runner.serve_connection(socket.socket(fileno=fds[0]))
+            )
+            # Let the daemon know the worker is ready for another client
+            try:
+                channel.sendall(b'd')
+            except OSError:
+                return 0
+
+
+def prepare_socket(socket_path: str):
+    """Get ready to listen on a socket, making sure another daemon isn't
+    using it and clearing it away if it was left behind
+
+    Args:
+        socket_path [str]: the path of the socket
+
+    Returns:
+        N/A
+
+    Raises:
+        ScriptExit: if another daemon is listening on the socket
+    """
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.remove(socket_path)
+            else:
+                messenger.simple_error(
+                    f'A daemon is already listening on {socket_path}.',
+                    error_code=31
+                )
+
+
+def open_listener(socket_path: str):
+    """Listen on a socket that only the user who started the daemon can
+    connect to. The socket can end up in a directory others can use (eg.
+    /tmp), so its permissions are set here rather than left to the umask.
+
+    Args:
+        socket_path [str]: the path of the socket
+
+    Returns:
+        socket.socket: the socket being listened on
+
+    Raises:
+        ScriptExit: if the socket can't be listened on
+    """
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(socket_path)
+        # Nothing can connect until the socket is listened on, so there is no
+        # moment when anyone else could
+        os.chmod(socket_path, 0o600)
+        listener.listen()
+    except OSError as error:
+        listener.close()
+        messenger.simple_error(
+            f'The daemon could not listen on {socket_path} ({error}).',
+            error_code=31
+        )
+    return listener
+
+
+def serve(socket_path: str, workers: int,
+          timeout: float = global_values.DAEMON_TIMEOUT) -> int:
+    """Listen on a socket and hand the clients that connect to a pool of
+    workers to run their scripts, until the daemon is stopped
+
+    Args:
+        socket_path [str]: the path of the socket
+        workers [int]: the number of workers, which is the most scripts that
+            are run at once
+        timeout [float]: the longest a script can run for, defaults to
+            DAEMON_TIMEOUT
+
+    Returns:
+        int: the exit status of the daemon
+
+    Raises:
+        None
+    """
+
+    prepare_socket(socket_path)
+    listener = open_listener(socket_path)
+    listener.setblocking(False)
+    # The workers, each of which runs one script at a time
+    pool = []
+
+    def get_daemon_sockets():
+        # The sockets a new worker lets go of
+        return [listener] + [worker.channel for worker in pool]
+
+    # Start the workers before the event loop so that they don't start with a
+    # copy of it
+    for _ in range(workers):
+        pool.append(Worker(timeout, get_daemon_sockets()))
+
+    async def hand_over(connection, idle):
+        # Wait for a worker to be free and hand it the client
+        worker = await idle.get()
+        if not await worker.serve(connection):
+            # Replace a worker that has gone
+            pool.remove(worker)
+            worker.stop()
+            worker = Worker(timeout, get_daemon_sockets())
+            pool.append(worker)
+        idle.put_nowait(worker)
+
+    async def listen():
+        # Stop in the same way for a SIGTERM as for Ctrl-C
+        event_loop = asyncio.get_running_loop()
+        event_loop.add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel
+        )
+        # The workers waiting for a client and the clients being handed over,
+        # which are kept so that they aren't lost part of the way through
+        idle = asyncio.Queue()
+        for worker in pool:
+            idle.put_nowait(worker)
+        handing_over = set()
+        print(
+            f'{global_values.LANG_NAME} daemon listening on {socket_path} ' +
+            f'({workers} workers)',
+            flush=True
+        )
+        while True:
+            connection, _ = await event_loop.sock_accept(listener)
+            task = asyncio.create_task(hand_over(connection, idle))
+            handing_over.add(task)
+            task.add_done_callback(handing_over.discard)
+
+    # Serve until the daemon is stopped (eg. with Ctrl-C), tidying up the
+    # workers and the socket afterwards
+    try:
+        asyncio.run(listen())
+    except asyncio.CancelledError:
+        pass
+    finally:
+        listener.close()
+        for worker in pool:
+            worker.stop()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    return 0
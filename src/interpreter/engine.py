@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import asyncio
+import io
+import threading
+
+# Language imports
+from interpreter import checks
+from maple import (
+    arborist, cambium, planter, sap, seed, seedbank, tree, xylem
+)
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that loads scripts into programs (see seed.Program) and runs them
+(see sap.Run). A program is loaded once and can then be run any number of
+times, in turn or in threads, within the one process.
+
+This is also the way to use the language from other Python code without
+starting an interpreter for each script:
+
+    from interpreter import engine
+
+    program = engine.compile_program('10 get name = "Name? "\n' +
+                                     '20 writeln "Hello #name"\n' +
+                                     '30 end')
+    result = engine.run_program(program, inputs=['World'])
+    result.exit_status, result.output, result.diagnostics
+
+A run that reports an error has an exit status of 1, as does one that times
+out or crashes.
+
+Programs can also be run on an asyncio event loop with run_program_async(),
+where pauses and waiting for input don't hold up other programs. None of
+these functions exit the process that calls them.
+'''
+
+# Loading plants the script in the tree module so only one script is loaded
+# at a time
+LOAD_LOCK = threading.Lock()
+
+
+class LoadError(Exception):
+    """Raised by compile_program() when a script has an error that stops it
+    from being loaded
+    """
+
+    def __init__(self, diagnostics, output: str = ''):
+        # The errors and warnings that were reported
+        self.diagnostics = tuple(diagnostics)
+        # The errors and warnings as they would have been written out
+        self.output = output
+        # Use the first error as the message
+        errors = [
+            diagnostic['message'] for diagnostic in self.diagnostics
+            if diagnostic['type'] == 'error'
+        ]
+        super().__init__(
+            errors[0] if errors else 'The script could not be loaded.'
+        )
+
+
+class Result:
+    """The result of running a program (see run_program())
+    """
+
+    def __init__(self, exit_status: int, output: str, diagnostics: tuple,
+                 variables: dict):
+        # The exit status of the run
+        self.exit_status = exit_status
+        # Everything the run wrote, including any errors and warnings
+        self.output = output
+        # The errors and warnings on their own
+        self.diagnostics = diagnostics
+        # The variables as they were when the run finished
+        self.variables = variables
+
+    def __repr__(self):
+        return f'<Result (exit status {self.exit_status}, ' + \
+            f'{len(self.diagnostics)} diagnostics)>'
+
+    @classmethod
+    def from_run(cls, run, recorder):
+        """Make the result of a finished run
+
+        Args:
+            run [sap.Run]: the finished run
+            recorder: the stream that kept everything the run wrote
+
+        Returns:
+            Result: the result
+
+        Raises:
+            None
+        """
+        return cls(
+            get_exit_status(run),
+            recorder.getvalue(),
+            tuple(run.diagnostics),
+            dict(run.variables)
+        )
+
+
+def load_program(source: str, name: str = '', drop_unreachable=False,
+                 profile: dict = None, check_cycles=True):
+    """Load a script into a program by checking it, planting it and having
+    the cambium work on it
+
+    Args:
+        source [str]: the source of the script
+        name [str]: the name of the script, defaults to an empty string
+        drop_unreachable [bool]: whether unreachable lines are dropped from
+            memory as well as execution, defaults to False
+        profile [dict]: the profile from the last run of the script (see
+            data.load_profile()), defaults to None for no profile
+        check_cycles [bool]: whether to check for loops that can never be
+            left, defaults to True
+
+    Returns:
+        seed.Program: the loaded program
+
+    Raises:
+        ScriptExit: if the script has an error
+    """
+
+    with LOAD_LOCK:
+        # Split the script into lines which will themselves serves as
+        # branches in Maple.
+        lines_of_script = source.split('\n')
+
+        # Have the arborist check in on the script and then prune the
+        # comments from it
+        checks.run_arborist_checks(lines_of_script)
+        lines_for_parsing = arborist.prune_comments(lines_of_script)
+
+        # Build the tokens, starting from an empty TOKEN_LIST as the tokens
+        # are added to the end of it
+        tree.set_tokens([])
+        token_planter = planter.build_tokens(lines_for_parsing)
+        # If index 0 is True, it means that the tokeniser has errored out so
+        # report the error.
+        if token_planter[0] is True:
+            # Index 3 is the line number, index 1 is the error message
+            messenger.line_error(
+                token_planter[1],
+                line_no=token_planter[3],
+                error_code=8
+            )
+        # Plant the tree
+        planter.build_tree()
+        # Leave out any lines that can never be executed, warning about them
+        # along the way
+        checks.run_reachability_checks(drop_unreachable)
+        # Work out anything that doesn't need to wait for the script to run
+        # (eg. write statements without variables)
+        cambium.fold_constants()
+        # Remove set statements whose values are never read
+        cambium.eliminate_dead_stores()
+        # Hoist anything that doesn't change out of loops
+        cambium.hoist_invariants()
+        # Work out where each jump statement goes ahead of time
+        cambium.resolve_jumps()
+        # Find the write statements whose output can be reused
+        cambium.find_cacheable_writes()
+        # Use the profile to optimise the lines that are executed the most
+        if profile is not None:
+            cambium.apply_profile(profile)
+        # Make sure that the script can't get stuck in a loop that it can
+        # never leave
+        if check_cycles:
+            checks.run_cycle_checks()
+
+        # Gather everything up into a program along with any warnings that
+        # were reported while loading it
+        loader = sap.CURRENT_RUN.get()
+        return seed.Program.from_tree(
+            name,
+            source,
+            diagnostics=() if loader is None else loader.diagnostics
+        )
+
+
+def compile_program(source: str, name: str = '', drop_unreachable=False,
+                    output=None):
+    """Load a script into a program without writing anything out. Any
+    warnings are kept in the diagnostics of the program.
+
+    Args:
+        source [str]: the source of the script
+        name [str]: the name of the script, defaults to an empty string
+        drop_unreachable [bool]: whether unreachable lines are dropped from
+            memory as well as execution, defaults to False
+        output [io.StringIO]: keeps the warnings as they would have been
+            written out, defaults to None
+
+    Returns:
+        seed.Program: the loaded program
+
+    Raises:
+        LoadError: if the script has an error
+    """
+
+    # Load the script as though it were a run of its own so that anything
+    # reported is kept rather than written out
+    loader = sap.Run(
+        None, output=io.StringIO() if output is None else output
+    )
+    token = sap.CURRENT_RUN.set(loader)
+    try:
+        return load_program(source, name, drop_unreachable=drop_unreachable)
+    except messenger.ScriptExit:
+        raise LoadError(
+            loader.diagnostics, loader.output.getvalue()
+        ) from None
+    finally:
+        sap.CURRENT_RUN.reset(token)
+
+
+def open_inputs(inputs):
+    """Get a stream to read the input of a run from
+
+    Args:
+        inputs: a list of lines, a string, a stream or None for no input
+
+    Returns:
+        the stream
+
+    Raises:
+        None
+    """
+    if inputs is None:
+        return io.StringIO()
+    if isinstance(inputs, str):
+        return io.StringIO(inputs)
+    if hasattr(inputs, 'readline'):
+        return inputs
+    return io.StringIO(''.join(f'{line}\n' for line in inputs))
+
+
+def get_exit_status(run) -> int:
+    """Get the exit status of a finished run. An error stops a script with an
+    exit status of 0 (see messenger.simple_error()), so a run that reported
+    an error is given an exit status of 1 for whatever ran it to tell that it
+    failed, in the same way as a run that timed out or crashed.
+
+    Args:
+        run [sap.Run]: the finished run
+
+    Returns:
+        int: the exit status of the run
+
+    Raises:
+        None
+    """
+    if run.exit_status == 0 and any(
+        diagnostic['type'] == 'error' for diagnostic in run.diagnostics
+    ):
+        return 1
+    return run.exit_status
+
+
+def report_crash(run, error: Exception):
+    """Note that a run was ended by something the interpreter didn't expect
+
+    Args:
+        run [sap.Run]: the run
+        error [Exception]: what ended the run
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    run.diagnostics.append({
+        'type': 'error',
+        'line_number': None,
+        'error_code': 0,
+        'message': f'{type(error).__name__}: {error}'
+    })
+    run.exit_status = 1
+
+
+def run_program(program, inputs=None, output=None) -> Result:
+    """Run a program from the start, keeping everything it writes
+
+    Args:
+        program [seed.Program]: the program to run
+        inputs: what get statements read from, which can be a list of
+            lines, a string or a stream. This defaults to None for no input
+            so that a get statement reports an error rather than waiting.
+        output: a stream that is also written to as the program runs (eg.
+            sys.stdout), defaults to None
+
+    Returns:
+        Result: the exit status, output, diagnostics and variables of the run
+
+    Raises:
+        None
+    """
+
+    # Keep everything that is written, passing it on to the output if there
+    # is one
+    recorder = io.StringIO() if output is None else \
+        seedbank.OutputRecorder(output)
+
+    run = sap.Run(program, output=recorder, input_stream=open_inputs(inputs))
+    try:
+        xylem.execute(run)
+    # Anything the interpreter didn't expect ends the run rather than the
+    # process that is running it
+    except Exception as error:
+        report_crash(run, error)
+
+    # Return the result
+    return Result.from_run(run, recorder)
+
+
+async def run_program_async(program, inputs=None, output=None,
+                            timeout: float = None) -> Result:
+    """Run a program from the start on an asyncio event loop, keeping
+    everything it writes. Pause and get statements wait without holding up
+    the loop (see xylem.execute_async()) so any number of programs can be run
+    at the same time (eg. with asyncio.gather()).
+
+    Args:
+        program [seed.Program]: the program to run
+        inputs: what get statements wait on, which can be a list of lines or
+            a string (as with run_program()), an asyncio.Queue of lines with
+            None marking the end of the input or anything with a readline()
+            coroutine (eg. an asyncio.StreamReader). This defaults to None
+            for no input.
+        output: a stream that is also written to as the program runs,
+            defaults to None
+        timeout [float]: the number of seconds the run can take before it is
+            stopped, defaults to None for no limit
+
+    Returns:
+        Result: the exit status, output, diagnostics and variables of the run
+
+    Raises:
+        asyncio.CancelledError: if the task running the program is cancelled
+    """
+
+    # Lines that are known up front are put in a queue to be waited on
+    if inputs is None or isinstance(inputs, (str, list, tuple)):
+        async_input = asyncio.Queue()
+        for line in open_inputs(inputs):
+            async_input.put_nowait(line)
+        async_input.put_nowait(None)
+    else:
+        async_input = inputs
+
+    # Keep everything that is written, passing it on to the output if there
+    # is one
+    recorder = io.StringIO() if output is None else \
+        seedbank.OutputRecorder(output)
+
+    run = sap.Run(program, output=recorder, async_input=async_input)
+    try:
+        async with asyncio.timeout(timeout):
+            await xylem.execute_async(run)
+    # If the run took too long, report it in the same way as any other error,
+    # with the exit status of a run that reported an error (see
+    # get_exit_status())
+    except TimeoutError:
+        token = sap.CURRENT_RUN.set(run)
+        try:
+            messenger.simple_error(
+                'The script was stopped as it ran for longer than ' +
+                f'{timeout} seconds.',
+                error_code=29,
+                exit=False
+            )
+        finally:
+            sap.CURRENT_RUN.reset(token)
+        run.exit_status = 1
+    # Anything the interpreter didn't expect ends the run rather than the
+    # event loop that is running it
+    except Exception as error:
+        report_crash(run, error)
+
+    # Return the result
+    return Result.from_run(run, recorder)
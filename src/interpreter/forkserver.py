@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import collections
+import gc
+import os
+import selectors
+import signal
+import time
+import warnings
+
+# Language imports
+from etc import global_values
+from interpreter import (checks, daemon, engine)
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that serves the same clients as the daemon (see the -f flag,
+interpreter/daemon.py and tools/hs_client.py) by forking a child for each
+script rather than running the scripts in the one process. The parent has
+the interpreter imported and keeps the scripts it has loaded, and freezes
+them out of the garbage collector's way before it forks, so each child starts
+with them already there and shares them with the parent until it changes
+them. A script that crashes or never stops only takes its own child with it.
+The parent waits on every client at once for the script it is sent, so a
+client that is slow to send it doesn't hold up the others.
+
+The parent reaps each child as it finishes and writes out its exit status.
+Ctrl-C (or a SIGTERM) stops the parent from taking new scripts and is passed
+on to the children as a Ctrl-C, so that each script stops in the same way as
+it would on its own (see checks.catch_interrupt()).
+'''
+
+# The number of seconds the parent waits for a client before checking on its
+# children
+REAP_INTERVAL = 0.5
+
+
+def receive(connection) -> tuple:
+    """Wait for a message from a client
+
+    Args:
+        connection [socket.socket]: the connection to the client
+
+    Returns:
+        tuple: the kind of message and its text
+
+    Raises:
+        ConnectionError: if the client has gone away
+    """
+    header = receive_bytes(connection, 1 + daemon.LENGTH_BYTES)
+    payload = receive_bytes(connection, int.from_bytes(header[1:]))
+    return header[:1], payload.decode('utf-8', 'replace')
+
+
+def take_request(connection, received: bytes) -> tuple:
+    """Read the next part of a request from a client without waiting,
+    reading no further than the end of the message
+
+    Args:
+        connection [socket.socket]: the connection to the client
+        received [bytes]: what the client has sent so far
+
+    Returns:
+        tuple: what the client has sent so far, and the kind of message and
+            its text once all of it has arrived (None until then)
+
+    Raises:
+        ConnectionError: if the client has gone away
+    """
+    header_length = 1 + daemon.LENGTH_BYTES
+    # Read the rest of the header, then the rest of the payload
+    if len(received) < header_length:
+        length = header_length
+    else:
+        length = header_length + int.from_bytes(received[1:header_length])
+    if len(received) < length:
+        chunk = connection.recv(length - len(received))
+        if not chunk:
+            raise ConnectionResetError('The client has gone away')
+        received += chunk
+
+    # The message is only complete once the payload has arrived too
+    if len(received) < header_length:
+        return received, None
+    length = header_length + int.from_bytes(received[1:header_length])
+    if len(received) < length:
+        return received, None
+    return received, (
+        received[:1], received[header_length:].decode('utf-8', 'replace')
+    )
+
+
+def receive_bytes(connection, length: int) -> bytes:
+    """Read a number of bytes from a client
+
+    Args:
+        connection [socket.socket]: the connection to the client
+        length [int]: the number of bytes
+
+    Returns:
+        bytes: the bytes
+
+    Raises:
+        ConnectionError: if the client has gone away
+    """
+    received = b''
+    while len(received) < length:
+        chunk = connection.recv(length - len(received))
+        if not chunk:
+            raise ConnectionResetError('The client has gone away')
+        received += chunk
+    return received
+
+
+class ClientOutput:
+    """Passes everything a script writes on to the client as it is written
+    """
+
+    def __init__(self, connection):
+        # The connection to the client
+        self.connection = connection
+
+    def write(self, text: str):
+        if text:
+            self.connection.sendall(daemon.encode_message(b'o', text))
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class ClientInput:
+    """Asks the client for each line of input a script needs (see
+    sap.Run.read_line())
+    """
+
+    def __init__(self, connection):
+        # The connection to the client
+        self.connection = connection
+
+    def readline(self) -> str:
+        self.connection.sendall(daemon.encode_message(b'i'))
+        # A client that has gone away has no more input
+        try:
+            kind, line = receive(self.connection)
+        except ConnectionError:
+            return ''
+        return line if kind == b'l' else ''
+
+
+def stop_at_timeout(timeout: float):
+    """Stop the script in this child once it has run for too long, reporting
+    it in the same way as the daemon does
+
+    Args:
+        timeout [float]: the number of seconds the script can run for
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    def timeout_handler(signal_number, frame):
+        messenger.simple_error(
+            'The script was stopped as it ran for longer than ' +
+            f'{timeout} seconds.',
+            error_code=29,
+            exit=False
+        )
+        raise messenger.ScriptExit(1)
+
+    signal.signal(signal.SIGALRM, timeout_handler)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+
+
+def run_child(connection, program, load_output: str, timeout: float) -> int:
+    """Run a script for a client in a child that has just been forked
+
+    Args:
+        connection [socket.socket]: the connection to the client
+        program [seed.Program]: the program, None if it couldn't be loaded
+        load_output [str]: what the interpreter would write out while loading
+            the script
+        timeout [float]: the longest the script can run for
+
+    Returns:
+        int: the exit status of the script
+
+    Raises:
+        None
+    """
+
+    # Stop on Ctrl-C in the same way as the interpreter, rather than in the
+    # way the parent does
+    checks.catch_interrupt()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    try:
+        # Pass on any warnings or errors from loading the script
+        if load_output:
+            connection.sendall(daemon.encode_message(b'o', load_output))
+        if program is None:
+            exit_status = 1
+        else:
+            # Run it, passing the output on to the client as it is written
+            # and leaving out the warnings that fill up the log (see
+            # daemon.Daemon.run_script())
+            stop_at_timeout(timeout)
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', SyntaxWarning)
+                    exit_status = engine.run_program(
+                        program,
+                        inputs=ClientInput(connection),
+                        output=ClientOutput(connection)
+                    ).exit_status
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        connection.sendall(daemon.encode_message(b'x', str(exit_status)))
+    # The client has gone away
+    except ConnectionError:
+        exit_status = 1
+    finally:
+        connection.close()
+
+    # Return the exit status
+    return exit_status
+
+
+def serve(socket_path: str, workers: int,
+          timeout: float = global_values.DAEMON_TIMEOUT) -> int:
+    """Listen on a socket and fork a child to run each script clients send,
+    until the parent is stopped
+
+    Args:
+        socket_path [str]: the path of the socket
+        workers [int]: the most children that are running at once
+        timeout [float]: the longest a script can run for, defaults to
+            DAEMON_TIMEOUT
+
+    Returns:
+        int: the exit status of the parent
+
+    Raises:
+        None
+    """
+    daemon.prepare_socket(socket_path)
+    program_cache = daemon.ProgramCache()
+    # The script each child is running keyed by the child's process ID
+    children = {}
+    # Whether the parent has been asked to stop
+    stopping = []
+
+    def stop_handler(signal_number, frame):
+        # Stop taking new scripts and pass the signal on to the children as
+        # a Ctrl-C so that their clients are told why the script stopped
+        stopping.append(signal_number)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGINT)
+            except ProcessLookupError:
+                pass
+
+    def reap(block: bool = False):
+        # Write out the exit status of each child that has finished
+        while children:
+            try:
+                pid, wait_status = os.waitpid(-1, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                children.clear()
+                return
+            if pid == 0:
+                return
+            script_name = children.pop(pid, '?')
+            print(
+                f'{script_name} (pid {pid}) exited with ' +
+                f'{os.waitstatus_to_exitcode(wait_status)}',
+                flush=True
+            )
+            if block:
+                return
+
+    def start_child(connection, script_name: str, script_timeout):
+        # Load the script here so that it is kept for the next child, and
+        # move everything the parent has so far out of the garbage
+        # collector's way so that the children don't copy it
+        program, load_output = program_cache.load(script_name)
+        gc.freeze()
+
+        pid = os.fork()
+        if pid == 0:
+            # In the child, run the script and leave without going back
+            # through anything the parent set up (eg. removing the socket)
+            exit_status = 1
+            try:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                for wakeup_end in wakeup:
+                    os.close(wakeup_end)
+                selector.close()
+                listener.close()
+                for other in list(pending) + [queued[0] for queued in ready]:
+                    other.close()
+                exit_status = run_child(
+                    connection,
+                    program,
+                    load_output,
+                    min(script_timeout or timeout, timeout)
+                )
+            finally:
+                os._exit(exit_status)
+
+        # In the parent, leave the connection to the child
+        connection.close()
+        children[pid] = script_name
+
+    def drop(connection):
+        # Give up on a client that hasn't sent a script
+        selector.unregister(connection)
+        del pending[connection]
+        connection.close()
+
+    def read_request(connection):
+        # Read what has arrived of a client's script, queueing the script
+        # once all of it has
+        received, _ = pending[connection]
+        try:
+            received, message = take_request(connection, received)
+            if message is None:
+                pending[connection][0] = received
+                return
+            kind, request = message
+            script_name, script_timeout = daemon.parse_request(request)
+        except (OSError, ValueError):
+            drop(connection)
+            return
+        if kind != b's':
+            drop(connection)
+            return
+        selector.unregister(connection)
+        del pending[connection]
+        connection.setblocking(True)
+        ready.append((connection, script_name, script_timeout))
+
+    signal.signal(signal.SIGINT, stop_handler)
+    signal.signal(signal.SIGTERM, stop_handler)
+    # Wake up as soon as a child finishes so that the next script can start
+    wakeup = os.pipe()
+    os.set_blocking(wakeup[1], False)
+    signal.signal(signal.SIGCHLD, lambda signal_number, frame: None)
+    signal.set_wakeup_fd(wakeup[1])
+
+    # The clients that haven't sent all of their script yet, with what they
+    # have sent and when they are given up on
+    pending = {}
+    # The scripts that are waiting for a child, with their clients
+    ready = collections.deque()
+    selector = selectors.DefaultSelector()
+    listener = daemon.open_listener(socket_path)
+    try:
+        listener.setblocking(False)
+        selector.register(listener, selectors.EVENT_READ)
+        selector.register(wakeup[0], selectors.EVENT_READ)
+        print(
+            f'{global_values.LANG_NAME} fork server listening on ' +
+            f'{socket_path} ({workers} workers)',
+            flush=True
+        )
+
+        while not stopping:
+            # Write out the children that have finished and start a child
+            # for each script there is now room for
+            reap()
+            while ready and len(children) < workers:
+                start_child(*ready.popleft())
+
+            # Wait for a client to connect or send some of its script,
+            # checking on the children every so often
+            for key, _ in selector.select(REAP_INTERVAL):
+                if key.fileobj == wakeup[0]:
+                    os.read(wakeup[0], 512)
+                    continue
+                if key.fileobj is not listener:
+                    read_request(key.fileobj)
+                    continue
+                try:
+                    connection, _ = listener.accept()
+                except BlockingIOError:
+                    continue
+                connection.setblocking(False)
+                selector.register(connection, selectors.EVENT_READ)
+                pending[connection] = [
+                    b'',
+                    time.monotonic() + global_values.DAEMON_REQUEST_TIMEOUT
+                ]
+
+            # Give up on clients that don't send a script in time
+            now = time.monotonic()
+            for connection, (_, deadline) in list(pending.items()):
+                if deadline <= now:
+                    drop(connection)
+
+        # Turn away the clients that were still waiting
+        for connection in list(pending):
+            drop(connection)
+        for connection, _, _ in ready:
+            connection.close()
+
+        # Let the children finish what they were doing
+        while children:
+            reap(block=True)
+    finally:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for wakeup_end in wakeup:
+            os.close(wakeup_end)
+        selector.close()
+        listener.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    return 0
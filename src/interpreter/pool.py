@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import concurrent.futures
+import io
+import sys
+import time
+
+# Language imports
+from etc import colourise
+from interpreter import (engine, subinterpreters)
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that runs many scripts at once on a pool of worker processes (see
+the -j flag), or of sub-interpreters within the one process (see the -i flag
+and interpreter/subinterpreters.py). The workers stay around from one script
+to the next so each script only pays for being loaded and run, not for
+starting Python. The output of each script is kept by its worker and written
+out in one piece once the script has finished.
+'''
+
+
+def run_script(script_name: str) -> dict:
+    """Load and run a script in a worker, keeping its output. The script has
+    no input so a get statement reports an error rather than waiting.
+
+    Args:
+        script_name [str]: the name of the script
+
+    Returns:
+        dict: the exit status, output, number of errors and run time of the
+            script
+
+    Raises:
+        None
+    """
+    start_time = time.perf_counter()
+
+    # Read the script
+    try:
+        with open(script_name, 'r') as script:
+            contents = script.read()
+    except OSError:
+        return {
+            'exit_status': 1,
+            'output': 'The script could not be found. Double check that ' +
+            'the file exists.\n',
+            'errors': 1,
+            'run_time': time.perf_counter() - start_time
+        }
+
+    # Return how the script went, counting reading it as part of its time
+    summary = run_source(contents, script_name)
+    summary['run_time'] = time.perf_counter() - start_time
+    return summary
+
+
+def run_source(contents: str, script_name: str = '') -> dict:
+    """Load and run the source of a script in a worker, keeping its output.
+    The script has no input so a get statement reports an error rather than
+    waiting.
+
+    Args:
+        contents [str]: the source of the script
+        script_name [str]: the name of the script, defaults to an empty
+            string
+
+    Returns:
+        dict: the exit status, output, number of errors and run time of the
+            script
+
+    Raises:
+        None
+    """
+    start_time = time.perf_counter()
+
+    # Load and run the script, keeping any warnings from loading it to go
+    # ahead of its output
+    warnings = io.StringIO()
+    try:
+        program = engine.compile_program(
+            contents, script_name, output=warnings
+        )
+        result = engine.run_program(program)
+        exit_status = result.exit_status
+        output = warnings.getvalue() + result.output
+        diagnostics = program.diagnostics + result.diagnostics
+    # A script with an error doesn't get run, in the same way as it isn't
+    # when run on its own, and fails like a script with an error when run
+    # (see engine.get_exit_status())
+    except engine.LoadError as load_error:
+        exit_status = 1
+        output = load_error.output
+        diagnostics = load_error.diagnostics
+
+    # Return how the script went
+    return {
+        'exit_status': exit_status,
+        'output': output,
+        'errors': len([
+            diagnostic for diagnostic in diagnostics
+            if diagnostic['type'] == 'error'
+        ]),
+        'run_time': time.perf_counter() - start_time
+    }
+
+
+def run_scripts(script_names: list, workers: int,
+                use_subinterpreters=False) -> int:
+    """Run scripts on a pool of workers, writing out the output of each
+    script in one piece as it finishes and then a summary of how each script
+    went
+
+    Args:
+        script_names [list]: the names of the scripts
+        workers [int]: the number of workers
+        use_subinterpreters [bool]: whether the workers are sub-interpreters
+            rather than processes, defaults to False
+
+    Returns:
+        int: 0 if every script exited with 0 and 1 otherwise
+
+    Raises:
+        None
+    """
+    start_time = time.perf_counter()
+    # How each script went, in the order the scripts were passed so that a
+    # script passed more than once is summarised each time
+    summaries = [None] * len(script_names)
+
+    if use_subinterpreters:
+        executor = subinterpreters.SubinterpreterPool(workers)
+        worker_kind = 'sub-interpreters'
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(workers)
+        worker_kind = 'workers'
+
+    with executor:
+        # Hand the scripts to the workers, keeping where each one was passed
+        futures = {
+            executor.submit(run_script, script_name): position
+            for position, script_name in enumerate(script_names)
+        }
+        # Write out the output of each script as it finishes
+        for future in concurrent.futures.as_completed(futures):
+            position = futures[future]
+            script_name = script_names[position]
+            try:
+                summary = future.result()
+            # If a worker is lost (eg. it was killed), carry on with the rest
+            except Exception as error:
+                summary = {
+                    'exit_status': 1,
+                    'output': f'{type(error).__name__}: {error}\n',
+                    'errors': 1,
+                    'run_time': 0.0
+                }
+            summaries[position] = summary
+            print_output(script_name, summary)
+
+    # Write out the summary in the order the scripts were passed
+    return print_summary(
+        f'{workers} {worker_kind}',
+        list(zip(script_names, summaries)),
+        time.perf_counter() - start_time
+    )
+
+
+def print_output(script_name: str, summary: dict):
+    """Write out the output of a script in one piece under its name
+
+    Args:
+        script_name [str]: the name of the script
+        summary [dict]: how the script went (see run_script())
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    sys.stdout.write(
+        colourise.cyan(f':: {script_name} ::') + '\n' + summary['output']
+    )
+    if summary['output'] and not summary['output'].endswith('\n'):
+        sys.stdout.write('\n')
+    sys.stdout.flush()
+
+
+def print_summary(heading: str, summaries: list, total_time: float) -> int:
+    """Write out how each script went
+
+    Args:
+        heading [str]: what ran the scripts (eg. '4 workers')
+        summaries [list]: the name of each script along with how it went
+            (see run_script())
+        total_time [float]: the number of seconds all of the scripts took
+
+    Returns:
+        int: 0 if every script exited with 0 and 1 otherwise
+
+    Raises:
+        None
+    """
+    padding = max(
+        (len(script_name) for script_name, _ in summaries), default=0
+    )
+    print(colourise.yellow(f'\n:: SUMMARY ({heading}) ::'))
+    for script_name, summary in summaries:
+        print(
+            f'\t{script_name.ljust(padding)}  ' +
+            f'exit {summary["exit_status"]}  ' +
+            f'errors {summary["errors"]}  ' +
+            f'{summary["run_time"]:.3f}s'
+        )
+    print(f'\tTotal: {total_time:.3f}s')
+
+    # Return whether every script exited with 0
+    return 0 if all(
+        summary['exit_status'] == 0 for _, summary in summaries
+    ) else 1
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import codecs
+import io
+import json
+import os
+import select
+import signal
+import time
+
+# Setting limits on a process is only possible on Unix-like systems
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Language imports
+from etc import global_values
+from interpreter import engine
+from maple import (sap, xylem)
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that runs scripts that can't be trusted in a child process with
+limits on what they can use (see the -x flag):
+
+    from interpreter import sandbox
+
+    summary = sandbox.run_sandboxed(
+        source, limits=sandbox.Limits(statements=10000, timeout=2)
+    )
+    summary['output'], summary['limit']
+
+Each limit stops the script with an error of its own:
+
+    statements  the number of statements executed (error 30), checked every
+                SCHEDULER_QUANTUM statements
+    timeout     the number of seconds the script runs for (error 29)
+    memory      the number of bytes the child can allocate on top of what the
+                interpreter already uses (error 34), set with setrlimit()
+    output      the number of bytes the script can write (error 35)
+
+Calculations are never handed to eval(). Only arithmetic and comparisons on
+literals are worked out (see helpers.calculate_sandboxed()), so a script
+can't call anything to import modules or open files. A big enough
+calculation (eg. a huge power) still holds up the child without giving the
+timeout a chance to stop it, so the parent kills a child that is still going
+SANDBOX_GRACE seconds after its timeout and reports the timeout itself.
+'''
+
+
+class Limits:
+    """The limits a sandboxed script runs within, with None for no limit
+    """
+
+    def __init__(self, statements: int = global_values.SANDBOX_STATEMENTS,
+                 timeout: float = global_values.SANDBOX_TIMEOUT,
+                 memory: int = global_values.SANDBOX_MEMORY,
+                 output: int = global_values.SANDBOX_OUTPUT):
+        self.statements = statements
+        self.timeout = timeout
+        self.memory = memory
+        self.output = output
+
+    def __repr__(self):
+        return f'<Limits statements={self.statements} ' + \
+            f'timeout={self.timeout} memory={self.memory} ' + \
+            f'output={self.output}>'
+
+
+class OutputLimitError(Exception):
+    """Raised by LimitedOutput when a script writes more than it can
+    """
+
+
+class LimitedOutput:
+    """Passes on what a script writes until it has written too much. Once it
+    has, anything else (eg. the error saying so) is passed on as it is.
+    """
+
+    def __init__(self, stream, limit: int):
+        # The stream written to and the number of bytes that can be written
+        self.stream = stream
+        self.limit = limit
+        self.written = 0
+        self.exceeded = False
+
+    def write(self, text: str):
+        if self.limit is not None and not self.exceeded:
+            data = text.encode('utf-8', 'replace')
+            if self.written + len(data) > self.limit:
+                # Write what fits (without splitting a character) and stop
+                self.exceeded = True
+                fits = data[:self.limit - self.written]
+                self.stream.write(fits.decode('utf-8', 'ignore'))
+                raise OutputLimitError(
+                    'The script was stopped as it wrote more than its ' +
+                    f'limit of {self.limit} bytes.'
+                )
+            self.written += len(data)
+        self.stream.write(text)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def set_memory_limit(memory: int):
+    """Stop the process from allocating more than a number of bytes on top
+    of what it has already
+
+    Args:
+        memory [int]: the number of bytes
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Start from the size of the process, which is only known on Linux
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            pages = int(statm.read().split()[0])
+        in_use = pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        in_use = 0
+    resource.setrlimit(
+        resource.RLIMIT_AS, (in_use + memory, in_use + memory)
+    )
+
+
+def stop_at_timeout(timeout: float):
+    """Stop the script in this child once it has run for too long by
+    raising TimeoutError wherever it is
+
+    Args:
+        timeout [float]: the number of seconds the script can run for
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    def timeout_handler(signal_number, frame):
+        raise TimeoutError(
+            'The script was stopped as it ran for longer than ' +
+            f'{timeout} seconds.'
+        )
+
+    signal.signal(signal.SIGALRM, timeout_handler)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+
+
+def report_limit(run, message: str, error_code: int):
+    """Stop a run that has gone over one of its limits, reporting it in the
+    same way as any other error
+
+    Args:
+        run [sap.Run]: the run
+        message [str]: what went wrong
+        error_code [int]: the error code
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    token = sap.CURRENT_RUN.set(run)
+    try:
+        messenger.simple_error(message, error_code=error_code, exit=False)
+    finally:
+        sap.CURRENT_RUN.reset(token)
+    run.exit_status = 1
+
+
+def run_child(source: str, script_name: str, inputs, limits: Limits,
+              output) -> dict:
+    """Load and run a script within its limits in a child that has just been
+    forked
+
+    Args:
+        source [str]: the source of the script
+        script_name [str]: the name of the script
+        inputs: what get statements read from (see engine.run_program())
+        limits [Limits]: the limits
+        output: the stream the output is written to
+
+    Returns:
+        dict: the exit status, number of errors and the limit the script
+            went over (None if it didn't)
+
+    Raises:
+        None
+    """
+    output = LimitedOutput(output, limits.output)
+    if limits.memory is not None:
+        set_memory_limit(limits.memory)
+
+    # Load the script, which doesn't get run if it has an error
+    load_output = io.StringIO()
+    try:
+        program = engine.compile_program(
+            source, script_name, output=load_output
+        )
+    except engine.LoadError as load_error:
+        output.write(load_error.output)
+        return {'exit_status': 1, 'errors': 1, 'limit': None}
+    output.write(load_output.getvalue())
+
+    # The script has its timeout from when it starts running
+    if limits.timeout is not None:
+        stop_at_timeout(limits.timeout)
+
+    # Run the script a slice at a time, checking the statement limit after
+    # each slice
+    run = sap.Run(
+        program, output=output, input_stream=engine.open_inputs(inputs)
+    )
+    run.sandboxed = True
+    slices = xylem.execute_slices(run, global_values.SCHEDULER_QUANTUM)
+    limit = None
+    try:
+        while True:
+            try:
+                wait = next(slices)
+            except StopIteration:
+                break
+            if limits.statements is not None and \
+                    run.statements_executed > limits.statements:
+                slices.close()
+                limit = 'statements'
+                report_limit(
+                    run,
+                    'The script was stopped as it executed more than its ' +
+                    f'limit of {limits.statements} statements.',
+                    30
+                )
+                break
+            if wait > 0:
+                time.sleep(wait)
+    except TimeoutError as error:
+        limit = 'timeout'
+        report_limit(run, str(error), 29)
+    except OutputLimitError as error:
+        limit = 'output'
+        report_limit(run, str(error), 35)
+    except MemoryError:
+        limit = 'memory'
+        report_limit(
+            run,
+            'The script was stopped as it used more than its limit of ' +
+            f'{limits.memory} bytes of memory.',
+            34
+        )
+    # Anything the interpreter didn't expect ends the run
+    except Exception as error:
+        engine.report_crash(run, error)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    output.flush()
+
+    # Return how the script went
+    return {
+        'exit_status': engine.get_exit_status(run),
+        'errors': len([
+            diagnostic for diagnostic in run.diagnostics
+            if diagnostic['type'] == 'error'
+        ]),
+        'limit': limit
+    }
+
+
+def run_sandboxed(source: str, script_name: str = '', inputs=None,
+                  limits: Limits = None, output=None) -> dict:
+    """Run a script in a child process within limits
+
+    Args:
+        source [str]: the source of the script
+        script_name [str]: the name of the script, defaults to an empty
+            string
+        inputs: what get statements read from, which can be a list of lines,
+            a string or a stream (eg. sys.stdin). This defaults to None for
+            no input.
+        limits [Limits]: the limits, defaults to None for the SANDBOX_
+            limits in global_values
+        output: a stream the output is also written to as it arrives (eg.
+            sys.stdout), defaults to None
+
+    Returns:
+        dict: the exit status, output, number of errors, run time and the
+            limit the script went over (statements, timeout, memory, output
+            or None)
+
+    Raises:
+        RuntimeError: if scripts can't be sandboxed on this system
+    """
+    if resource is None or not hasattr(os, 'fork'):
+        raise RuntimeError('Scripts can only be sandboxed on Unix')
+    limits = Limits() if limits is None else limits
+    start_time = time.perf_counter()
+
+    # The child writes the output of the script on one pipe and how it went
+    # on the other
+    output_read, output_write = os.pipe()
+    result_read, result_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # In the child, run the script and leave without going back through
+        # anything the parent set up
+        exit_status = 1
+        try:
+            os.close(output_read)
+            os.close(result_read)
+            with open(output_write, 'w', encoding='utf-8') as child_output:
+                result = run_child(
+                    source, script_name, inputs, limits, child_output
+                )
+            os.write(result_write, json.dumps(result).encode('utf-8'))
+            exit_status = 0
+        finally:
+            os._exit(exit_status)
+    os.close(output_write)
+    os.close(result_write)
+
+    # Pass on the output as it arrives, killing the child if it is still
+    # going a little after its timeout
+    deadline = None if limits.timeout is None else \
+        time.monotonic() + limits.timeout + global_values.SANDBOX_GRACE
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    chunks = []
+    timed_out = False
+    try:
+        while True:
+            wait = None if deadline is None else \
+                max(deadline - time.monotonic(), 0)
+            if not select.select([output_read], [], [], wait)[0]:
+                os.kill(pid, signal.SIGKILL)
+                timed_out = True
+                break
+            data = os.read(output_read, 65536)
+            if not data:
+                break
+            chunk = decoder.decode(data)
+            if chunk:
+                chunks.append(chunk)
+                if output is not None:
+                    output.write(chunk)
+                    output.flush()
+        _, wait_status = os.waitpid(pid, 0)
+        result = b''
+        while (chunk := os.read(result_read, 65536)):
+            result += chunk
+    finally:
+        os.close(output_read)
+        os.close(result_read)
+
+    # A child that didn't send back how it went was either killed here or
+    # crashed, so the error is reported here
+    try:
+        summary = json.loads(result)
+    except ValueError:
+        if timed_out:
+            message = 'The script was stopped as it ran for longer than ' + \
+                f'{limits.timeout} seconds.'
+            summary = {'exit_status': 1, 'errors': 1, 'limit': 'timeout'}
+            error_code = 29
+        else:
+            message = 'The script stopped unexpectedly (exit status ' + \
+                f'{os.waitstatus_to_exitcode(wait_status)}).'
+            summary = {'exit_status': 1, 'errors': 1, 'limit': None}
+            error_code = 0
+        report = sap.Run(None, output=io.StringIO())
+        report_limit(report, message, error_code)
+        chunks.append(report.output.getvalue())
+        if output is not None:
+            output.write(report.output.getvalue())
+
+    # Return how the script went
+    summary['output'] = ''.join(chunks)
+    summary['run_time'] = time.perf_counter() - start_time
+    return summary
+
+
+def run_script(script_name: str, inputs=None, output=None) -> int:
+    """Run a script in the sandbox with the SANDBOX_ limits in global_values
+    (see the -x flag)
+
+    Args:
+        script_name [str]: the name of the script
+        inputs: what get statements read from, defaults to None for no input
+        output: the stream the output is written to as it arrives, defaults
+            to None
+
+    Returns:
+        int: the exit status of the script
+
+    Raises:
+        ScriptExit: if the script can't be found
+    """
+    try:
+        with open(script_name, 'r') as script:
+            source = script.read()
+    except OSError:
+        messenger.simple_error(
+            'The script could not be found. Double check that the file ' +
+            'exists.',
+            error_code=9
+        )
+    return run_sandboxed(
+        source, script_name, inputs=inputs, output=output
+    )['exit_status']
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import io
+import time
+
+# Language imports
+from etc import global_values
+from interpreter import engine
+from maple import (sap, seedbank, xylem)
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that runs many programs in one thread by taking turns. Each run
+executes a slice of statements at a time (see xylem.execute_slices()) and the
+scheduler moves round the runs in the order they were added, so one run that
+never stops (or waits on its input) can't keep the others from running:
+
+    from interpreter import (engine, scheduler)
+
+    runs = scheduler.Scheduler()
+    first = runs.add(engine.compile_program(source), priority=2)
+    second = runs.add(engine.compile_program(other_source),
+                      statement_limit=10000)
+    results = runs.run()
+    results[first].output
+'''
+
+
+class ScheduledRun:
+    """A run of a program that takes turns with other runs in a scheduler
+    """
+
+    def __init__(self, run_id: int, run, recorder, priority: int,
+                 statement_limit: int, quantum: int):
+        # The number the scheduler knows the run by
+        self.run_id = run_id
+        # The run and the stream that keeps everything it writes
+        self.run = run
+        self.recorder = recorder
+        # The number of slices the run gets each time round
+        self.priority = priority
+        # The most statements the run can execute, None for no limit
+        self.statement_limit = statement_limit
+        # The slices of the run, one for each turn
+        self.slices = xylem.execute_slices(run, quantum)
+        # When the run can next take a turn (eg. after a pause)
+        self.wake_time = 0.0
+        # Why the run is to be stopped, None unless it has been killed
+        self.kill_reason = None
+        # The result once the run has finished
+        self.result = None
+
+    def __repr__(self):
+        return f'<ScheduledRun {self.run_id} ' + \
+            f'({self.run.statements_executed} statements)>'
+
+
+class Scheduler:
+    """Runs many programs in one thread, a slice at a time
+    """
+
+    def __init__(self, quantum: int = None):
+        # The most statements a run executes in a slice
+        self.quantum = quantum or global_values.SCHEDULER_QUANTUM
+        # The runs keyed by their number, in the order they take turns
+        self.runs = {}
+        # The number the next run is known by
+        self.next_run_id = 0
+
+    def add(self, program, inputs=None, output=None, priority: int = 1,
+            statement_limit: int = None) -> int:
+        """Add a run of a program to the scheduler
+
+        Args:
+            program [seed.Program]: the program to run
+            inputs: what get statements read from (see engine.run_program())
+            output: a stream that is also written to as the program runs,
+                defaults to None
+            priority [int]: the number of slices the run gets each time
+                round, defaults to 1
+            statement_limit [int]: the most statements the run can execute
+                before it is stopped, defaults to None for no limit. This is
+                checked after each slice.
+
+        Returns:
+            int: the number the run is known by
+
+        Raises:
+            None
+        """
+
+        # Keep everything that is written, passing it on to the output if
+        # there is one
+        recorder = io.StringIO() if output is None else \
+            seedbank.OutputRecorder(output)
+        run = sap.Run(
+            program, output=recorder, input_stream=engine.open_inputs(inputs)
+        )
+
+        # Add the run to the end of the queue
+        run_id = self.next_run_id
+        self.next_run_id += 1
+        self.runs[run_id] = ScheduledRun(
+            run_id,
+            run,
+            recorder,
+            max(int(priority), 1),
+            statement_limit,
+            self.quantum
+        )
+
+        # Return the number the run is known by
+        return run_id
+
+    def kill(self, run_id: int):
+        """Stop a run before its next slice
+
+        Args:
+            run_id [int]: the number the run is known by
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        scheduled = self.runs[run_id]
+        if scheduled.result is None:
+            scheduled.kill_reason = 'The script was killed after ' + \
+                f'{scheduled.run.statements_executed} statements.'
+
+    def stop(self, scheduled: ScheduledRun):
+        """Stop a run that has been killed, reporting why in the same way as
+        any other error
+
+        Args:
+            scheduled [ScheduledRun]: the run to stop
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        scheduled.slices.close()
+        token = sap.CURRENT_RUN.set(scheduled.run)
+        try:
+            messenger.simple_error(
+                scheduled.kill_reason, error_code=30, exit=False
+            )
+        finally:
+            sap.CURRENT_RUN.reset(token)
+        scheduled.run.exit_status = 1
+        self.finish(scheduled)
+
+    def finish(self, scheduled: ScheduledRun):
+        """Keep the result of a run that has finished
+
+        Args:
+            scheduled [ScheduledRun]: the run that has finished
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        scheduled.result = engine.Result.from_run(
+            scheduled.run, scheduled.recorder
+        )
+
+    def take_turn(self, scheduled: ScheduledRun):
+        """Execute the slices of a run for one time round
+
+        Args:
+            scheduled [ScheduledRun]: the run whose turn it is
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        for _ in range(scheduled.priority):
+            # Execute a slice
+            try:
+                wait = next(scheduled.slices)
+            # The run has finished
+            except StopIteration:
+                self.finish(scheduled)
+                return
+            # Anything the interpreter didn't expect ends the run rather than
+            # the scheduler
+            except Exception as error:
+                engine.report_crash(scheduled.run, error)
+                self.finish(scheduled)
+                return
+
+            # Stop the run if it has gone over its limit
+            if scheduled.statement_limit is not None and \
+                    scheduled.run.statements_executed > \
+                    scheduled.statement_limit:
+                scheduled.kill_reason = 'The script was stopped as it ' + \
+                    'executed more than its limit of ' + \
+                    f'{scheduled.statement_limit} statements.'
+                self.stop(scheduled)
+                return
+
+            # A pause ends the turn until it is over
+            if wait > 0:
+                scheduled.wake_time = time.monotonic() + wait
+                return
+
+    def step(self) -> bool:
+        """Give each run that is ready its turn, in the order they were added
+
+        Args:
+            N/A
+
+        Returns:
+            bool: True if there are runs that haven't finished
+
+        Raises:
+            None
+        """
+        now = time.monotonic()
+        for scheduled in list(self.runs.values()):
+            # Leave out runs that have finished
+            if scheduled.result is not None:
+                continue
+            # Stop runs that have been killed
+            if scheduled.kill_reason is not None:
+                self.stop(scheduled)
+            # Give the run its turn if it isn't paused
+            elif scheduled.wake_time <= now:
+                self.take_turn(scheduled)
+
+        # Return whether there is anything left to run
+        return any(
+            scheduled.result is None for scheduled in self.runs.values()
+        )
+
+    def run(self) -> dict:
+        """Run everything that has been added until it has all finished
+
+        Args:
+            N/A
+
+        Returns:
+            dict: the result of each run (see engine.Result) keyed by the
+                number it is known by
+
+        Raises:
+            None
+        """
+        while self.step():
+            # If every run is paused, sleep until the first one is ready
+            wake_times = [
+                scheduled.wake_time for scheduled in self.runs.values()
+                if scheduled.result is None
+            ]
+            delay = min(wake_times) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        # Return the results
+        return {
+            run_id: scheduled.result
+            for run_id, scheduled in self.runs.items()
+        }
+
+    def get_accounting(self) -> dict:
+        """Get the number of statements each run has executed so far
+
+        Args:
+            N/A
+
+        Returns:
+            dict: the statements executed, priority and whether it has
+                finished for each run, keyed by the number it is known by
+
+        Raises:
+            None
+        """
+        return {
+            run_id: {
+                'statements_executed': scheduled.run.statements_executed,
+                'priority': scheduled.priority,
+                'finished': scheduled.result is not None
+            }
+            for run_id, scheduled in self.runs.items()
+        }
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import io
+import os
+import queue
+import stat
+import sys
+import threading
+
+# Language imports
+from etc import colourise
+from interpreter import (checks, engine)
+from maple import (arborist, planter, sap, seed, tree, values, xylem)
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that executes a script as it is read (see the - script name), rather
+than waiting for all of it, so that a script that is generated and piped in
+starts writing its output as soon as its first lines arrive:
+
+    generate.py | hs -
+    hs script.fifo               (a named pipe is read in the same way)
+
+A thread reads the lines of the script into a queue as they arrive and each
+line is checked and planted once execution reaches it. A jump back goes to a
+line that was already planted, while a jump forward waits for its line to
+arrive. As the script is never seen as a whole, it isn't checked for lines
+that can't be reached and the cambium doesn't work on it ahead of time. A
+loop that can't be left is checked the first time it is closed, once all
+of its lines have arrived, and stops the script before it goes around
+again. A script that is piped in has no input left for its get
+statements.
+'''
+
+
+def is_streamed(script_name: str) -> bool:
+    """Check whether a script is executed as it is read, that is, it is piped
+    in (ie. passed as -) or is a named pipe
+
+    Args:
+        script_name [str]: the name of the script
+
+    Returns:
+        bool: True if the script is executed as it is read
+
+    Raises:
+        None
+    """
+    if script_name == '-':
+        return True
+    try:
+        return stat.S_ISFIFO(os.stat(script_name).st_mode)
+    except OSError:
+        return False
+
+
+def read_lines(stream, line_queue: queue.Queue):
+    """Read the lines of a script into a queue as they arrive, followed by
+    None once there are no more. This runs on a thread of its own.
+
+    Args:
+        stream: the stream the script is read from
+        line_queue [queue.Queue]: the queue the lines are put on
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    try:
+        for line in stream:
+            line_queue.put(line)
+    finally:
+        line_queue.put(None)
+
+
+def plant_line(line: str) -> list:
+    """Plant a single line of a script
+
+    Args:
+        line [str]: the line
+
+    Returns:
+        list: the tokens of the line
+
+    Raises:
+        ScriptExit: if the line can't be tokenised
+    """
+    with engine.LOAD_LOCK:
+        tree.set_tokens([])
+        token_planter = planter.build_tokens([line])
+        # If index 0 is True, it means that the tokeniser has errored out so
+        # report the error
+        if token_planter[0] is True:
+            tree.set_tokens([])
+            messenger.line_error(
+                token_planter[1],
+                line_no=token_planter[3],
+                error_code=8
+            )
+        token_tree = planter.build_tree()
+        tree.set_tokens([])
+    return next(iter(token_tree.values()))
+
+
+class StreamedScript:
+    """The lines of a script that is being read, planted as execution
+    reaches them
+    """
+
+    def __init__(self, stream):
+        # The lines that have arrived but haven't been planted yet, read by a
+        # thread of their own
+        self.line_queue = queue.Queue()
+        self.reader = threading.Thread(
+            target=read_lines, args=(stream, self.line_queue), daemon=True
+        )
+        self.reader.start()
+        # The tokens of each line that has been planted, in order, along
+        # with where each line number is in them
+        self.lines = []
+        self.positions = {}
+        # The line number of the last line that arrived and whether all of
+        # the lines have
+        self.last_line_number = None
+        self.finished = False
+
+    def check_line_number(self, line_number: str):
+        """Check the line number of a line that has arrived against the lines
+        before it (see checks.run_arborist_checks())
+
+        Args:
+            line_number [str]: the line number
+
+        Returns:
+            N/A
+
+        Raises:
+            ScriptExit: if the line number isn't valid or is out of order
+        """
+        if not line_number.isnumeric():
+            messenger.simple_error(
+                f'A line of code has an invalid line number: {line_number}.',
+                error_code=4
+            )
+        if self.last_line_number is None:
+            if int(line_number) == 0:
+                messenger.simple_error(
+                    'The first line starts with 0. You need to start the ' +
+                    'first line with an integer greater than 0.',
+                    error_code=7
+                )
+        elif int(line_number) == self.last_line_number:
+            messenger.simple_error(
+                'There are duplicate line numbers in the script: ' +
+                line_number,
+                error_code=2
+            )
+        elif int(line_number) < self.last_line_number:
+            messenger.simple_error(
+                'The lines are not sequentially ordered in the script. ' +
+                f'Line {line_number} comes after line ' +
+                f'{self.last_line_number}.',
+                error_code=3
+            )
+        self.last_line_number = int(line_number)
+
+    def load_line(self) -> bool:
+        """Wait for the next line of the script to arrive and plant it,
+        skipping blank lines and comments
+
+        Args:
+            N/A
+
+        Returns:
+            bool: False if there are no more lines
+
+        Raises:
+            ScriptExit: if the line has an error
+        """
+        while not self.finished:
+            line = self.line_queue.get()
+            if line is None:
+                self.finished = True
+                break
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            self.check_line_number(parts[0])
+            if not arborist.prune_comments([line]):
+                continue
+            self.positions[int(parts[0])] = len(self.lines)
+            self.lines.append(plant_line(line.strip()))
+            return True
+        return False
+
+    def find_line(self, line_number: int) -> int:
+        """Find where a line is, waiting for the lines up to it to arrive if
+        it hasn't yet
+
+        Args:
+            line_number [int]: the line number
+
+        Returns:
+            int: the position of the line, None if the script doesn't have it
+
+        Raises:
+            ScriptExit: if a line that arrives has an error
+        """
+        while line_number not in self.positions and (
+                self.last_line_number is None or
+                line_number > self.last_line_number
+        ):
+            if not self.load_line():
+                break
+        return self.positions.get(line_number)
+
+
+def take_jump(script: StreamedScript, tokens: list) -> int:
+    """Work out where a jump statement goes (see stmt_jump.stmt_jump())
+
+    Args:
+        script [StreamedScript]: the script
+        tokens [list]: the tokens of the jump statement
+
+    Returns:
+        int: the position of the line that is jumped to
+
+    Raises:
+        ScriptExit: if the line that is jumped to isn't valid
+    """
+    line_number = tokens[2]['script_line_number']
+    jump_location = tokens[2]['token_value'].strip('"')
+    try:
+        jump_location_integer = int(jump_location)
+    except ValueError:
+        messenger.line_error(
+            'The line number that you are planning to jump to is not a ' +
+            f'number: {colourise.yellow(jump_location)}.',
+            line_no=line_number,
+            error_code=21
+        )
+    position = script.find_line(jump_location_integer)
+    if position is None:
+        messenger.line_error(
+            'The line that you have requested be jumped to - ' +
+            f'{jump_location} - does not exist.',
+            line_no=line_number,
+            error_code=23
+        )
+    return position
+
+
+def execute_stream(run, script: StreamedScript) -> int:
+    """Execute a run of a script as its lines arrive
+
+    Args:
+        run [sap.Run]: the run
+        script [StreamedScript]: the script
+
+    Returns:
+        int: the exit status of the run, which is also kept in the run
+
+    Raises:
+        None
+    """
+    token = sap.CURRENT_RUN.set(run)
+    position = 0
+    # The jumps back that have had the loop they close checked
+    checked_jumps = set()
+    try:
+        while True:
+            # Wait for the next line if it hasn't arrived. A script that runs
+            # out of lines didn't end with an end statement.
+            if position == len(script.lines) and not script.load_line():
+                if not script.lines:
+                    messenger.simple_error(
+                        'There were no lines to execute. The last line of ' +
+                        'your code needs to be an end statement.',
+                        error_code=5
+                    )
+                tokens = script.lines[-1]
+                messenger.line_error(
+                    f'{tokens[1]["token_value"]} is not an end statement. ' +
+                    'The last line of your code needs to be an end ' +
+                    'statement.',
+                    line_no=tokens[0]['script_line_number'],
+                    error_code=5
+                )
+            tokens = script.lines[position]
+            position += 1
+            run.statements_executed += 1
+            # Jumps move through the lines that have arrived, waiting for
+            # more when need be
+            if tokens[1]['token_value'] == 'jump':
+                target = take_jump(script, tokens)
+                # The first time a jump goes back, the lines of the loop it
+                # closes have all arrived so the loop is checked in the same
+                # way as a script that is loaded
+                line_number = tokens[0]['script_line_number']
+                if target < position and line_number not in checked_jumps:
+                    checked_jumps.add(line_number)
+                    checks.run_cycle_checks({
+                        line_tokens[0]['script_line_number']: line_tokens
+                        for line_tokens in script.lines[target:position]
+                    })
+                position = target
+            else:
+                xylem.call_statements(tokens)
+    # Anything that stops the run (eg. an end statement) sets its status
+    except messenger.ScriptExit as exit_call:
+        run.exit_status = 0 if exit_call.code is None else exit_call.code
+    finally:
+        sap.CURRENT_RUN.reset(token)
+
+    # Return the exit status
+    return run.exit_status
+
+
+def run_stream(script_name: str) -> int:
+    """Execute a script that is piped in or is a named pipe as it is read
+
+    Args:
+        script_name [str]: the name of the script, - for the input
+
+    Returns:
+        int: the exit status of the script
+
+    Raises:
+        ScriptExit: if the script can't be opened
+    """
+
+    # A script that is piped in takes up the input, so its get statements
+    # have nothing to read
+    if script_name == '-':
+        stream, inputs = sys.stdin, io.StringIO()
+    else:
+        try:
+            stream, inputs = open(script_name, 'r'), None
+        except OSError:
+            messenger.simple_error(
+                'The script could not be found. Double check that the ' +
+                'file exists.',
+                error_code=9
+            )
+
+    # The program starts out empty as the lines are kept as they arrive
+    program = seed.Program(
+        name=script_name,
+        source='',
+        token_tree={},
+        line_numbers=(),
+        folded_values={},
+        hoisted_lines={},
+        eliminated_lines={},
+        jump_table={},
+        cacheable_lines={},
+        compiled_lines={},
+        render_cache_size=values.RENDER_CACHE_SIZE
+    )
+    run = sap.Run(program, input_stream=inputs)
+    return execute_stream(run, StreamedScript(stream))
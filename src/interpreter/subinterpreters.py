@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import concurrent.futures
+import marshal
+import os
+import queue
+import threading
+
+# Sub-interpreters are only reachable through private modules for now, so
+# they may not be there
+try:
+    import _xxinterpchannels as channels
+    import _xxsubinterpreters as interpreters
+except ImportError:
+    channels = None
+    interpreters = None
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A module that runs functions of the interpreter in sub-interpreters, each
+with a GIL of its own, so that scripts can use more than one core from within
+the one process (see the -i flag). It works in the same way as a process pool
+(eg. concurrent.futures.ProcessPoolExecutor) and can be used in its place:
+
+    from interpreter import (pool, subinterpreters)
+
+    with subinterpreters.SubinterpreterPool(4) as executor:
+        future = executor.submit(pool.run_script, 'script.hs')
+        future.result()['output']
+
+Nothing is shared between interpreters, so the function is sent by its name
+and its arguments and result are sent as buffers (see marshal), which means
+they can only be made up of simple values (eg. strings, numbers, lists and
+dicts). Each sub-interpreter imports the interpreter once and is then used
+for one call after another.
+'''
+
+# Run in each sub-interpreter when it is started. The OpenSSL modules (which
+# asyncio and hashlib bring in) crash Python 3.12 when a sub-interpreter that
+# imported them is destroyed, so they are left out and hashlib falls back to
+# its own sha256.
+BOOTSTRAP = '''
+import sys
+sys.modules['_ssl'] = None
+sys.modules['_hashlib'] = None
+sys.path.insert(0, source_dir)
+
+import importlib
+import marshal
+import _xxinterpchannels as channels
+from interpreter import (engine, pool)
+'''
+
+# Run in a sub-interpreter for each call, sending back whether the call
+# worked along with its result or what went wrong
+CALL = '''
+module_name, function_name, args = marshal.loads(request)
+try:
+    function = getattr(importlib.import_module(module_name), function_name)
+    response = (True, function(*args))
+except Exception as error:
+    response = (False, f'{type(error).__name__}: {error}')
+channels.send(results, marshal.dumps(response))
+'''
+
+
+class SubinterpreterError(Exception):
+    """Raised by a future when the function it was running in a
+    sub-interpreter raised an error
+    """
+
+
+class SubinterpreterPool(concurrent.futures.Executor):
+    """Runs functions in a number of sub-interpreters, each in a thread of
+    its own
+    """
+
+    def __init__(self, max_workers: int = None):
+        if interpreters is None:
+            raise RuntimeError(
+                'Sub-interpreters are not available in this version of Python'
+            )
+        # The calls waiting for a sub-interpreter, with None to stop one
+        self.calls = queue.SimpleQueue()
+        # The threads that look after the sub-interpreters
+        self.threads = [
+            threading.Thread(target=self.serve, daemon=True)
+            for _ in range(max_workers or os.cpu_count())
+        ]
+        self.shutting_down = False
+        for thread in self.threads:
+            thread.start()
+
+    def serve(self):
+        """Start a sub-interpreter and make the calls sent to it until the
+        pool is shut down
+
+        Args:
+            N/A
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+
+        # Start the sub-interpreter along with the channel results are sent
+        # back on
+        interpreter_id = interpreters.create()
+        results = channels.create()
+        try:
+            interpreters.run_string(interpreter_id, BOOTSTRAP, {
+                'source_dir': os.path.dirname(
+                    os.path.dirname(os.path.abspath(__file__))
+                )
+            })
+
+            # Make each call in turn
+            while (call := self.calls.get()) is not None:
+                future, request = call
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    interpreters.run_string(interpreter_id, CALL, {
+                        'request': request,
+                        'results': results
+                    })
+                    worked, result = marshal.loads(channels.recv(results))
+                except Exception as error:
+                    worked, result = False, f'{type(error).__name__}: {error}'
+                if worked:
+                    future.set_result(result)
+                else:
+                    future.set_exception(SubinterpreterError(result))
+        finally:
+            channels.destroy(results)
+            interpreters.destroy(interpreter_id)
+
+    def submit(self, function, /, *args, **kwargs):
+        """Run a function of the interpreter in one of the sub-interpreters
+
+        Args:
+            function: a function at the top level of a module (eg.
+                pool.run_script)
+            args: the arguments, which need to be made up of simple values
+                (see marshal)
+
+        Returns:
+            concurrent.futures.Future: the future of the result
+
+        Raises:
+            RuntimeError: if the pool has been shut down
+            TypeError: if there are keyword arguments
+            ValueError: if the arguments can't be sent to a sub-interpreter
+        """
+        if self.shutting_down:
+            raise RuntimeError('The pool has been shut down')
+        if kwargs:
+            raise TypeError('Only positional arguments can be sent')
+        request = marshal.dumps(
+            (function.__module__, function.__name__, args)
+        )
+        future = concurrent.futures.Future()
+        self.calls.put((future, request))
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        """Stop the sub-interpreters once they have made the calls sent to
+        them
+
+        Args:
+            wait [bool]: whether to wait for the sub-interpreters to stop,
+                defaults to True
+            cancel_futures [bool]: whether to cancel calls that haven't
+                started, defaults to False
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        self.shutting_down = True
+        if cancel_futures:
+            while True:
+                try:
+                    call = self.calls.get_nowait()
+                except queue.Empty:
+                    break
+                if call is not None:
+                    call[0].cancel()
+        for _ in self.threads:
+            self.calls.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join()
@@ -4,7 +4,7 @@
 import collections
 
 # Language imports
-from maple import (tree, values)
+from maple import (phloem, tree, values)
 
 '''Copyright 2024-2025 Bryan Smith.
 
@@ -347,3 +347,101 @@ def clean_token_list() -> bool:
         tree.TOKEN_LIST.pop(0)
         # Get rid of a trailing newline
         tree.TOKEN_LIST.pop(-1)
+
+
+def find_unreachable_lines(token_tree: dict = None) -> list:
+    """Find the lines that can never be executed, for instance lines after an
+    end statement or after a jump statement that nothing jumps back to. This
+    walks the control flow graph from the first line.
+
+    Args:
+        token_tree [dict]: the token tree to check, defaults to the
+            tree.TOKEN_TREE
+
+    Returns:
+        unreachable_lines [list]: a list of runs of unreachable lines where
+            each run is a list of consecutive line numbers
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    # Build the control flow graph
+    flow_graph = phloem.build_flow_graph(token_tree)
+    blocks = flow_graph['blocks']
+
+    # Nothing is unreachable in an empty tree
+    if not blocks:
+        return []
+
+    # Walk the graph from the first block, marking each block that is reached
+    reached = [False] * len(blocks)
+    reached[flow_graph['entry']] = True
+    to_visit = [flow_graph['entry']]
+    while to_visit:
+        for successor in blocks[to_visit.pop()]['successors']:
+            if not reached[successor]:
+                reached[successor] = True
+                to_visit.append(successor)
+
+    # Hold the runs of unreachable lines
+    unreachable_lines = []
+    # Whether the previous block was unreachable so that consecutive
+    # unreachable blocks are reported as a single run of lines
+    previous_unreachable = False
+    for block in blocks:
+        if reached[block['id']]:
+            previous_unreachable = False
+            continue
+        if previous_unreachable:
+            unreachable_lines[-1].extend(block['lines'])
+        else:
+            unreachable_lines.append(list(block['lines']))
+        previous_unreachable = True
+
+    # Return the runs of unreachable lines
+    return unreachable_lines
+
+
+def prune_unreachable_lines(
+                            unreachable_lines: list,
+                            drop_from_caches: bool = False) -> int:
+    """Remove unreachable lines from the TOKEN_TREE so that they are not part
+    of the execution of the script
+
+    Args:
+        unreachable_lines [list]: the runs of unreachable lines from
+            find_unreachable_lines()
+        drop_from_caches [bool]: whether to also drop the tokens of the lines
+            from the TOKEN_LIST so that they are not kept in memory or carried
+            into anything built from the tokens, defaults to False
+
+    Returns:
+        int: the number of lines that were pruned
+
+    Raises:
+        None
+    """
+
+    # Get a set of every unreachable line
+    pruned_lines = set()
+    for run in unreachable_lines:
+        pruned_lines.update(run)
+
+    # Remove the lines from the tree
+    for line_no in pruned_lines:
+        tree.TOKEN_TREE.pop(line_no, None)
+
+    # If asked, remove the tokens of the lines from the token list as well
+    if drop_from_caches and pruned_lines:
+        tree.set_tokens([
+            token for token in tree.TOKEN_LIST
+            if token['script_line_number'] not in pruned_lines
+        ])
+
+    # Return the number of lines pruned
+    return len(pruned_lines)
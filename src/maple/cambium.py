@@ -0,0 +1,1125 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import ast
+import bisect
+import builtins
+import warnings
+
+# Language imports
+from etc import global_values
+from maple import (helpers, phloem, tree, values)
+from maple.error import messenger
+from statements import stmt_write
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+The cambium is the growing layer of a tree that lays down new xylem and
+phloem. This Maple module does the same for the TOKEN_TREE: once the tree is
+planted, it works out anything that doesn't need to wait for the script to
+run (for instance, a write statement with no variables) so that the
+statements don't redo the same work every time they are executed.
+'''
+
+# Marks a variable that has a value that can't be known until the script is
+# run (ie. Not A Constant)
+NAC = object()
+
+# The parts of an expression that are safe to calculate when the script is
+# loaded. Anything else (names, calls, powers that might take forever) is left
+# for the script to calculate when it runs.
+FOLDABLE_NODES = (
+    ast.Expression,
+    ast.Constant,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.UAdd,
+    ast.USub
+)
+
+
+def fold_calculation(expression: str) -> tuple:
+    """Work out what helpers.calculate_value() would return for an expression
+    without running anything that might have side effects, errors or depend
+    on the state of the interpreter.
+
+    Args:
+        expression [str]: the expression to calculate
+
+    Returns:
+        foldable [bool]: whether the value can be worked out at load time
+        value: the calculated value, None if it isn't foldable
+
+    Raises:
+        None
+    """
+
+    # Strip the quotation marks in the same way as calculate_value() and the
+    # leading whitespace in the same way as eval()
+    expression = expression.strip("'").strip('"')
+    source = expression.lstrip(' \t')
+
+    # Parse the expression, recording any warnings that Python would print
+    # when the expression is evaluated
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        try:
+            parsed = ast.parse(source, mode='eval')
+        # The expression isn't Python so calculate_value() keeps it as is
+        except SyntaxError:
+            parsed = None
+        # Anything else (eg. a null byte) is left for the runtime
+        except ValueError:
+            return False, None
+    # If Python would print a warning, leave the expression alone so that the
+    # warning is still printed
+    if caught:
+        return False, None
+    # An expression that isn't Python is kept as is
+    if parsed is None:
+        return True, expression
+
+    # A single name that calculate_value() can't look up is kept as is (eg.
+    # set name = "Helasuno"). The eval() there sees the globals of the helpers
+    # module, the builtins and its own local variable, expression.
+    if isinstance(parsed.body, ast.Name):
+        name = parsed.body.id
+        if name not in vars(helpers) and name not in vars(builtins) and \
+                name != 'expression':
+            return True, expression
+        return False, None
+
+    # Every part of the expression needs to be safe to calculate
+    for node in ast.walk(parsed):
+        if not isinstance(node, FOLDABLE_NODES):
+            return False, None
+        # Only numbers are safe as constants. Strings can be multiplied into
+        # something enormous.
+        if isinstance(node, ast.Constant) and (
+                type(node.value) not in (int, float, complex, bool)):
+            return False, None
+
+    # Try to calculate the value. A failure (eg. division by zero) is left to
+    # happen when the script runs.
+    try:
+        return True, eval(compile(parsed, '<string>', 'eval'), {}, {})
+    except Exception:
+        return False, None
+
+
+def fold_substitution(expression: str, environment: dict) -> tuple:
+    """Work out what helpers.substitute_values() would return for an
+    expression given the constant variables known at this point in the script.
+
+    Args:
+        expression [str]: the expression to have values substituted in
+        environment [dict]: the variables known at this point in the script
+
+    Returns:
+        foldable [bool]: whether the substitution can be done at load time
+        expression [str]: the substituted expression, None if it isn't
+            foldable
+
+    Raises:
+        None
+    """
+
+    # Set up a templater in the same way as substitute_values()
+    variable_templater = helpers.VarTemplater(
+        expression.strip("'").strip('"')
+    )
+
+    # A lone variable symbol is an error which is left to the runtime
+    if not variable_templater.is_valid():
+        return False, None
+
+    # Every variable needs to have a constant value
+    constants = {}
+    for identifier in variable_templater.get_identifiers():
+        value = environment.get(identifier, NAC)
+        if value is NAC:
+            return False, None
+        constants[identifier] = value
+
+    # Substitute the constants in
+    return True, variable_templater.substitute(constants)
+
+
+def check_set(tokens: list) -> tuple:
+    """Get the parts of a set statement, checking it in the same way as
+    stmt_set.stmt_check() but without reporting anything
+
+    Args:
+        tokens [list]: the list of tokens on the line with the set statement
+
+    Returns:
+        variable_name [str]: the name of the variable that is set, None if
+            the line is missing parts of the set statement
+        variable_value [str]: the value expression of the set statement
+        valid [bool]: whether stmt_check() would pass the statement
+
+    Raises:
+        None
+    """
+
+    # Try to get the parts of the set statement
+    try:
+        variable_name = tokens[2]['token_value']
+        assignment_operator = tokens[3]['token_value']
+        variable_value = tokens[4]['token_value'].strip('"')
+    # A broken set statement is left to report its own error
+    except IndexError:
+        return None, None, False
+
+    # Check for anything that stmt_check() would report as an error
+    variable_prefix = variable_name[0:len(values.VARIABLE_PROHIBITED_PREFIX)]
+    valid = variable_prefix != values.VARIABLE_PROHIBITED_PREFIX and \
+        assignment_operator == values.VALID_OPERATORS['assignment'] and \
+        variable_name not in values.STATEMENT_NAMES
+
+    # Return the parts of the statement
+    return variable_name, variable_value, valid
+
+
+def fold_set(tokens: list, environment: dict) -> tuple:
+    """Work out the value a set statement assigns if it can be known when the
+    script is loaded.
+
+    Args:
+        tokens [list]: the list of tokens on the line with the set statement
+        environment [dict]: the variables known at this point in the script
+
+    Returns:
+        variable_name [str]: the name of the variable that is set, None if
+            the line isn't a valid set statement
+        foldable [bool]: whether the value is known at load time
+        value: the value of the variable, None if it isn't foldable
+
+    Raises:
+        None
+    """
+
+    # Get the parts of the set statement. Anything that stmt_set.stmt_check()
+    # would report as an error is left for it to report.
+    variable_name, variable_value, valid = check_set(tokens)
+    if not valid:
+        return variable_name, False, None
+
+    # Substitute the variables and calculate the value
+    foldable, variable_value = fold_substitution(variable_value, environment)
+    if not foldable:
+        return variable_name, False, None
+
+    # Return the calculated value
+    foldable, variable_value = fold_calculation(variable_value)
+    return variable_name, foldable, variable_value
+
+
+def fold_write(tokens: list, environment: dict) -> tuple:
+    """Render the output of a write(ln) statement if it can be known when the
+    script is loaded, including any statmods.
+
+    Args:
+        tokens [list]: the list of tokens on the line with the write statement
+        environment [dict]: the variables known at this point in the script
+
+    Returns:
+        foldable [bool]: whether the output is known at load time
+        output [str]: the rendered output, None if it isn't foldable
+
+    Raises:
+        None
+    """
+
+    # A write statement without anything to write is left for the runtime
+    if len(tokens) < 3:
+        return False, None
+
+    # Substitute the variables and calculate the output
+    foldable, output = fold_substitution(tokens[2]['token_value'], environment)
+    if not foldable:
+        return False, None
+    foldable, output = fold_calculation(output)
+    if not foldable:
+        return False, None
+
+    # Get the statmod in the same way as stmt_write()
+    try:
+        stat_mod_op = tokens[3]['token_value']
+        stat_mod_value = tokens[4]['token_value']
+    except IndexError:
+        stat_mod_op = None
+        stat_mod_value = None
+
+    # Without a statmod, the output is ready to go
+    if stat_mod_op is None:
+        return True, str(output)
+
+    # An invalid operator is an error left for the runtime
+    if stat_mod_op != values.VALID_OPERATORS['statmod']:
+        return False, None
+
+    # Get the statmods in the same way as stmt_write.stat_moderator()
+    statmods = [
+        mod.strip('"') for mod in
+        stat_mod_value.split(values.VALID_OPERATORS['statmod_splitter'])
+    ]
+    # Too many statmods or invalid statmods are errors left for the runtime
+    if len(statmods) > values.WRITE_STATMOD_COUNT:
+        return False, None
+    for index, mod in enumerate(statmods):
+        if mod not in values.VALID_STATMODS_WRITE:
+            return False, None
+        # A case statmod out of place is warned about every time the line is
+        # executed so leave it for the runtime
+        if mod in ('lower', 'upper') and index > 0:
+            return False, None
+
+    # Apply the statmods. By this point, nothing should be reported by the
+    # stat_moderator() but a statmod that doesn't suit the output (eg. upper
+    # on a number) is left to fail at runtime.
+    try:
+        output = stmt_write.stat_moderator(
+            stat_mod_op, stat_mod_value, output,
+            tokens[0]['script_line_number']
+        )
+    except Exception:
+        return False, None
+
+    # Return the rendered output
+    return True, str(output)
+
+
+def fold_pause(tokens: list, environment: dict) -> tuple:
+    """Work out the length of a pause statement if it can be known when the
+    script is loaded.
+
+    Args:
+        tokens [list]: the list of tokens on the line with the pause statement
+        environment [dict]: the variables known at this point in the script
+
+    Returns:
+        foldable [bool]: whether the pause length is known at load time
+        pause_length [int]: the length of the pause, None if it isn't foldable
+
+    Raises:
+        None
+    """
+
+    # A pause statement without a length is left for the runtime
+    if len(tokens) < 3:
+        return False, None
+
+    # Substitute the variables and calculate the length
+    foldable, pause_length = fold_substitution(
+        tokens[2]['token_value'], environment
+    )
+    if not foldable:
+        return False, None
+    foldable, pause_length = fold_calculation(pause_length)
+
+    # A length that isn't a number is an error left for the runtime
+    if not foldable or not str(pause_length).isnumeric():
+        return False, None
+
+    # Return the length of the pause
+    return True, int(pause_length)
+
+
+def starting_environment() -> dict:
+    """Get the variables that are known before the first line of the script is
+    executed
+
+    Args:
+        None
+
+    Returns:
+        dict: the reserved variables with time based variables marked as not
+            being constant
+
+    Raises:
+        None
+    """
+
+    # Start with the reserved variables
+    environment = {}
+    for name, value in values.VARIABLES.items():
+        if name.startswith(values.VARIABLE_PROHIBITED_PREFIX):
+            environment[name] = value
+
+    # The time based variables depend on when the script is run
+    for name in values.VARIABLES_TIME_BASED:
+        environment[name] = NAC
+
+    # Return the environment
+    return environment
+
+
+def meet_environments(first: dict, second: dict) -> dict:
+    """Combine the variables known at the end of two paths that join. A
+    variable is only constant where it has the same value on both paths.
+
+    Args:
+        first [dict]: the variables known at the end of one path
+        second [dict]: the variables known at the end of the other path
+
+    Returns:
+        dict: the variables known where the paths join
+
+    Raises:
+        None
+    """
+
+    # Hold the combined variables
+    environment = {}
+
+    # A variable that is only set on one of the paths might not be set at
+    # all so it's not constant
+    for name in first.keys() | second.keys():
+        first_value = first.get(name, NAC)
+        second_value = second.get(name, NAC)
+        if first_value is not NAC and second_value is not NAC and \
+                type(first_value) is type(second_value) and \
+                first_value == second_value:
+            environment[name] = first_value
+        else:
+            environment[name] = NAC
+
+    # Return the combined variables
+    return environment
+
+
+def fold_block(block: dict, environment: dict, token_tree: dict,
+               folded_values: dict = None) -> dict:
+    """Run through the lines of a block, keeping track of the variables that
+    are constant and, where asked, recording the values that can be folded.
+
+    Args:
+        block [dict]: the block from the control flow graph
+        environment [dict]: the variables known at the start of the block
+        token_tree [dict]: the token tree the block was built from
+        folded_values [dict]: where to record the folded values, None if they
+            don't need to be recorded
+
+    Returns:
+        dict: the variables known at the end of the block
+
+    Raises:
+        None
+    """
+
+    # Work on a copy so that the environment at the start of the block is
+    # left alone
+    environment = dict(environment)
+
+    # Go through the lines of the block
+    for line_no in block['lines']:
+        tokens = token_tree[line_no]
+        match phloem.get_statement_name(tokens):
+            case 'set':
+                variable_name, foldable, value = fold_set(tokens, environment)
+                if variable_name is not None:
+                    environment[variable_name] = value if foldable else NAC
+                if foldable and folded_values is not None:
+                    folded_values[line_no] = value
+            case 'get':
+                # Whatever the user inputs can't be known ahead of time
+                try:
+                    environment[tokens[2]['token_value']] = NAC
+                except IndexError:
+                    pass
+            case 'write' | 'writeln':
+                foldable, output = fold_write(tokens, environment)
+                if foldable and folded_values is not None:
+                    folded_values[line_no] = output
+            case 'pause':
+                foldable, pause_length = fold_pause(tokens, environment)
+                if foldable and folded_values is not None:
+                    folded_values[line_no] = pause_length
+
+    # Return the variables known at the end of the block
+    return environment
+
+
+def fold_constants(token_tree: dict = None, flow_graph: dict = None) -> dict:
+    """Partially evaluate the script. Constants are propagated through the
+    control flow graph so that set chains of constant values, pause lengths
+    and write statements (statmods and all) are worked out once, here, rather
+    than every time the lines are executed.
+
+    Args:
+        token_tree [dict]: the token tree to fold, defaults to the
+            tree.TOKEN_TREE
+        flow_graph [dict]: the control flow graph of the token tree, built if
+            not provided
+
+    Returns:
+        dict: the folded values keyed by line number which are also stored in
+            tree.FOLDED_VALUES
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+    # Build the control flow graph if need be
+    if flow_graph is None:
+        flow_graph = phloem.build_flow_graph(token_tree)
+
+    blocks = flow_graph['blocks']
+    folded_values = {}
+
+    # Nothing to fold in an empty tree
+    if not blocks:
+        tree.FOLDED_VALUES = folded_values
+        return folded_values
+
+    # Hold the variables known at the start of each block. None means that
+    # the block hasn't been reached (yet).
+    block_environments = [None] * len(blocks)
+    block_environments[flow_graph['entry']] = starting_environment()
+
+    # Propagate the constants until nothing changes. Each variable can only
+    # go from constant to not constant so this always finishes.
+    worklist = [flow_graph['entry']]
+    while worklist:
+        block = blocks[worklist.pop()]
+        environment = fold_block(
+            block, block_environments[block['id']], token_tree
+        )
+        for successor in block['successors']:
+            if block_environments[successor] is None:
+                joined = environment
+            else:
+                joined = meet_environments(
+                    block_environments[successor], environment
+                )
+            if joined != block_environments[successor] or \
+                    block_environments[successor] is None:
+                block_environments[successor] = joined
+                worklist.append(successor)
+
+    # Record the folded values of every block that can be reached
+    for block in blocks:
+        if block_environments[block['id']] is not None:
+            fold_block(
+                block,
+                block_environments[block['id']],
+                token_tree,
+                folded_values
+            )
+
+    # Store the folded values
+    tree.FOLDED_VALUES = folded_values
+
+    # Return the folded values
+    return folded_values
+
+
+def eliminate_dead_stores(
+                          token_tree: dict = None,
+                          flow_graph: dict = None) -> dict:
+    """Remove the set statements whose value is never read before the
+    variable is assigned again or the script ends (dead stores). Only set
+    statements that were folded at load time are removed as they are known
+    to have no side effects or errors. A line that a jump statement targets
+    is kept so that the jump still lands where it should.
+
+    Args:
+        token_tree [dict]: the token tree to remove dead stores from,
+            defaults to the tree.TOKEN_TREE
+        flow_graph [dict]: the control flow graph of the token tree, built if
+            not provided
+
+    Returns:
+        dict: the full lines of code of the removed set statements keyed by
+            line number which are also stored in tree.ELIMINATED_LINES
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    eliminated_lines = {}
+
+    # Get every jump target as these lines have to be kept
+    jump_targets = set()
+    for tokens in token_tree.values():
+        if phloem.get_statement_name(tokens) == 'jump':
+            jump_targets.add(phloem.get_jump_target(tokens, token_tree))
+
+    # Removing a dead store can make the stores that fed it dead as well so
+    # keep going until nothing else can be removed
+    while True:
+        # Build the control flow graph if need be
+        if flow_graph is None:
+            flow_graph = phloem.build_flow_graph(token_tree)
+        live_out = phloem.find_live_variables(flow_graph, token_tree)
+        all_variables = phloem.get_all_variables(token_tree)
+
+        # Hold the dead stores found this time around
+        dead_stores = []
+        for block in flow_graph['blocks']:
+            live = live_out[block['id']]
+            # Work backwards through the block
+            for line_no in reversed(block['lines']):
+                tokens = token_tree[line_no]
+                variable_name = phloem.get_assigned_variable(tokens)
+                if phloem.get_statement_name(tokens) == 'set' and \
+                        variable_name not in live and \
+                        line_no in tree.FOLDED_VALUES and \
+                        line_no not in jump_targets:
+                    dead_stores.append(line_no)
+                    continue
+                live = phloem.transfer_live_variables(
+                    [line_no], live, token_tree, all_variables
+                )
+
+        # Finish when there are no more dead stores
+        if not dead_stores:
+            break
+
+        # Remove the dead stores from the tree
+        for line_no in dead_stores:
+            eliminated_lines[line_no] = \
+                token_tree[line_no][0]['full_line_of_code'].strip()
+            del token_tree[line_no]
+            tree.FOLDED_VALUES.pop(line_no, None)
+        # The graph needs to be built again
+        flow_graph = None
+
+    # Store the removed lines in the order they are in the script
+    tree.ELIMINATED_LINES = dict(sorted(
+        eliminated_lines.items(), key=lambda line: int(line[0])
+    ))
+
+    # Return the removed lines
+    return tree.ELIMINATED_LINES
+
+
+def is_arithmetic_template(expression: str) -> bool:
+    """Check whether an expression is plain arithmetic once its variables are
+    substituted with numbers. Calculating such an expression can't have any
+    side effects.
+
+    Args:
+        expression [str]: the expression to check
+
+    Returns:
+        bool: True if the expression is arithmetic on numbers and variables
+
+    Raises:
+        None
+    """
+
+    # Set up a templater in the same way as substitute_values()
+    variable_templater = helpers.VarTemplater(
+        expression.strip("'").strip('"')
+    )
+    # A lone variable symbol is never arithmetic
+    if not variable_templater.is_valid():
+        return False
+
+    # Stand a number in for each variable
+    expression = variable_templater.substitute(
+        {name: '1' for name in variable_templater.get_identifiers()}
+    )
+
+    # Parse the expression and check every part of it
+    try:
+        parsed = ast.parse(expression.lstrip(' \t'), mode='eval')
+    except (SyntaxError, ValueError):
+        return False
+    return all(isinstance(node, FOLDABLE_NODES) for node in ast.walk(parsed))
+
+
+def is_pure_template(expression: str) -> bool:
+    """Check whether calculating an expression once its variables are
+    substituted gives the same result every time without side effects. With
+    a number standing in for each variable, the expression can't call or
+    look anything up on an object and Python can't print a warning when it
+    is calculated. Plain text that isn't Python is always pure.
+
+    Args:
+        expression [str]: the expression to check
+
+    Returns:
+        bool: True if the expression is pure
+
+    Raises:
+        None
+    """
+
+    # Set up a templater in the same way as substitute_values()
+    variable_templater = helpers.VarTemplater(
+        expression.strip("'").strip('"')
+    )
+    # A lone variable symbol is an error which is left to the runtime
+    if not variable_templater.is_valid():
+        return False
+
+    # Stand a number in for each variable
+    expression = variable_templater.substitute(
+        {name: '1' for name in variable_templater.get_identifiers()}
+    )
+
+    # Parse and compile the expression, recording any warnings
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        try:
+            parsed = ast.parse(expression.lstrip(' \t'), mode='eval')
+            compile(parsed, '<string>', 'eval')
+        # An expression that isn't Python is kept as is
+        except SyntaxError:
+            parsed = None
+        # Anything else (eg. a null byte) is left for the runtime
+        except ValueError:
+            return False
+    if caught:
+        return False
+    if parsed is None:
+        return True
+    return not any(
+        isinstance(node, (ast.Call, ast.Attribute))
+        for node in ast.walk(parsed)
+    )
+
+
+def hoist_invariants(token_tree: dict = None, flow_graph: dict = None) -> dict:
+    """Find the set statements in jump loops that assign the same value on
+    every pass of the loop and hoist them out of it. A hoisted statement is
+    executed once on the way into the loop (its preheader pass) and the jump
+    that closes the loop moves execution back past it. Doing it this way
+    means that the first pass through the loop is exactly as written so the
+    output of the script doesn't change.
+
+    A set statement is only hoisted when:
+        - it is in the header of a loop that can only be entered through
+          the header (so it runs on every pass)
+        - no other line in the loop assigns its variable
+        - none of the variables it reads are assigned in the loop or by a get
+          statement anywhere in the script
+        - its value was folded at load time or it is arithmetic on variables
+          that only ever hold folded numbers (so calculating it has no side
+          effects)
+
+    Args:
+        token_tree [dict]: the token tree to hoist from, defaults to the
+            tree.TOKEN_TREE
+        flow_graph [dict]: the control flow graph of the token tree, built if
+            not provided
+
+    Returns:
+        dict: the hoisted lines keyed by the line number of the jump that
+            closes the loop which are also stored in tree.HOISTED_LINES
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+    # Build the control flow graph if need be
+    if flow_graph is None:
+        flow_graph = phloem.build_flow_graph(token_tree)
+
+    blocks = flow_graph['blocks']
+    hoisted_lines = {}
+
+    # Find the variables that are assigned by a get statement and the
+    # variables that are only ever assigned folded numbers
+    input_variables = set()
+    numeric_variables = {}
+    for line_no, tokens in token_tree.items():
+        variable_name = phloem.get_assigned_variable(tokens)
+        if variable_name is None:
+            continue
+        if phloem.get_statement_name(tokens) == 'get':
+            input_variables.add(variable_name)
+        numeric_variables[variable_name] = \
+            numeric_variables.get(variable_name, True) and \
+            type(tree.FOLDED_VALUES.get(line_no)) in (int, float)
+
+    for loop in phloem.find_loops(flow_graph):
+        # A loop that can be entered part way through might skip the header
+        if not loop['single_entry']:
+            continue
+
+        # Count how many times each variable is assigned in the loop
+        assignments = {}
+        for block_id in loop['blocks']:
+            for line_no in blocks[block_id]['lines']:
+                variable_name = phloem.get_assigned_variable(
+                    token_tree[line_no]
+                )
+                if variable_name is not None:
+                    assignments[variable_name] = \
+                        assignments.get(variable_name, 0) + 1
+
+        # Look for invariant set statements in the header
+        invariant_lines = []
+        for line_no in blocks[loop['header']]['lines']:
+            tokens = token_tree[line_no]
+            if phloem.get_statement_name(tokens) != 'set':
+                continue
+            variable_name, variable_value, valid = check_set(tokens)
+            # The statement has to be valid and the only assignment of its
+            # variable in the loop
+            if not valid or assignments.get(variable_name) != 1:
+                continue
+            # Get the variables the statement reads
+            variable_templater = helpers.VarTemplater(
+                variable_value.strip("'")
+            )
+            if not variable_templater.is_valid():
+                continue
+            read_variables = variable_templater.get_identifiers()
+            # None of them can change in the loop or come from input
+            if any(
+                name in assignments or name in input_variables
+                for name in read_variables
+            ):
+                continue
+            # Calculating the value can't have side effects
+            if line_no not in tree.FOLDED_VALUES and not (
+                    is_arithmetic_template(variable_value) and
+                    all(
+                        numeric_variables.get(name, False)
+                        for name in read_variables
+                    )):
+                continue
+            invariant_lines.append(line_no)
+
+        # Record the hoisted lines against the jump that closes the loop
+        if invariant_lines:
+            latch_line = blocks[loop['latch']]['lines'][-1]
+            hoisted_lines[latch_line] = invariant_lines
+
+    # Store the hoisted lines
+    tree.HOISTED_LINES = hoisted_lines
+
+    # Return the hoisted lines
+    return hoisted_lines
+
+
+def resolve_jumps(token_tree: dict = None) -> dict:
+    """Resolve the target of every jump statement to its position in the tree
+    once so that a jump doesn't need to parse or check its target when it is
+    executed. A jump that lands on another jump is threaded through to where
+    the last jump in the chain ends up. Like the jump statement, a target that
+    isn't in the tree (eg. a line that has been pruned) moves execution to the
+    next line after it.
+
+    Jumps with a target that isn't a valid line number are left out so that
+    the jump statement can report the error when it is executed, as are
+    jumps that only lead round a cycle of jumps.
+
+    Args:
+        token_tree [dict]: the token tree to resolve the jumps of, defaults to
+            the tree.TOKEN_TREE
+
+    Returns:
+        dict: the position to move to and the lines to skip from then on for
+            each jump keyed by line number which is also stored in
+            tree.JUMP_TABLE
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    # Get the line numbers in the order they are executed along with their
+    # integer values for finding where a target falls in the tree
+    line_numbers = list(token_tree.keys())
+    line_integers = [int(line_no) for line_no in line_numbers]
+    # Get every line number in the script (including any that were pruned,
+    # which are still valid targets) as a set so that each target is checked
+    # in one step
+    valid_line_numbers = set(tree.LINE_NUMBERS)
+
+    # First pass: resolve each jump to the position of its target
+    jump_table = {}
+    for line_no, tokens in token_tree.items():
+        if phloem.get_statement_name(tokens) != 'jump' or len(tokens) < 3:
+            continue
+        # Get the target the same way the jump statement does
+        jump_location = tokens[2]['token_value'].strip('"')
+        try:
+            jump_location_integer = int(jump_location)
+        except ValueError:
+            continue
+        if jump_location not in valid_line_numbers:
+            continue
+        # Execution moves to the first line at or after the target
+        jump_table[line_no] = (
+            bisect.bisect_left(line_integers, jump_location_integer),
+            tuple(tree.HOISTED_LINES.get(line_no, ()))
+        )
+
+    # Second pass: thread any jump that lands on another jump through to the
+    # end of the chain
+    threaded_table = {}
+    for line_no in jump_table:
+        position, skip_lines = jump_table[line_no]
+        # Keep track of the jumps in the chain so a cycle of jumps stops
+        chain = {line_no}
+        while position < len(line_numbers) and \
+                line_numbers[position] in jump_table and \
+                line_numbers[position] not in chain:
+            chain.add(line_numbers[position])
+            position, skip_lines = jump_table[line_numbers[position]]
+        # A chain that ends up back on one of its own jumps (eg. a jump to its
+        # own line) would go round without executing anything, so it is left
+        # for the jump statement, which stops the script once it has looped
+        # too many times (error 22)
+        if position < len(line_numbers) and line_numbers[position] in chain:
+            continue
+        threaded_table[line_no] = (position, skip_lines)
+
+    # Store the resolved jumps
+    tree.JUMP_TABLE = threaded_table
+
+    # Return the resolved jumps
+    return threaded_table
+
+
+def find_cacheable_writes(token_tree: dict = None) -> dict:
+    """Find the write(ln) statements whose rendered output can be reused for
+    as long as the variables they reference haven't changed. This is any
+    write statement that wasn't folded where:
+        - the output is pure once its variables are substituted (see
+          is_pure_template())
+        - no statmod would be warned about (which has to happen every time
+          the line is executed)
+
+    Args:
+        token_tree [dict]: the token tree to check, defaults to the
+            tree.TOKEN_TREE
+
+    Returns:
+        dict: the variables each cacheable line references keyed by line
+            number which is also stored in tree.CACHEABLE_LINES
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    cacheable_lines = {}
+
+    for line_no, tokens in token_tree.items():
+        # Only write statements that weren't folded
+        if phloem.get_statement_name(tokens) not in ('write', 'writeln') or \
+                line_no in tree.FOLDED_VALUES or len(tokens) < 3:
+            continue
+
+        # Rendering the output can't have side effects or warnings
+        if not is_pure_template(tokens[2]['token_value']):
+            continue
+        identifiers = tuple(
+            helpers.VarTemplater(
+                tokens[2]['token_value'].strip("'").strip('"')
+            ).get_identifiers()
+        )
+
+        # A case statmod out of place is warned about every time
+        if len(tokens) > 4:
+            statmods = [
+                mod.strip('"') for mod in tokens[4]['token_value'].split(
+                    values.VALID_OPERATORS['statmod_splitter']
+                )
+            ]
+            if any(
+                mod in ('lower', 'upper') and index > 0
+                for index, mod in enumerate(statmods)
+            ):
+                continue
+
+        cacheable_lines[line_no] = identifiers
+
+    # Store the cacheable lines
+    tree.CACHEABLE_LINES = cacheable_lines
+
+    # Return the cacheable lines
+    return cacheable_lines
+
+
+def compile_arithmetic(expression: str) -> tuple:
+    """Compile an expression that is arithmetic on variables so that it can
+    be calculated straight from the values of the variables rather than
+    substituting them into the text and calculating the text again every
+    time. The compiled expression only gives the same result as the text
+    when every variable holds a number (see helpers.calculate_compiled()).
+
+    Args:
+        expression [str]: the expression to compile
+
+    Returns:
+        compiled [tuple]: the compiled expression and the variables it reads
+            in the order they are passed in, None if it can't be compiled
+
+    Raises:
+        None
+    """
+
+    # Set up a templater in the same way as substitute_values()
+    variable_templater = helpers.VarTemplater(
+        expression.strip("'").strip('"')
+    )
+    # A lone variable symbol is an error which is left to the runtime
+    if not variable_templater.is_valid():
+        return None
+
+    # Stand a name in for each variable, wrapped in brackets so that it is
+    # calculated in the same order as the number it stands in for
+    identifiers = tuple(variable_templater.get_identifiers())
+    source = variable_templater.substitute({
+        name: f'(hs_compiled_{index})'
+        for index, name in enumerate(identifiers)
+    }).lstrip(' \t')
+
+    # Parse the expression and check every part of it. Anything that isn't
+    # arithmetic (eg. a variable written straight after a number) is left as
+    # text.
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        try:
+            parsed = ast.parse(source, mode='eval')
+            code = compile(parsed, '<string>', 'eval')
+        except (SyntaxError, ValueError):
+            return None
+    if caught or not all(
+            isinstance(node, FOLDABLE_NODES + (ast.Name, ast.Load))
+            for node in ast.walk(parsed)):
+        return None
+
+    # Return the compiled expression along with its variables
+    return code, identifiers
+
+
+def apply_profile(profile: dict, token_tree: dict = None) -> dict:
+    """Use a profile from an earlier run of the script (see
+    data.load_profile()) to:
+        - compile the set and write statements that were hot (see
+          compile_arithmetic())
+        - make sure that the render cache is big enough to hold every hot
+          write statement so that none of them are evicted
+
+    As there are no conditional statements, each line has only one line that
+    can follow it so the order the lines are executed in is already the
+    common path once the jumps are resolved (see resolve_jumps()) and only
+    the number of times each line was executed is used. A profile that is
+    out of date only changes what is compiled, not what the script does, so
+    it is safe to use. A profile whose counts aren't whole numbers (eg. one
+    that was edited by hand) is warned about and left out.
+
+    Args:
+        profile [dict]: the profile, None if there isn't one
+        token_tree [dict]: the token tree to optimise, defaults to the
+            tree.TOKEN_TREE
+
+    Returns:
+        dict: the compiled lines which are also stored in tree.COMPILED_LINES
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    compiled_lines = {}
+
+    # Without a profile, there is nothing to go on
+    if profile is None:
+        return compiled_lines
+
+    # Make sure that every count is a whole number before going on it
+    line_counts = profile.get('line_counts')
+    if not isinstance(line_counts, dict) or not all(
+        isinstance(count, int) and not isinstance(count, bool) and count >= 0
+        for count in line_counts.values()
+    ):
+        messenger.simple_warning(
+            'The profile of the script can\'t be used as the number of ' +
+            'times each line was executed isn\'t always a whole number. ' +
+            'The script is executed without it.',
+            error_code=37
+        )
+        return compiled_lines
+
+    # Find the lines in the tree that were hot
+    hot_lines = [
+        line_no for line_no, count in line_counts.items()
+        if count >= global_values.PROFILE_HOT_LINE_COUNT and
+        line_no in token_tree
+    ]
+
+    for line_no in hot_lines:
+        tokens = token_tree[line_no]
+        # Folded lines don't need calculating at all
+        if line_no in tree.FOLDED_VALUES:
+            continue
+        # Get the expression the line calculates
+        match phloem.get_statement_name(tokens):
+            case 'set' if len(tokens) > 4:
+                expression = tokens[4]['token_value'].strip('"')
+            case 'write' | 'writeln' if len(tokens) > 2:
+                expression = tokens[2]['token_value']
+            case _:
+                continue
+        # Compile it if it is arithmetic
+        compiled = compile_arithmetic(expression)
+        if compiled is not None:
+            compiled_lines[line_no] = compiled
+
+    # Make room in the render cache for every hot write statement
+    tree.RENDER_CACHE_SIZE = max(
+        values.RENDER_CACHE_SIZE,
+        len([line_no for line_no in hot_lines
+             if line_no in tree.CACHEABLE_LINES])
+    )
+
+    # Store the compiled lines
+    tree.COMPILED_LINES = compiled_lines
+
+    # Return the compiled lines
+    return compiled_lines
@@ -2,6 +2,8 @@
 
 # Standard library imports
 import datetime
+import hashlib
+import json
 import locale
 import pathlib
 import pprint
@@ -9,7 +11,7 @@ import statistics
 import time
 
 # Language imports
-from maple import (planter, tree)
+from maple import (phloem, planter, tree)
 from maple.error import messenger
 from etc import (colourise, global_values)
 
@@ -70,6 +72,18 @@ def get_token_data(script_name: str) -> dict:
     print(colourise.green('\nToken Tree'))
     # Print out the token tree
     pprint.pprint(token_tree)
+    # Print out a header for the values folded when the script was loaded
+    print(colourise.green('\nFolded Values'))
+    # Print out the folded values
+    pprint.pprint(tree.FOLDED_VALUES)
+    # Print out a header for the set statements that were eliminated
+    print(colourise.green('\nEliminated Stores'))
+    # Print out the eliminated set statements
+    pprint.pprint(tree.ELIMINATED_LINES)
+    # Print out a header for the write statements whose output is cached
+    print(colourise.green('\nCacheable Writes'))
+    # Print out the cacheable write statements
+    pprint.pprint(tree.CACHEABLE_LINES)
 
     # Print out a header for the statistics
     print(colourise.cyan(f'\nStatistics for {script_name}'))
@@ -79,6 +93,214 @@ def get_token_data(script_name: str) -> dict:
     print('')
 
 
+def get_flow_data(script_name: str) -> dict:
+    """Generates the control flow graph of the script as both text and as
+    Graphviz DOT
+
+    Args:
+        script_name [str]: the script that is being checked
+
+    Returns:
+        flow_graph [dict]: the control flow graph that was generated
+
+    Raises:
+        None
+    """
+
+    # Build the control flow graph from the token tree
+    flow_graph = phloem.build_flow_graph()
+
+    # Print out a header for the control flow graph
+    print(colourise.yellow(':: CONTROL FLOW :: '))
+    # Print out a header for the text version of the graph
+    print(colourise.green('\nBasic Blocks'))
+    # Print out the graph as text
+    print(phloem.flow_graph_to_text(flow_graph))
+    # Print out a header for the DOT version of the graph
+    print(colourise.green('\nGraphviz DOT'))
+    # Print out the graph as DOT
+    print(phloem.flow_graph_to_dot(flow_graph))
+    # Print out a header for the lines hoisted out of loops
+    print(colourise.green('\nHoisted Lines'))
+    # Print out the hoisted lines
+    pprint.pprint(tree.HOISTED_LINES)
+    # Print out a header for the resolved jump statements
+    print(colourise.green('\nResolved Jumps'))
+    # Print out the resolved jump statements
+    pprint.pprint(tree.JUMP_TABLE)
+    # Print out a header for the lines compiled from a profile
+    print(colourise.green('\nCompiled Lines'))
+    # Print out the compiled lines
+    pprint.pprint(sorted(tree.COMPILED_LINES, key=int))
+    # Print out a header for the cycles that can never be left
+    print(colourise.green('\nInescapable Cycles'))
+    # Print out the cycles
+    pprint.pprint(phloem.find_inescapable_cycles(flow_graph))
+
+    # Print out a header for the statistics
+    print(colourise.cyan(f'\nStatistics for {script_name}'))
+    # Print the number of blocks and edges in the graph
+    print(f'\tNumber of Blocks: {len(flow_graph["blocks"])}')
+    print(
+        '\tNumber of Edges: ' +
+        f'{sum(len(b["successors"]) for b in flow_graph["blocks"])}'
+    )
+    print('')
+
+    # Return the graph
+    return flow_graph
+
+
+def print_eliminated_stores():
+    """Print out the set statements that were removed because the value they
+    assign is never read so that they can be audited
+
+    Args:
+        None
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Print out a header for the eliminated stores
+    print(colourise.yellow(':: ELIMINATED STORES :: '))
+    # If nothing was removed, say so
+    if not tree.ELIMINATED_LINES:
+        print('No set statements were eliminated.')
+    # Print out each removed line of code
+    for full_loc in tree.ELIMINATED_LINES.values():
+        print(f'\t{full_loc}')
+    print('')
+
+
+def print_render_cache_stats(run):
+    """Print out how often the rendered output of write statements was reused
+    (hits) or rendered again (misses) while the script was executed
+
+    Args:
+        run [sap.Run]: the run of the script
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Get the hits and misses
+    hits = run.render_cache_stats['hits']
+    misses = run.render_cache_stats['misses']
+
+    # Print out a header for the statistics
+    print(colourise.cyan('\n:: RENDER CACHE ::'))
+    # Print out the hits and misses
+    print(f'\tHits: {hits}')
+    print(f'\tMisses: {misses}')
+    # Print out the hit rate if anything was looked up
+    if hits + misses > 0:
+        print(f'\tHit Rate: {hits / (hits + misses):.2%}')
+    # Print out how full the cache is
+    print(
+        f'\tCached Lines: {len(run.rendered_output)}/' +
+        f'{run.program.render_cache_size}'
+    )
+    print('')
+
+
+def get_profile_path(script_name: str) -> str:
+    """Get the path of the profile that is kept next to a script
+
+    Args:
+        script_name [str]: the script that is being profiled
+
+    Returns:
+        str: the path of the profile
+
+    Raises:
+        None
+    """
+    return f'{script_name}{global_values.PROFILE_EXTENSION}'
+
+
+def load_profile(script_name: str, contents: str) -> dict:
+    """Load the profile from an earlier run of a script, noting whether the
+    script has changed since (ie. the profile is stale)
+
+    Args:
+        script_name [str]: the script that is being profiled
+        contents [str]: the source of the script
+
+    Returns:
+        profile [dict]: the profile with the number of times each line was
+            executed (line_counts) and whether it is stale, None if there
+            isn't a profile that can be read
+
+    Raises:
+        None
+    """
+
+    # Try to read the profile
+    try:
+        with open(get_profile_path(script_name), 'r') as profile_file:
+            profile = json.load(profile_file)
+        # Make sure that the counts are there
+        profile = {
+            'script_hash': profile['script_hash'],
+            'line_counts': dict(profile['line_counts'])
+        }
+    # If there isn't one (or it's broken), carry on without it
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    # Note whether the script has changed since the profile was made
+    profile['stale'] = profile['script_hash'] != \
+        hashlib.sha256(contents.encode('utf-8', 'surrogateescape')).hexdigest()
+
+    # Return the profile
+    return profile
+
+
+def save_profile(script_name: str, contents: str, run):
+    """Save the number of times each line was executed to the profile next
+    to the script. Nothing is saved if nothing was executed (eg. the output
+    was replayed from the output cache) so that a good profile isn't lost.
+
+    Args:
+        script_name [str]: the script that is being profiled
+        contents [str]: the source of the script
+        run [sap.Run]: the run of the script that counted the lines
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Leave the old profile alone if nothing was executed
+    if not run.line_counts:
+        return
+
+    profile = {
+        'lang_version': global_values.LANG_VERSION,
+        'script_hash': hashlib.sha256(
+            contents.encode('utf-8', 'surrogateescape')
+        ).hexdigest(),
+        'line_counts': run.line_counts
+    }
+
+    # Write out the profile. A profile is only ever a hint so any problems
+    # writing it are ignored.
+    try:
+        with open(get_profile_path(script_name), 'w') as profile_file:
+            json.dump(profile, profile_file, indent=4)
+    except OSError:
+        pass
+
+
 def perf_tokenisation(lines_for_parsing) -> dict:
     """Runs a performance check on the tokenisation.
 
@@ -272,6 +272,135 @@ elaborated_errors = {
             '20 writeln "Hello World" -> ' +
             f'{colourise.red("\"lower|green|blue\"")}\n' +
             '30 end\n'
+    ],
+    26:  [
+            'This warning is thrown when there are lines that can never be ' +
+            'reached, for instance, lines after an ' +
+            f'{colourise.yellow("end")} statement or after a ' +
+            f'{colourise.yellow("jump")} statement that no other line ' +
+            'jumps back to. These lines are left out when the script is ' +
+            'executed. Run the interpreter with the ' +
+            f'{colourise.yellow("-u")} flag to also drop them from memory.',
+            '10 writeln "Hello World"\n' +
+            '20 jump 40\n' +
+            f'{colourise.red("30 writeln \"Never written\"")}\n' +
+            '40 end'
+    ],
+    27:  [
+            'This error is thrown before the script is executed when a ' +
+            f'{colourise.yellow("jump")} statement creates a loop that can ' +
+            'never be left because there is no ' +
+            f'{colourise.yellow("end")}, {colourise.yellow("get")} or ' +
+            f'{colourise.yellow("pause")} statement between the target of ' +
+            'the jump and the jump itself. Unlike error 22, which is thrown ' +
+            'when the script has run out of room while looping, this error ' +
+            'is found by looking at the shape of the script so no ' +
+            'statements are executed. A loop with a ' +
+            f'{colourise.yellow("pause")} statement is only warned about ' +
+            'as it waits each time around. A script that is piped in is ' +
+            'checked when the loop is first closed.',
+            '10 - This is a comment\n' +
+            '20 writeln "Hello World"\n' +
+            f'{colourise.red("30 jump 20")}\n' +
+            '40 end'
+    ],
+    28:  [
+            'This error is thrown when a ' +
+            f'{colourise.yellow("get")} statement asks for input but there ' +
+            'is none left, for instance when the input is piped in from a ' +
+            'file that has fewer lines than the script asks for.',
+            '10 - This is a comment\n' +
+            f'{colourise.red("20 get name = \"Name? \"")}\n' +
+            '30 writeln "Hello #name"\n' +
+            '40 end'
+    ],
+    29:  [
+            'This error is thrown when a script that is run with a time ' +
+            'limit (for instance, by a program that runs many scripts at ' +
+            'once) is still running when the time is up. Long pauses or ' +
+            'waiting on input that never comes are the usual causes.',
+            '10 - This is a comment\n' +
+            f'{colourise.red("20 pause 3600")}\n' +
+            '30 end'
+    ],
+    30:  [
+            'This error is thrown when a script that is sharing the ' +
+            'interpreter with other scripts (or is run in the sandbox, see ' +
+            f'the {colourise.yellow("-x")} flag) is stopped before it ' +
+            'finishes, either because it was killed or because it executed ' +
+            'more statements than it is allowed. A loop that runs for a ' +
+            'long time is the usual cause.',
+            '10 - This is a comment\n' +
+            '20 set count = "0"\n' +
+            '30 set count = "#count + 1"\n' +
+            f'{colourise.red("40 jump 30")}\n' +
+            '50 end'
+    ],
+    31:  [
+            'This error is thrown when the daemon (see the ' +
+            f'{colourise.yellow("-w")} and {colourise.yellow("-f")} flags) ' +
+            'can\'t listen on its socket, ' +
+            'usually because another daemon is already running. Stop the ' +
+            'other daemon or set the HELASUNO_SOCKET environment variable ' +
+            'to a different path.',
+            'N/A'
+    ],
+    32:  [
+            'This error is thrown when the coordinator of a cluster (see ' +
+            f'the {colourise.yellow("-c")} flag) can\'t listen on its ' +
+            'address or a worker (see the ' +
+            f'{colourise.yellow("-a")} flag) can\'t reach it. Check that ' +
+            'the address is written as host:port, that nothing else is ' +
+            'using the port and that the coordinator is running.',
+            'N/A'
+    ],
+    33:  [
+            'This error is thrown when the records passed with the ' +
+            f'{colourise.yellow("-b")} flag can\'t be read, either because ' +
+            'the file can\'t be opened or because a line of an NDJSON file ' +
+            'isn\'t valid JSON. Each line of an NDJSON file needs to be a ' +
+            'JSON array or object (or a single value), with the fields fed ' +
+            'to the get statements of the script in order.',
+            '{"name": "Ada", "age": 36}\n' +
+            '["Grace", 45]\n' +
+            f'{colourise.red("name: Alan")}'
+    ],
+    34:  [
+            'This error is thrown when a script run in the sandbox (see the ' +
+            f'{colourise.yellow("-x")} flag) tries to use more memory than ' +
+            'it is allowed. Calculations that make very big numbers or ' +
+            'very long text are the usual causes.',
+            '10 - This is a comment\n' +
+            f'{colourise.red("20 set big = \"9 ** 9 ** 9\"")}\n' +
+            '30 end'
+    ],
+    35:  [
+            'This error is thrown when a script run in the sandbox (see the ' +
+            f'{colourise.yellow("-x")} flag) writes more output than it is ' +
+            'allowed. The output up to the limit is kept. A loop that keeps ' +
+            'writing is the usual cause.',
+            '10 - This is a comment\n' +
+            f'{colourise.red("20 writeln \"Again\"")}\n' +
+            '30 jump 20\n' +
+            '40 end'
+    ],
+    36:  [
+            'This error is thrown when a script is resumed (see the ' +
+            f'{colourise.yellow("--resume")} flag) but its checkpoint ' +
+            'can\'t be used, because there isn\'t one, it can\'t be read or ' +
+            'the script (or the language) has changed since it was made. ' +
+            f'Run the script with {colourise.yellow("-k")} to start again ' +
+            'from the top.',
+            'N/A'
+    ],
+    37:  [
+            'This warning is thrown when the profile of a script (see the ' +
+            f'{colourise.yellow("-g")} flag) has a count that isn\'t a ' +
+            'whole number, usually because it was edited by hand. The ' +
+            'script is executed without the profile. Delete the profile ' +
+            '(the file next to the script ending in ' +
+            f'{colourise.yellow(".hsprof")}) to start a new one.',
+            'N/A'
     ]
 }
 
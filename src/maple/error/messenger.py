@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 
 # Standard library imports
-import sys
 import textwrap
 
 # Custom imports
 from etc import colourise
+from maple import sap
 
 '''Copyright 2024-2025 Bryan Smith.
 
@@ -34,6 +34,14 @@ A simple module to handle error and warning messages.
 ERROR_MESSAGE_WRAP = 50
 
 
+class ScriptExit(SystemExit):
+    """Raised to stop running a script (eg. by an end statement or an error).
+    This is caught by whatever is running the script (see xylem.execute()) so
+    that only the run stops rather than the whole interpreter. As it is a
+    SystemExit, anything that doesn't catch it still exits as before.
+    """
+
+
 def simple_warning(message, error_code=0):
     """Report back a simple warning message.
 
@@ -49,6 +57,14 @@ def simple_warning(message, error_code=0):
         None
     """
 
+    # Keep the warning with the run that is going
+    sap.add_diagnostic({
+        'type': 'warning',
+        'line_number': None,
+        'error_code': error_code,
+        'message': message
+    })
+
     # Create a wrapped version of the warning message that is no more than
     # ERROR_MESSAGE_WRAP characters wide.
     message = textwrap.fill(message, ERROR_MESSAGE_WRAP)
@@ -56,14 +72,16 @@ def simple_warning(message, error_code=0):
     if error_code == 0:
         # Print out the error message in red
         print(
-            colourise.yellow('\n[Warning]\n') + message + '\n'
+            colourise.yellow('\n[Warning]\n') + message + '\n',
+            file=sap.get_output()
         )
     else:
         # Print out the error message in red with the error code
         print(
             colourise.yellow('\n[Warning]\n') +
             message + '\n' +
-            colourise.magenta(f'[Code: {error_code}]\n')
+            colourise.magenta(f'[Code: {error_code}]\n'),
+            file=sap.get_output()
         )
 
 
@@ -83,6 +101,14 @@ def line_warning(message, line_no, error_code=0):
         None
     """
 
+    # Keep the warning with the run that is going
+    sap.add_diagnostic({
+        'type': 'warning',
+        'line_number': line_no,
+        'error_code': error_code,
+        'message': message
+    })
+
     # Create a wrapped version of the warning message that is no more than
     # ERROR_MESSAGE_WRAP characters wide.
     message = textwrap.fill(message, ERROR_MESSAGE_WRAP)
@@ -91,14 +117,16 @@ def line_warning(message, line_no, error_code=0):
         # Print out the error message in red
         print(
             colourise.yellow(f'\n[Warning on Line {line_no}]\n') +
-            message + '\n'
+            message + '\n',
+            file=sap.get_output()
         )
     else:
         # Print out the error message in red with the error code
         print(
             colourise.yellow(f'\n[Warning on Line {line_no}]\n') +
             message + '\n' +
-            colourise.magenta(f'[Code: {error_code}]\n')
+            colourise.magenta(f'[Code: {error_code}]\n'),
+            file=sap.get_output()
         )
 
 
@@ -116,9 +144,17 @@ def simple_error(message, error_code=0, exit=True):
         N/A
 
     Raises:
-        None
+        ScriptExit: if exit is True
     """
 
+    # Keep the error with the run that is going
+    sap.add_diagnostic({
+        'type': 'error',
+        'line_number': None,
+        'error_code': error_code,
+        'message': message
+    })
+
     # Create a wrapped version of the warning message that is no more than
     # ERROR_MESSAGE_WRAP characters wide.
     message = textwrap.fill(message, ERROR_MESSAGE_WRAP)
@@ -126,19 +162,21 @@ def simple_error(message, error_code=0, exit=True):
     if error_code == 0:
         # Print out the error message in red
         print(
-            colourise.red('\n[Error]\n') + message + '\n'
+            colourise.red('\n[Error]\n') + message + '\n',
+            file=sap.get_output()
         )
     else:
         # Print out the error message in red with the error code
         print(
             colourise.red('\n[Error]\n') +
             message + '\n' +
-            colourise.magenta(f'[Code: {error_code}]\n')
+            colourise.magenta(f'[Code: {error_code}]\n'),
+            file=sap.get_output()
         )
 
     # If exit remains True, exit the script
     if exit:
-        sys.exit(0)
+        raise ScriptExit(0)
 
 
 def line_error(message, line_no, error_code=0, exit=True):
@@ -156,9 +194,17 @@ def line_error(message, line_no, error_code=0, exit=True):
         N/A
 
     Raises:
-        None
+        ScriptExit: if exit is True
     """
 
+    # Keep the error with the run that is going
+    sap.add_diagnostic({
+        'type': 'error',
+        'line_number': line_no,
+        'error_code': error_code,
+        'message': message
+    })
+
     # Create a wrapped version of the warning message that is no more than
     # ERROR_MESSAGE_WRAP characters wide.
     message = textwrap.fill(message, ERROR_MESSAGE_WRAP)
@@ -166,16 +212,18 @@ def line_error(message, line_no, error_code=0, exit=True):
     if error_code == 0:
         # Print out the error message in red
         print(
-            colourise.red(f'\n[Error on Line {line_no}]\n') + message + '\n'
+            colourise.red(f'\n[Error on Line {line_no}]\n') + message + '\n',
+            file=sap.get_output()
         )
     else:
         # Print out the error message in red with the error code
         print(
             colourise.red(f'\n[Error on Line {line_no}]\n') +
             message + '\n' +
-            colourise.magenta(f'[Code: {error_code}]\n')
+            colourise.magenta(f'[Code: {error_code}]\n'),
+            file=sap.get_output()
         )
 
     # If exit remains True, exit the script
     if exit:
-        sys.exit(0)
+        raise ScriptExit(0)
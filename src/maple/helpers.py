@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 
 # Standard library imports
-import sys
+import ast
+import math
+import operator
 from string import Template
 
 # Language imports
 from etc import colourise
-from maple import values
+from maple import (sap, values)
 from maple.error import messenger
 
 '''Copyright 2024-2025 Bryan Smith.
@@ -34,6 +36,30 @@ This module provides helper functions to assist with various parsing needs.
 '''
 
 
+# The operators a sandboxed run can calculate with (see
+# calculate_sandboxed()), which are the only parts of an expression other than
+# literals and names that it can hold
+SANDBOX_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Not: operator.not_,
+    ast.Invert: operator.invert,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge
+}
+
+
 class VarTemplater(Template):
     # https://stackoverflow.com/a/1336851
     # Replace the delimiter with the values.VARIABLE_SYMBOL
@@ -62,7 +88,7 @@ def substitute_values(expression: str, line_number: str) -> str:
     # variable_templater = VarTemplater(expression.strip('"'))
     try:
         # Substitute the values in the string with variables
-        expression = variable_templater.substitute(values.VARIABLES)
+        expression = variable_templater.substitute(sap.get_run().variables)
         # Return the variable substitutions
         return expression
     # Catch a variable substitution that doesn't make sense (eg. a variable)
@@ -86,8 +112,6 @@ def substitute_values(expression: str, line_number: str) -> str:
             line_no=line_number,
             error_code=24
         )
-        print('VALUE!')
-        sys.exit(0)
 
 
 def calculate_value(expression: str) -> str:
@@ -109,11 +133,153 @@ def calculate_value(expression: str) -> str:
     try:
         # Strip any lingering single quotation marks
         expression = expression.strip("'").strip('"')
+        # A sandboxed run never hands the expression to Python (see
+        # calculate_sandboxed())
+        if sap.get_run().sandboxed:
+            expression = calculate_sandboxed(expression)
         # Attempt to evaluate the expression
-        expression = eval(expression)
+        else:
+            expression = eval(expression)
     # Catch a NameError which is thrown if the expression can't be calculated
     except (NameError, SyntaxError):
         # Ignore and avoid conversions
         pass
     # Return the expression
     return expression
+
+
+def calculate_sandboxed(expression: str):
+    """Calculate an expression for a sandboxed run (see the -x flag) without
+    eval(). Only literals and the SANDBOX_OPERATORS on them are calculated,
+    so a script can't call, look up or reach inside anything (eg. to import
+    a module or open a file). There is nothing for a name to stand for, so
+    an expression with a name, or anything else, is kept as it is in the same
+    way as calculate_value() keeps an expression with a name it can't look
+    up.
+
+    Args:
+        expression [str]: the expression to calculate
+
+    Returns:
+        the calculated value
+
+    Raises:
+        NameError: if the expression holds a name or anything other than
+            literals and the SANDBOX_OPERATORS
+        SyntaxError: if the expression isn't Python
+    """
+
+    def calculate_node(node):
+        # Literals are taken as they are
+        if isinstance(node, ast.Constant):
+            return node.value
+        # Operators are worked out from the values on either side
+        if isinstance(node, ast.BinOp) and \
+                type(node.op) in SANDBOX_OPERATORS:
+            return SANDBOX_OPERATORS[type(node.op)](
+                calculate_node(node.left), calculate_node(node.right)
+            )
+        if isinstance(node, ast.UnaryOp) and \
+                type(node.op) in SANDBOX_OPERATORS:
+            return SANDBOX_OPERATORS[type(node.op)](
+                calculate_node(node.operand)
+            )
+        # Comparisons are chained in the same way as Python chains them
+        if isinstance(node, ast.Compare) and all(
+                type(op) in SANDBOX_OPERATORS for op in node.ops):
+            left = calculate_node(node.left)
+            for op, comparator in zip(node.ops, node.comparators):
+                right = calculate_node(comparator)
+                if not SANDBOX_OPERATORS[type(op)](left, right):
+                    return False
+                left = right
+            return True
+        # Anything else (names, calls, attributes, subscripts, lambdas,
+        # comprehensions and so on) is refused
+        raise NameError(
+            f'{type(node).__name__} can\'t be calculated in the sandbox'
+        )
+
+    # Leading whitespace is stripped in the same way as eval() strips it
+    parsed = ast.parse(expression.lstrip(' \t'), mode='eval')
+    return calculate_node(parsed.body)
+
+
+def store_variable(variable_name: str, variable_value):
+    """Store a variable and move its version on if its value has changed so
+    that anything rendered with the old value (see
+    stmt_write.render_cached_output()) is rendered again.
+
+    Args:
+        variable_name [str]: the name of the variable
+        variable_value: the value of the variable
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    # The variables belong to the run
+    run = sap.get_run()
+    variables = run.variables
+    # Check whether the value is different to the old one (the type is
+    # checked as well as, say, 1 and 1.0 are equal but are written
+    # differently)
+    changed = variable_name not in variables or \
+        type(variables[variable_name]) is not type(variable_value) or \
+        variables[variable_name] != variable_value
+    # Store the variable
+    variables[variable_name] = variable_value
+    # Move the version on if the value has changed
+    if changed:
+        run.variable_versions[variable_name] = \
+            run.variable_versions.get(variable_name, 0) + 1
+
+
+def calculate_compiled(compiled: tuple) -> tuple:
+    """Calculate an expression compiled ahead of time (see
+    cambium.compile_arithmetic()) from the values of its variables. This only
+    gives the same result as substituting the values into the text and
+    calculating that when every value is a number that is written out in
+    full, so anything else is left for substitute_values() and
+    calculate_value().
+
+    Args:
+        compiled [tuple]: the compiled expression and the variables it reads
+
+    Returns:
+        calculated [bool]: whether the expression was calculated
+        value: the calculated value, None if it wasn't calculated
+
+    Raises:
+        None
+    """
+
+    # A sandboxed run calculates everything without eval() (see
+    # calculate_sandboxed())
+    run = sap.get_run()
+    if run.sandboxed:
+        return False, None
+
+    code, identifiers = compiled
+    # Get the values of the variables
+    variables = run.variables
+    arguments = {}
+    for index, name in enumerate(identifiers):
+        value = variables.get(name)
+        # Only finite floats and integers that can be written out in full
+        # are substituted as is
+        if type(value) is int:
+            if value.bit_length() > 14000:
+                return False, None
+        elif type(value) is not float or not math.isfinite(value):
+            return False, None
+        arguments[f'hs_compiled_{index}'] = value
+
+    # Calculate the value. Any error is left to happen in the same way as it
+    # would when calculating the text.
+    try:
+        return True, eval(code, {'__builtins__': {}}, arguments)
+    except Exception:
+        return False, None
@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+
+# Language imports
+from maple import (helpers, tree, values)
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+This Maple module maps how control flows through the TOKEN_TREE. Where the
+xylem moves tokens up to the statements, the phloem carries information about
+the shape of the script back down: which lines always run together (basic
+blocks) and which blocks can follow one another (edges). The resulting control
+flow graph is the starting point for any analysis that needs to know where a
+jump statement can take the script.
+'''
+
+
+def get_statement_name(tokens: list) -> str:
+    """Get the name of the statement on a line of the token tree
+
+    Args:
+        tokens [list]: the list of tokens on the line
+
+    Returns:
+        str: the statement name or None if the line has no statement
+
+    Raises:
+        None
+    """
+
+    # The statement name is necessarily the second token, after the line
+    # number
+    try:
+        return tokens[1]['token_value']
+    # A line without a second token has no statement
+    except IndexError:
+        return None
+
+
+def get_jump_target(tokens: list, token_tree: dict) -> str:
+    """Get the line number that a jump statement will move execution to
+
+    Args:
+        tokens [list]: the list of tokens on the line with the jump statement
+        token_tree [dict]: the token tree that the target must be a line of
+
+    Returns:
+        str: the line number of the target or None if the target is not a
+            line in the token tree (the jump statement will report that
+            error when it is executed)
+
+    Raises:
+        None
+    """
+
+    # Try to get the location of the jump in the same way as the jump
+    # statement does
+    try:
+        jump_location = tokens[2]['token_value'].strip('"')
+    # If there is no location, there is no target
+    except IndexError:
+        return None
+
+    # Only a line that exists in the tree can be a target. This is a
+    # dictionary lookup which keeps the graph building linear in time.
+    if jump_location in token_tree:
+        return jump_location
+
+    # Otherwise, there is no valid target
+    return None
+
+
+def get_assigned_variable(tokens: list) -> str:
+    """Get the name of the variable that a line assigns a value to
+
+    Args:
+        tokens [list]: the list of tokens on the line
+
+    Returns:
+        str: the name of the variable for a set or get statement, None for
+            any other statement
+
+    Raises:
+        None
+    """
+
+    # Only set and get statements assign variables
+    if get_statement_name(tokens) not in ('set', 'get'):
+        return None
+
+    # The variable name is the third token
+    try:
+        return tokens[2]['token_value']
+    # A line without a variable name doesn't assign anything
+    except IndexError:
+        return None
+
+
+def get_read_variables(tokens: list) -> set:
+    """Get the names of the variables that a line reads when it is executed
+
+    Args:
+        tokens [list]: the list of tokens on the line
+
+    Returns:
+        set: the names of the variables that are read or None if any variable
+            might be read (a get statement substitutes variables into
+            whatever the user inputs)
+
+    Raises:
+        None
+    """
+
+    # Get the expression that has variables substituted into it
+    try:
+        match get_statement_name(tokens):
+            case 'get':
+                return None
+            case 'set':
+                expression = tokens[4]['token_value'].strip('"')
+            case 'pause' | 'write' | 'writeln':
+                expression = tokens[2]['token_value']
+            case _:
+                return set()
+    # A line that is missing parts doesn't read anything
+    except IndexError:
+        return set()
+
+    # Set up a templater in the same way as helpers.substitute_values()
+    variable_templater = helpers.VarTemplater(
+        expression.strip("'").strip('"')
+    )
+    # A lone variable symbol errors out before anything is read
+    if not variable_templater.is_valid():
+        return set()
+
+    # Return the variables in the expression
+    return set(variable_templater.get_identifiers())
+
+
+def build_flow_graph(token_tree: dict = None) -> dict:
+    """Build the control flow graph of a script from the token tree. A new
+    basic block starts at the first line, at every line that is the target
+    of a jump statement and at every line that follows a jump or an end
+    statement. The graph is built in two passes over the tree so the time it
+    takes grows linearly with the number of lines.
+
+    Args:
+        token_tree [dict]: the token tree to build the graph from, defaults to
+            the tree.TOKEN_TREE
+
+    Returns:
+        dict: the control flow graph with the following keys:
+            entry: the index of the first block (None for an empty tree)
+            blocks: a list of blocks, each a dictionary with the block id, its
+                lines, the statement that ends the block (terminator), and the
+                successors and predecessors of the block
+            line_to_block: a dictionary mapping each line number to the id of
+                the block that holds it
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    # Get the line numbers in the order they are executed
+    line_numbers = list(token_tree.keys())
+
+    # Hold the lines that start a new block (ie. the leaders). The first line
+    # always starts a block.
+    leaders = set(line_numbers[:1])
+    # Hold the jump target of each jump statement so that the target only
+    # has to be worked out once
+    jump_targets = {}
+
+    # First pass: find the leaders
+    for index, line_no in enumerate(line_numbers):
+        # Get the statement name
+        statement_name = get_statement_name(token_tree[line_no])
+        # Jump and end statements finish a block
+        if statement_name in ('jump', 'end'):
+            # The line after a jump or an end starts a new block
+            if index + 1 < len(line_numbers):
+                leaders.add(line_numbers[index + 1])
+            # The target of a jump starts a new block too
+            if statement_name == 'jump':
+                target = get_jump_target(token_tree[line_no], token_tree)
+                jump_targets[line_no] = target
+                if target is not None:
+                    leaders.add(target)
+
+    # Hold the blocks and the mapping of lines to blocks
+    blocks = []
+    line_to_block = {}
+
+    # Second pass: split the lines into blocks
+    for line_no in line_numbers:
+        # Start a new block on a leader
+        if line_no in leaders:
+            blocks.append({
+                'id': len(blocks),
+                'lines': [],
+                'terminator': None,
+                'successors': [],
+                'predecessors': []
+            })
+        # Add the line to the current block
+        blocks[-1]['lines'].append(line_no)
+        line_to_block[line_no] = blocks[-1]['id']
+
+    # Connect the blocks by looking at the last line of each block
+    for block in blocks:
+        # Get the last line of the block
+        last_line = block['lines'][-1]
+        # Get the statement on the last line
+        statement_name = get_statement_name(token_tree[last_line])
+
+        match statement_name:
+            case 'end':
+                # An end statement finishes the script so there are no
+                # successors
+                block['terminator'] = 'end'
+            case 'jump':
+                # A jump statement moves execution to its target. An invalid
+                # target errors out at runtime so there are no successors.
+                block['terminator'] = 'jump'
+                target = jump_targets[last_line]
+                if target is not None:
+                    block['successors'].append(line_to_block[target])
+            case _:
+                # Anything else falls through to the next block
+                block['terminator'] = 'fallthrough'
+                if block['id'] + 1 < len(blocks):
+                    block['successors'].append(block['id'] + 1)
+
+        # Add the block as a predecessor of each of its successors
+        for successor in block['successors']:
+            blocks[successor]['predecessors'].append(block['id'])
+
+    # Return the graph
+    return {
+        'entry': 0 if blocks else None,
+        'blocks': blocks,
+        'line_to_block': line_to_block
+    }
+
+
+def describe_block(block: dict) -> str:
+    """Describe the lines a block spans for the graph dumps
+
+    Args:
+        block [dict]: the block to describe
+
+    Returns:
+        str: the first and last line of the block (eg. 20-50) or the single
+            line if the block only has one
+
+    Raises:
+        None
+    """
+
+    # A block of a single line only needs that line
+    if len(block['lines']) == 1:
+        return block['lines'][0]
+
+    # Otherwise, give the range of lines
+    return f'{block["lines"][0]}-{block["lines"][-1]}'
+
+
+def flow_graph_to_text(flow_graph: dict) -> str:
+    """Produce a plain text version of the control flow graph
+
+    Args:
+        flow_graph [dict]: the control flow graph from build_flow_graph()
+
+    Returns:
+        str: the graph as text with one block per line
+
+    Raises:
+        None
+    """
+
+    # Hold each line of the text
+    text = []
+
+    # Describe each block in turn
+    for block in flow_graph['blocks']:
+        # Get the successors and predecessors as lists of block ids
+        successors = ', '.join(
+            f'B{successor}' for successor in block['successors']
+        ) or '-'
+        predecessors = ', '.join(
+            f'B{predecessor}' for predecessor in block['predecessors']
+        ) or '-'
+        text.append(
+            f'B{block["id"]} [{describe_block(block)}] ' +
+            f'({block["terminator"]}) -> {successors} <- {predecessors}'
+        )
+
+    # Return the text
+    return '\n'.join(text)
+
+
+def flow_graph_to_dot(flow_graph: dict, token_tree: dict = None) -> str:
+    """Produce a Graphviz DOT version of the control flow graph
+
+    Args:
+        flow_graph [dict]: the control flow graph from build_flow_graph()
+        token_tree [dict]: the token tree that the graph was built from which
+            provides the lines of code for each block, defaults to the
+            tree.TOKEN_TREE
+
+    Returns:
+        str: the graph in the DOT language
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    # Start the graph
+    dot = ['digraph cfg {', '    node [shape=box, fontname="monospace"];']
+
+    # Add each block as a node labelled with its lines of code
+    for block in flow_graph['blocks']:
+        # Get the lines of code, left justified (\l) in the node
+        label = ''
+        for line_no in block['lines']:
+            # Get the full line of code from the first token on the line
+            full_loc = token_tree[line_no][0]['full_line_of_code'].strip()
+            # Escape any characters that are special in a DOT label
+            full_loc = full_loc.replace('\\', '\\\\').replace('"', '\\"')
+            label += f'{full_loc}\\l'
+        dot.append(f'    B{block["id"]} [label="B{block["id"]}\\l{label}"];')
+
+    # Add each edge
+    for block in flow_graph['blocks']:
+        for successor in block['successors']:
+            dot.append(f'    B{block["id"]} -> B{successor};')
+
+    # Finish the graph
+    dot.append('}')
+
+    # Return the graph
+    return '\n'.join(dot)
+
+
+def find_loops(flow_graph: dict) -> list:
+    """Find the loops formed by jump statements that move execution backwards
+    in the script. As there are no conditional statements, each block has at
+    most one successor so a loop is a single cycle of blocks that starts at
+    the target of the backward jump (the header) and finishes with the block
+    that holds the jump (the latch).
+
+    Args:
+        flow_graph [dict]: the control flow graph from build_flow_graph()
+
+    Returns:
+        loops [list]: a list of loops, each a dictionary with the header and
+            latch block ids, the block ids of the loop in the order they are
+            executed and whether the only way into the loop is through its
+            header (single_entry)
+
+    Raises:
+        None
+    """
+
+    blocks = flow_graph['blocks']
+    # Hold the loops
+    loops = []
+
+    for block in blocks:
+        # Only a jump backwards (or onto itself) can close a loop
+        if block['terminator'] != 'jump' or not block['successors'] or \
+                block['successors'][0] > block['id']:
+            continue
+
+        # Follow the blocks from the header until the latch is reached again
+        header = block['successors'][0]
+        loop_blocks = [header]
+        in_loop = {header}
+        current = header
+        while current != block['id']:
+            successors = blocks[current]['successors']
+            # If the path ends or runs into a different cycle, the jump
+            # doesn't close a loop of its own
+            if not successors or successors[0] in in_loop:
+                loop_blocks = None
+                break
+            current = successors[0]
+            loop_blocks.append(current)
+            in_loop.add(current)
+
+        # Move along if there is no loop
+        if loop_blocks is None:
+            continue
+
+        # The loop only has a single entry if every block other than the
+        # header is only reached from within the loop
+        single_entry = all(
+            predecessor in in_loop
+            for loop_block in loop_blocks[1:]
+            for predecessor in blocks[loop_block]['predecessors']
+        )
+
+        loops.append({
+            'header': header,
+            'latch': block['id'],
+            'blocks': loop_blocks,
+            'single_entry': single_entry
+        })
+
+    # Return the loops
+    return loops
+
+
+def find_inescapable_cycles(
+    flow_graph: dict,
+    token_tree: dict = None
+) -> list:
+    """Find the cycles of blocks that a script can never leave once it is in
+    them. As each block has at most one successor, every cycle in the graph
+    is a strongly connected group of blocks with no way out. Cycles with a
+    get statement are left alone as the user is driving them. Cycles with a
+    pause statement are still found as they only wait on the clock (eg. a
+    script that checks on something every so often).
+
+    Args:
+        flow_graph [dict]: the control flow graph from build_flow_graph()
+        token_tree [dict]: the token tree the graph was built from, defaults
+            to the tree.TOKEN_TREE
+
+    Returns:
+        cycles [list]: a list of cycles, each a list of the line numbers in
+            the cycle in the order they are executed
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    blocks = flow_graph['blocks']
+    # The walk that first visited each block (None if not visited yet)
+    visited_by = [None] * len(blocks)
+    # Hold the cycles
+    cycles = []
+
+    for start in range(len(blocks)):
+        # Move along if an earlier walk has been through this block
+        if visited_by[start] is not None:
+            continue
+
+        # Follow the successors from the block until the path ends or it
+        # reaches a block that has already been visited
+        path = []
+        current = start
+        while current is not None and visited_by[current] is None:
+            visited_by[current] = start
+            path.append(current)
+            successors = blocks[current]['successors']
+            current = successors[0] if successors else None
+
+        # A cycle is only new if this walk ran back into itself
+        if current is None or visited_by[current] != start:
+            continue
+
+        # The cycle is the part of the path from the repeated block onwards
+        cycle_blocks = path[path.index(current):]
+        cycle_lines = [
+            line_no
+            for cycle_block in cycle_blocks
+            for line_no in blocks[cycle_block]['lines']
+        ]
+
+        # Leave out cycles that wait on the user
+        if any(
+            get_statement_name(token_tree[line_no]) == 'get'
+            for line_no in cycle_lines
+        ):
+            continue
+
+        cycles.append(cycle_lines)
+
+    # Return the cycles
+    return cycles
+
+
+def get_all_variables(token_tree: dict) -> set:
+    """Get every variable that a script reads or assigns, along with the
+    reserved variables
+
+    Args:
+        token_tree [dict]: the token tree of the script
+
+    Returns:
+        set: the names of the variables
+
+    Raises:
+        None
+    """
+
+    # Start with the reserved variables
+    all_variables = set(values.VARIABLES)
+
+    # Add the variables read or assigned on each line
+    for tokens in token_tree.values():
+        read_variables = get_read_variables(tokens)
+        if read_variables:
+            all_variables.update(read_variables)
+        assigned_variable = get_assigned_variable(tokens)
+        if assigned_variable is not None:
+            all_variables.add(assigned_variable)
+
+    # Return the variables
+    return all_variables
+
+
+def find_live_variables(flow_graph: dict, token_tree: dict = None) -> list:
+    """Work out which variables are live at the end of each block, that is,
+    which variables might be read before they are next assigned. This works
+    backwards through the control flow graph until nothing changes.
+
+    Args:
+        flow_graph [dict]: the control flow graph from build_flow_graph()
+        token_tree [dict]: the token tree the graph was built from, defaults
+            to the tree.TOKEN_TREE
+
+    Returns:
+        live_out [list]: the set of live variables at the end of each block,
+            indexed by block id
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    blocks = flow_graph['blocks']
+
+    # Get every variable that the script could read so that a get statement
+    # can mark all of them as live
+    all_variables = get_all_variables(token_tree)
+
+    # Hold the live variables at the start and end of each block
+    live_in = [set() for _ in blocks]
+    live_out = [set() for _ in blocks]
+
+    # Work backwards until nothing changes
+    worklist = [block['id'] for block in blocks]
+    while worklist:
+        block = blocks[worklist.pop()]
+        # The variables live at the end of a block are those live at the
+        # start of any of its successors
+        live = set()
+        for successor in block['successors']:
+            live |= live_in[successor]
+        live_out[block['id']] = live
+        # Go backwards through the lines of the block
+        live = transfer_live_variables(
+            block['lines'], live, token_tree, all_variables
+        )
+        # If the start of the block has changed, the predecessors need
+        # another look
+        if live != live_in[block['id']]:
+            live_in[block['id']] = live
+            worklist.extend(block['predecessors'])
+
+    # Return the live variables at the end of each block
+    return live_out
+
+
+def transfer_live_variables(
+                            lines: list,
+                            live: set,
+                            token_tree: dict,
+                            all_variables: set) -> set:
+    """Work backwards through lines to get the variables live before them
+
+    Args:
+        lines [list]: the line numbers to work through, in execution order
+        live [set]: the variables live after the last line
+        token_tree [dict]: the token tree the lines are from
+        all_variables [set]: every variable the script could read
+
+    Returns:
+        set: the variables live before the first line
+
+    Raises:
+        None
+    """
+
+    # Work on a copy
+    live = set(live)
+
+    for line_no in reversed(lines):
+        tokens = token_tree[line_no]
+        read_variables = get_read_variables(tokens)
+        # A get statement could read anything
+        if read_variables is None:
+            live = set(all_variables)
+            continue
+        # A variable that is assigned is no longer live before the line,
+        # unless the line reads it too
+        assigned_variable = get_assigned_variable(tokens)
+        if assigned_variable is not None:
+            live.discard(assigned_variable)
+        live |= read_variables
+
+    # Return the live variables
+    return live
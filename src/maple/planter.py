@@ -221,6 +221,16 @@ def build_tree(show=False, show_line=None) -> dict:
     # Set the LINE_NUMBERS to the keys from the tree
     tree.LINE_NUMBERS = list(tree.TOKEN_TREE.keys())
 
+    # Anything worked out from the old tree (eg. folded values) no longer
+    # applies so clear it out
+    tree.FOLDED_VALUES = {}
+    tree.HOISTED_LINES = {}
+    tree.ELIMINATED_LINES = {}
+    tree.JUMP_TABLE = {}
+    tree.CACHEABLE_LINES = {}
+    tree.COMPILED_LINES = {}
+    tree.RENDER_CACHE_SIZE = None
+
     # Delete the temp_token_tree. This won't save much memory but every little
     # bit helps
     del temp_token_tree
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import asyncio
+import contextlib
+import contextvars
+import sys
+
+# Language imports
+from maple import (seed, values)
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+Sap is what moves through a tree while it is alive. This Maple module holds
+everything that changes while a script is run (its variables, its output, the
+render cache and so on) in a Run so that a Program (see seed.Program) can be
+run many times without one run seeing another. The run that is going is kept
+in a context variable so that each thread (or asyncio task) sees its own.
+'''
+
+# The run that is going in this thread or task, None if there isn't one
+CURRENT_RUN = contextvars.ContextVar('current_run', default=None)
+
+
+class Run:
+    """The state of a single run of a program
+    """
+
+    def __init__(self, program, output=None, input_stream=None,
+                 profiling=False, variables=None, async_input=None,
+                 filtering=False):
+        # The program being run, which is None while a script is being loaded
+        # into a program (see engine.compile_program())
+        self.program = program
+        # The variables, starting with the reserved variables
+        self.variables = values.reserved_variables() if variables is None \
+            else variables
+        # The number of times each variable has changed
+        self.variable_versions = {}
+        # The rendered output of write statements (see
+        # stmt_write.render_cached_output())
+        self.rendered_output = {}
+        self.render_cache_stats = {'hits': 0, 'misses': 0}
+        # Whether lines are counted and the counts
+        self.profiling = profiling
+        self.line_counts = {}
+        # The number of statements executed so far
+        self.statements_executed = 0
+        # The lines hoisted out of the loop being executed (see
+        # xylem.walk_statements()) and the number of lines of input read,
+        # which are kept for checkpoints
+        self.skip_lines = ()
+        self.lines_read = 0
+        # What writes the checkpoints of the run (see
+        # interpreter/checkpoint.py), None if the run isn't checkpointed
+        self.checkpointer = None
+        # Whether the run is sandboxed (see interpreter/sandbox.py), in which
+        # case calculations are only arithmetic on literals (see
+        # helpers.calculate_sandboxed())
+        self.sandboxed = False
+        # Where output is written and input is read from, None for the
+        # screen and keyboard (ie. sys.stdout and sys.stdin)
+        self.output = output
+        self.input_stream = input_stream
+        # Where input is waited on when the run is on an asyncio event loop
+        # (see read_line_async()), None to read the input stream instead
+        self.async_input = async_input
+        # The errors and warnings reported during the run
+        self.diagnostics = []
+        # The exit status once the run has finished
+        self.exit_status = None
+        # Whether the run is a filter over its input (see the -t flag), in
+        # which case get statements don't write their prompt, keep the line
+        # as it is (in the variable and in hs_line) and stop the run at the
+        # end of the input, and output is left for the stream to flush
+        self.filtering = filtering
+        if filtering:
+            self.variables[values.VARIABLE_LINE] = ''
+
+    def __repr__(self):
+        return f'<Run of {self.program!r} (exit status {self.exit_status})>'
+
+    @classmethod
+    def from_globals(cls):
+        """Make a run that works on the planted tree and the variables in the
+        values module, for when a statement is executed without a run going
+        (eg. in tests)
+
+        Args:
+            N/A
+
+        Returns:
+            Run: the run
+
+        Raises:
+            None
+        """
+        run = cls(
+            seed.Program.from_tree(frozen=False),
+            profiling=values.PROFILING,
+            variables=values.VARIABLES
+        )
+        run.variable_versions = values.VARIABLE_VERSIONS
+        run.rendered_output = values.RENDERED_OUTPUT
+        run.render_cache_stats = values.RENDER_CACHE_STATS
+        run.line_counts = values.LINE_COUNTS
+        return run
+
+    def get_output(self):
+        """Get the stream that output is written to
+
+        Args:
+            N/A
+
+        Returns:
+            the output stream
+
+        Raises:
+            None
+        """
+        return self.output if self.output is not None else sys.stdout
+
+    def write(self, text: str):
+        """Write text to the output and flush it so that it shows up straight
+        away (eg. before a pause statement), unless the run is a filter
+
+        Args:
+            text [str]: the text to write
+
+        Returns:
+            N/A
+
+        Raises:
+            None
+        """
+        output = self.get_output()
+        output.write(text)
+        if not self.filtering:
+            output.flush()
+
+    def read_line(self, prompt: str) -> str:
+        """Read a line of input after writing out a prompt
+
+        Args:
+            prompt [str]: the prompt to write out
+
+        Returns:
+            str: the line without its newline
+
+        Raises:
+            EOFError: if there is no more input
+        """
+
+        # Use input() for the screen and keyboard so that line editing works
+        if self.output is None and self.input_stream is None:
+            line = input(prompt)
+            self.lines_read += 1
+            return line
+
+        # Otherwise, write the prompt (unless the run is a filter) and read
+        # the line in the same way
+        if not self.filtering:
+            self.write(prompt)
+        line = (self.input_stream or sys.stdin).readline()
+        if line == '':
+            raise EOFError('EOF when reading a line')
+        self.lines_read += 1
+        return line[:-1] if line.endswith('\n') else line
+
+    async def read_line_async(self, prompt: str) -> str:
+        """Wait for a line of input after writing out a prompt, for runs on
+        an asyncio event loop. The async input can be an asyncio.Queue of
+        lines (with None marking the end of the input) or anything with a
+        readline() coroutine (eg. an asyncio.StreamReader).
+
+        Args:
+            prompt [str]: the prompt to write out
+
+        Returns:
+            str: the line without its newline
+
+        Raises:
+            EOFError: if there is no more input
+        """
+
+        # Without an async input, read the input stream in a thread so that
+        # the event loop isn't held up
+        if self.async_input is None:
+            return await asyncio.to_thread(self.read_line, prompt)
+
+        # Write the prompt
+        self.write(prompt)
+
+        # Wait for a line from a queue
+        if isinstance(self.async_input, asyncio.Queue):
+            line = await self.async_input.get()
+            # The end of the input is left in the queue for any later reads
+            if line is None:
+                with contextlib.suppress(asyncio.QueueFull):
+                    self.async_input.put_nowait(None)
+                raise EOFError('EOF when reading a line')
+        # Otherwise, wait for a line from the reader
+        else:
+            line = await self.async_input.readline()
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', 'replace')
+            if line == '':
+                raise EOFError('EOF when reading a line')
+
+        return line[:-1] if line.endswith('\n') else line
+
+
+def get_run() -> Run:
+    """Get the run that is going in this thread or task
+
+    Args:
+        N/A
+
+    Returns:
+        Run: the run, or one that works on the planted tree and the values
+            module if there isn't a run going (see Run.from_globals())
+
+    Raises:
+        None
+    """
+    run = CURRENT_RUN.get()
+    if run is None:
+        run = Run.from_globals()
+    return run
+
+
+def add_diagnostic(diagnostic: dict):
+    """Keep an error or warning with the run that is going so that it can be
+    handed back to whatever started the run (see engine.run_program())
+
+    Args:
+        diagnostic [dict]: the error or warning
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    run = CURRENT_RUN.get()
+    if run is not None:
+        run.diagnostics.append(diagnostic)
+
+
+def get_output():
+    """Get the stream that output (including errors and warnings) is written
+    to in this thread or task
+
+    Args:
+        N/A
+
+    Returns:
+        the output stream of the run that is going or sys.stdout if there
+            isn't one
+
+    Raises:
+        None
+    """
+    run = CURRENT_RUN.get()
+    if run is None:
+        return sys.stdout
+    return run.get_output()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import types
+
+# Language imports
+from maple import (tree, values)
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A seed holds everything needed to grow a tree again. This Maple module does the
+same for a script: once the TOKEN_TREE is planted and the cambium has worked
+on it, everything that is needed to run the script (the tree itself, the
+folded values, the resolved jumps and so on) is gathered into a Program. A
+Program can't be changed so it can be run any number of times, one after
+another or at the same time, with each run keeping its own state (see
+sap.Run).
+'''
+
+
+def freeze(value):
+    """Make a read only copy of a value from the planted tree. Dictionaries
+    become read only mappings and lists become tuples, all the way down.
+
+    Args:
+        value: the value to freeze
+
+    Returns:
+        the frozen value
+
+    Raises:
+        None
+    """
+    # Dictionaries become read only mappings
+    if isinstance(value, (dict, types.MappingProxyType)):
+        return types.MappingProxyType(
+            {key: freeze(item) for key, item in value.items()}
+        )
+    # Lists become tuples
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    # Anything else (eg. strings, numbers and compiled code) can't be changed
+    return value
+
+
+class Program:
+    """A script that has been planted and is ready to be run. A program can't
+    be changed once it is made so it can be shared between runs.
+    """
+
+    __slots__ = (
+        'name',
+        'source',
+        'token_tree',
+        'lines',
+        'line_numbers',
+        'folded_values',
+        'hoisted_lines',
+        'eliminated_lines',
+        'jump_table',
+        'cacheable_lines',
+        'compiled_lines',
+        'render_cache_size',
+        'diagnostics'
+    )
+
+    def __init__(self, name: str, source: str, token_tree, line_numbers,
+                 folded_values, hoisted_lines, eliminated_lines, jump_table,
+                 cacheable_lines, compiled_lines, render_cache_size: int,
+                 diagnostics=()):
+        # Set each attribute directly as setting them is blocked
+        for attribute, value in (
+                ('name', name),
+                ('source', source),
+                ('token_tree', token_tree),
+                # The line number/line tokens pairs in the order they are
+                # executed, which the xylem moves through by position
+                ('lines', tuple(token_tree.items())),
+                ('line_numbers', line_numbers),
+                ('folded_values', folded_values),
+                ('hoisted_lines', hoisted_lines),
+                ('eliminated_lines', eliminated_lines),
+                ('jump_table', jump_table),
+                ('cacheable_lines', cacheable_lines),
+                ('compiled_lines', compiled_lines),
+                ('render_cache_size', render_cache_size),
+                # The warnings reported while the script was loaded
+                ('diagnostics', freeze(diagnostics))):
+            object.__setattr__(self, attribute, value)
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError('A program can not be changed once it is made.')
+
+    def __delattr__(self, attribute):
+        raise AttributeError('A program can not be changed once it is made.')
+
+    def __repr__(self):
+        return f'<Program {self.name!r} ({len(self.lines)} lines)>'
+
+    @classmethod
+    def from_tree(cls, name: str = '', source: str = '', frozen=True,
+                  diagnostics=()):
+        """Make a program from the planted tree (ie. tree.TOKEN_TREE and
+        everything the cambium worked out about it)
+
+        Args:
+            name [str]: the name of the script, defaults to an empty string
+            source [str]: the source of the script, defaults to an empty
+                string
+            frozen [bool]: whether to make read only copies of the planted
+                tree, defaults to True. Leaving this as False shares the
+                planted tree, which is only safe when nothing else will be
+                planted while the program is used.
+            diagnostics: the warnings reported while the script was loaded,
+                defaults to none
+
+        Returns:
+            Program: the program
+
+        Raises:
+            None
+        """
+
+        # Copy the planted tree if need be
+        if frozen:
+            copy = freeze
+        else:
+            def copy(value):
+                return value
+
+        return cls(
+            name,
+            source,
+            copy(tree.TOKEN_TREE),
+            copy(tree.LINE_NUMBERS),
+            copy(tree.FOLDED_VALUES),
+            copy(tree.HOISTED_LINES),
+            copy(tree.ELIMINATED_LINES),
+            copy(tree.JUMP_TABLE),
+            copy(tree.CACHEABLE_LINES),
+            copy(tree.COMPILED_LINES),
+            tree.RENDER_CACHE_SIZE or values.RENDER_CACHE_SIZE,
+            diagnostics
+        )
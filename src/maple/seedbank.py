@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import hashlib
+import io
+import marshal
+import os
+import signal
+import sys
+import types
+
+# Language imports
+from etc import global_values
+from maple import (cambium, phloem, sap, seed, tree, values, xylem)
+from maple.error import messenger
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A seed bank keeps seeds so that a plant can be grown again without going back
+to the wild. This Maple module does the same for the output of scripts: a
+script that doesn't wait on the user, pause or read the time always writes the
+same output so the output (and exit status) is kept on disk the first time
+the script is executed and written straight back out on later runs.
+
+Most other scripts still start out the same way every time, setting up their
+variables before the first get or pause statement. When asked (see the -q
+flag), the program and the state of the run at that point are kept on disk as
+a snapshot, along with anything written along the way, so later runs skip
+loading the script and those first statements and carry on from there.
+'''
+
+
+def is_deterministic_line(tokens: list) -> bool:
+    """Check whether executing a line depends only on the source of the
+    script (see is_deterministic_script())
+
+    Args:
+        tokens [list]: the tokens of the line
+
+    Returns:
+        bool: True if the line does the same thing every time
+
+    Raises:
+        None
+    """
+    statement_name = phloem.get_statement_name(tokens)
+    # Input and pauses depend on the user and the clock
+    if statement_name in ('get', 'pause'):
+        return False
+    # Only set and write statements calculate anything
+    if statement_name not in ('set', 'write', 'writeln'):
+        return True
+    # Reading the time changes the output from run to run
+    if phloem.get_read_variables(tokens) & set(values.VARIABLES_TIME_BASED):
+        return False
+    # Get the expression that is calculated
+    try:
+        expression = tokens[4 if statement_name == 'set' else 2]
+    # A line that is missing parts errors out the same way every time
+    except IndexError:
+        return True
+    # Calculating the expression can't have side effects
+    return cambium.is_pure_template(expression['token_value'])
+
+
+def is_deterministic_script(token_tree: dict = None) -> bool:
+    """Check whether the output of a script depends only on its source. That
+    is, it doesn't have any get or pause statements, doesn't read any of the
+    time based reserved variables and nothing that it calculates has side
+    effects (see cambium.is_pure_template()).
+
+    Args:
+        token_tree [dict]: the token tree to check, defaults to the
+            tree.TOKEN_TREE
+
+    Returns:
+        bool: True if the script always writes the same output
+
+    Raises:
+        None
+    """
+
+    # Default to the planted tree
+    if token_tree is None:
+        token_tree = tree.get_tree()
+
+    # Every line has to do the same thing every time
+    return all(is_deterministic_line(tokens) for tokens in token_tree.values())
+
+
+def get_cache_key(contents: str) -> str:
+    """Work out the key the output of a script is cached under from the
+    source of the script along with the versions of the language and Python
+    (either of which might change the output)
+
+    Args:
+        contents [str]: the source of the script
+
+    Returns:
+        str: the key for the cached output
+
+    Raises:
+        None
+    """
+
+    # Hash the versions and the source together
+    key = hashlib.sha256()
+    key.update(
+        (
+            f'{global_values.LANG_VERSION}\n' +
+            f'{".".join(global_values.PYTHON_VERSION[:2])}\n'
+        ).encode('utf-8')
+    )
+    key.update(contents.encode('utf-8', 'surrogateescape'))
+
+    # Return the key
+    return key.hexdigest()
+
+
+def get_cache_path(cache_key: str) -> str:
+    """Get the path of the file that holds the cached output for a key
+
+    Args:
+        cache_key [str]: the key from get_cache_key()
+
+    Returns:
+        str: the path of the cached output
+
+    Raises:
+        None
+    """
+    return os.path.join(global_values.OUTPUT_CACHE_DIR, f'{cache_key}.out')
+
+
+def replay_output(cache_key: str) -> bool:
+    """Write out the cached output of a script and exit with its cached exit
+    status, if there is a cached output
+
+    Args:
+        cache_key [str]: the key from get_cache_key()
+
+    Returns:
+        bool: False if there is no cached output (otherwise, this exits)
+
+    Raises:
+        None
+    """
+
+    cache_path = get_cache_path(cache_key)
+
+    # Try to read the cached output. The first line is the exit status and
+    # the rest is the output.
+    try:
+        with open(cache_path, 'rb') as cached:
+            exit_status = int(cached.readline())
+            output = cached.read().decode('utf-8')
+    # If there isn't one (or it can't be read), the script has to be executed
+    except (OSError, ValueError):
+        return False
+
+    # Mark the output as recently used so that it is evicted last
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+    # Write out the output and exit in the same way as the script did
+    sys.stdout.write(output)
+    sys.stdout.flush()
+    sys.exit(exit_status)
+
+
+class OutputRecorder(io.StringIO):
+    """Passes output on to a stream (ie. the screen) while keeping a copy of
+    it
+    """
+
+    def __init__(self, stream):
+        super().__init__()
+        # The stream the output is passed on to
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def record_output(cache_key: str, execute):
+    """Execute a script while recording its output and cache the output
+    along with the exit status once it has finished. Nothing is cached if the
+    script is interrupted or crashes.
+
+    Args:
+        cache_key [str]: the key from get_cache_key()
+        execute: the function that executes the script and returns its exit
+            status (eg. xylem.execute() for a run)
+
+    Returns:
+        int: the exit status of the script
+
+    Raises:
+        None
+    """
+
+    # Keep track of whether the script was interrupted as the interrupt
+    # handler exits like any other error
+    interrupted = []
+    previous_handler = signal.getsignal(signal.SIGINT)
+    if previous_handler is None:
+        previous_handler = signal.SIG_DFL
+
+    def interrupt_handler(signal_number, frame):
+        """Note the interrupt and pass it on to the handler from before
+        """
+        interrupted.append(signal_number)
+        if callable(previous_handler):
+            previous_handler(signal_number, frame)
+        raise KeyboardInterrupt
+
+    # Start recording
+    recorder = OutputRecorder(sys.stdout)
+    signal.signal(signal.SIGINT, interrupt_handler)
+    sys.stdout = recorder
+
+    # The exit status stays None if the script crashes
+    exit_status = None
+    try:
+        exit_status = execute()
+        # Finishing without an exit status is the same as exiting normally
+        if exit_status is None:
+            exit_status = 0
+    except SystemExit as exit_call:
+        exit_status = 0 if exit_call.code is None else exit_call.code
+        raise
+    finally:
+        # Stop recording
+        sys.stdout = recorder.stream
+        signal.signal(signal.SIGINT, previous_handler)
+        # Cache the output if the script finished on its own
+        if type(exit_status) is int and not interrupted:
+            store_output(cache_key, recorder.getvalue(), exit_status)
+
+    # Return the exit status
+    return exit_status
+
+
+def store_output(cache_key: str, output: str, exit_status: int):
+    """Store the output and exit status of a script in the cache, evicting
+    the least recently used outputs if the cache is full. Caching is only ever
+    a shortcut so any problems writing to the cache are ignored.
+
+    Args:
+        cache_key [str]: the key from get_cache_key()
+        output [str]: the output of the script
+        exit_status [int]: the exit status of the script
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Don't cache anything too big
+    try:
+        output = output.encode('utf-8')
+    except UnicodeEncodeError:
+        return
+    if len(output) > global_values.OUTPUT_CACHE_MAX_BYTES:
+        return
+
+    cache_path = get_cache_path(cache_key)
+    try:
+        os.makedirs(global_values.OUTPUT_CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first so that another run never reads a
+        # half written output
+        temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as cached:
+            cached.write(f'{exit_status}\n'.encode('utf-8') + output)
+        os.replace(temporary_path, cache_path)
+        evict_outputs()
+    except OSError:
+        pass
+
+
+def evict_outputs(extension: str = '.out'):
+    """Remove the least recently used outputs (or snapshots) from the cache
+    until there are no more than global_values.OUTPUT_CACHE_MAX_ENTRIES
+
+    Args:
+        extension [str]: the extension of the files to evict, defaults to
+            .out for outputs
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    try:
+        # Get the cached outputs from least to most recently used
+        cached_outputs = sorted(
+            (
+                entry for entry in os.scandir(global_values.OUTPUT_CACHE_DIR)
+                if entry.name.endswith(extension)
+            ),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        # Remove the oldest ones
+        for entry in cached_outputs[
+                :max(
+                    len(cached_outputs) -
+                    global_values.OUTPUT_CACHE_MAX_ENTRIES, 0
+                )]:
+            os.remove(entry.path)
+    except OSError:
+        pass
+
+
+def get_snapshot_path(cache_key: str) -> str:
+    """Get the path of the file that holds the snapshot for a key
+
+    Args:
+        cache_key [str]: the key from get_cache_key()
+
+    Returns:
+        str: the path of the snapshot
+
+    Raises:
+        None
+    """
+    return os.path.join(global_values.OUTPUT_CACHE_DIR, f'{cache_key}.snap')
+
+
+def thaw(value):
+    """Make a copy of a frozen value (see seed.freeze()) that can be written
+    out with marshal, turning read only mappings back into dictionaries
+
+    Args:
+        value: the value to thaw
+
+    Returns:
+        the thawed value
+
+    Raises:
+        None
+    """
+    if isinstance(value, (dict, types.MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return tuple(thaw(item) for item in value)
+    return value
+
+
+def run_prelude(run) -> tuple:
+    """Execute the lines of a run up to the first one that doesn't do the
+    same thing every time (eg. a get or pause statement), recording anything
+    that is written along the way
+
+    Args:
+        run [sap.Run]: a run that hasn't started
+
+    Returns:
+        tuple: the line number the run stopped at, None if it finished, and
+            the output that was written
+
+    Raises:
+        None
+    """
+
+    # Start recording
+    recorder = OutputRecorder(run.get_output())
+    output, run.output = run.output, recorder
+    token = sap.CURRENT_RUN.set(run)
+    # Whether each line can be executed here, worked out once per line
+    checked_lines = {}
+    try:
+        for line_tokens in xylem.walk_statements(run):
+            # Stop before the first line that depends on the user, the clock
+            # or anything else outside of the script, which is counted again
+            # once it is executed. Only set and write statements are executed
+            # here.
+            line_number = line_tokens[0]['script_line_number']
+            if line_number not in checked_lines:
+                checked_lines[line_number] = \
+                    phloem.get_statement_name(line_tokens) in (
+                        'set', 'write', 'writeln'
+                    ) and is_deterministic_line(line_tokens)
+            if not checked_lines[line_number]:
+                run.statements_executed -= 1
+                return line_number, recorder.getvalue()
+            xylem.call_statements(line_tokens)
+        run.exit_status = 0
+    # An error (or an interrupt) stops the run as usual
+    except messenger.ScriptExit as exit_call:
+        run.exit_status = 0 if exit_call.code is None else exit_call.code
+    finally:
+        # Stop recording
+        run.output = output
+        sap.CURRENT_RUN.reset(token)
+
+    # The run finished before there was anything to keep
+    return None, recorder.getvalue()
+
+
+def store_snapshot(cache_key: str, snapshot: dict):
+    """Store a snapshot in the cache, evicting the least recently used
+    snapshots if the cache is full. A snapshot with too much output or that
+    holds a value that marshal can't write out is skipped.
+
+    Args:
+        cache_key [str]: the key from get_cache_key()
+        snapshot [dict]: the snapshot (see take_snapshot())
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    if len(snapshot['output']) > global_values.OUTPUT_CACHE_MAX_BYTES:
+        return
+    try:
+        data = marshal.dumps(snapshot)
+    except ValueError:
+        return
+
+    snapshot_path = get_snapshot_path(cache_key)
+    try:
+        os.makedirs(global_values.OUTPUT_CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first so that another run never reads a
+        # half written snapshot
+        temporary_path = f'{snapshot_path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as cached:
+            cached.write(data)
+        os.replace(temporary_path, snapshot_path)
+        evict_outputs('.snap')
+    except OSError:
+        pass
+
+
+def take_snapshot(run, cache_key: str, drop_unreachable=False) -> int:
+    """Execute a run, keeping a snapshot of it at the first line that
+    doesn't do the same thing every time so that later runs can start from
+    there (see start_from_snapshot())
+
+    Args:
+        run [sap.Run]: a run that hasn't started
+        cache_key [str]: the key from get_cache_key()
+        drop_unreachable [bool]: whether the program was loaded without its
+            unreachable lines, defaults to False
+
+    Returns:
+        int: the exit status of the run
+
+    Raises:
+        None
+    """
+    line_number, output = run_prelude(run)
+    if line_number is None:
+        return run.exit_status
+
+    # Keep the program as it was loaded along with the state of the run. The
+    # reserved variables are set again by each run.
+    store_snapshot(cache_key, {
+        'drop_unreachable': drop_unreachable,
+        'program': {
+            attribute: thaw(getattr(run.program, attribute))
+            for attribute in seed.Program.__slots__ if attribute != 'lines'
+        },
+        'line_number': line_number,
+        'skip_lines': tuple(run.skip_lines),
+        'variables': {
+            name: value for name, value in run.variables.items()
+            if not name.startswith(values.VARIABLE_PROHIBITED_PREFIX)
+        },
+        'statements_executed': run.statements_executed,
+        'output': output
+    })
+
+    # Carry on from where the prelude stopped
+    return xylem.execute(run, int(line_number), run.skip_lines)
+
+
+def load_snapshot(cache_key: str, script_name: str,
+                  drop_unreachable=False) -> dict:
+    """Load the snapshot of a script from the cache, if there is one
+
+    Args:
+        cache_key [str]: the key from get_cache_key()
+        script_name [str]: the name of the script
+        drop_unreachable [bool]: whether the program is loaded without its
+            unreachable lines, defaults to False
+
+    Returns:
+        dict: the snapshot with its program (see take_snapshot()), None if
+            there isn't one that can be used
+
+    Raises:
+        None
+    """
+
+    snapshot_path = get_snapshot_path(cache_key)
+    try:
+        with open(snapshot_path, 'rb') as cached:
+            snapshot = marshal.load(cached)
+        if snapshot['drop_unreachable'] != drop_unreachable:
+            return None
+        # Make the program again, read only as before
+        snapshot['program'] = seed.Program(**{
+            attribute: seed.freeze(value)
+            for attribute, value in snapshot['program'].items()
+        } | {'name': script_name})
+    # If there isn't one (or it can't be read), the script has to be loaded
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        return None
+
+    # Mark the snapshot as recently used so that it is evicted last
+    try:
+        os.utime(snapshot_path)
+    except OSError:
+        pass
+
+    # Return the snapshot
+    return snapshot
+
+
+def start_from_snapshot(run, snapshot: dict) -> int:
+    """Execute a run from a snapshot, writing out the warnings from when the
+    script was loaded and the output up to the snapshot as they were
+
+    Args:
+        run [sap.Run]: a run of the snapshot's program that hasn't started
+        snapshot [dict]: the snapshot (see load_snapshot())
+
+    Returns:
+        int: the exit status of the run
+
+    Raises:
+        None
+    """
+
+    # Write out the warnings and output from before the snapshot
+    for diagnostic in run.program.diagnostics:
+        if diagnostic['line_number'] is None:
+            messenger.simple_warning(
+                diagnostic['message'], diagnostic['error_code']
+            )
+        else:
+            messenger.line_warning(
+                diagnostic['message'], diagnostic['line_number'],
+                diagnostic['error_code']
+            )
+    run.get_output().write(snapshot['output'])
+
+    # Bring back the state of the run and carry on from the snapshot
+    run.variables.update(snapshot['variables'])
+    run.statements_executed = snapshot['statements_executed']
+    return xylem.execute(
+        run, int(snapshot['line_number']), snapshot['skip_lines']
+    )
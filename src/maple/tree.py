@@ -33,6 +33,35 @@ TOKEN_TREE = {}
 # Line numbers
 LINE_NUMBERS = []
 
+# Values worked out when the script is loaded (eg. the rendered output of a
+# write statement with no variables) keyed by line number
+FOLDED_VALUES = {}
+
+# Lines hoisted out of loops keyed by the line number of the jump statement
+# that closes the loop. These lines are skipped when that jump is taken.
+HOISTED_LINES = {}
+
+# Set statements removed because the value they assign is never read, keyed
+# by line number with the full line of code kept for auditing
+ELIMINATED_LINES = {}
+
+# The resolved jump statements keyed by line number. Each holds the position
+# in the tree that execution moves to and the lines to skip from then on.
+JUMP_TABLE = {}
+
+# Write statements whose rendered output can be reused while the variables
+# they reference don't change, keyed by line number with those variables
+CACHEABLE_LINES = {}
+
+# Set and write statements compiled ahead of time because a profile showed
+# that they are hot, keyed by line number with the compiled expression and
+# the variables it reads
+COMPILED_LINES = {}
+
+# The number of lines the render cache holds when the script is run, None to
+# use the default (values.RENDER_CACHE_SIZE)
+RENDER_CACHE_SIZE = None
+
 
 def get_line_numbers():
     """Get the line numbers
@@ -74,22 +74,80 @@ VALID_STATMODS_WRITE = [
 # prefix as reserved variables are only allowed to use it
 VARIABLE_PROHIBITED_PREFIX = 'hs_'
 
-# Hold the variables
-VARIABLES = {
-    f'{VARIABLE_PROHIBITED_PREFIX}current_date':
-        f'{time.localtime().tm_mday}/' +
-        f'{time.localtime().tm_mon}/' +
-        f'{time.localtime().tm_year}',
-    f'{VARIABLE_PROHIBITED_PREFIX}ac_current_time':
-        f'{time.localtime().tm_hour}:' +
-        f'{time.localtime().tm_min}:' +
-        f'{time.localtime().tm_sec}',
-    f'{VARIABLE_PROHIBITED_PREFIX}lang_name': global_values.LANG_NAME,
-    f'{VARIABLE_PROHIBITED_PREFIX}lang_version': global_values.LANG_VERSION
-}
+# The reserved variable that holds the line a filter read last (see the -t
+# flag and sap.Run)
+VARIABLE_LINE = f'{VARIABLE_PROHIBITED_PREFIX}line'
+
+
+def reserved_variables() -> dict:
+    """Get the reserved variables that every script starts with. The date and
+    time are worked out each time so that a script run in a process that has
+    been going for a while gets the right ones.
+
+    Args:
+        N/A
+
+    Returns:
+        dict: the reserved variables keyed by name
+
+    Raises:
+        None
+    """
+    current_time = time.localtime()
+    return {
+        f'{VARIABLE_PROHIBITED_PREFIX}current_date':
+            f'{current_time.tm_mday}/' +
+            f'{current_time.tm_mon}/' +
+            f'{current_time.tm_year}',
+        f'{VARIABLE_PROHIBITED_PREFIX}ac_current_time':
+            f'{current_time.tm_hour}:' +
+            f'{current_time.tm_min}:' +
+            f'{current_time.tm_sec}',
+        f'{VARIABLE_PROHIBITED_PREFIX}lang_name': global_values.LANG_NAME,
+        f'{VARIABLE_PROHIBITED_PREFIX}lang_version': global_values.LANG_VERSION
+    }
+
+
+# Hold the variables. Each run of a script has its own variables (see
+# sap.Run) and these are only used when there isn't a run going (eg. tests).
+VARIABLES = reserved_variables()
+
+# Reserved variables whose values depend on when the script is run. These
+# can't be treated as constants when a script is loaded.
+VARIABLES_TIME_BASED = [
+    f'{VARIABLE_PROHIBITED_PREFIX}current_date',
+    f'{VARIABLE_PROHIBITED_PREFIX}ac_current_time'
+]
+
+# Like VARIABLES, the following are kept for each run of a script and these
+# are only used when there isn't a run going.
+
+# The number of times each variable has been assigned, which lets anything
+# that depends on a variable tell whether it has changed
+VARIABLE_VERSIONS = {}
+
+# The rendered output of write statements keyed by line number along with the
+# versions of the variables that the output was rendered with
+RENDERED_OUTPUT = {}
+
+# The number of times the rendered output was reused (hits) or had to be
+# rendered again (misses)
+RENDER_CACHE_STATS = {'hits': 0, 'misses': 0}
+
+# Whether the number of times each line is executed is counted for profile
+# guided optimisation
+PROFILING = False
+
+# The number of times each line was executed keyed by line number
+LINE_COUNTS = {}
 
 # The variable symbol used in the substitution
 VARIABLE_SYMBOL = '#'
 
 # The maximum number of statmods
 WRITE_STATMOD_COUNT = 2
+
+# The maximum number of lines to hold rendered output for and the longest
+# output that is held
+RENDER_CACHE_SIZE = 128
+RENDER_CACHE_MAX_LENGTH = 4096
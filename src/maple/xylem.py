@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 
 # Standard library imports
+import asyncio
+import bisect
 # import pprint
 # import sys
 
 # Language imports
-from maple import (tree, values)
+from etc import global_values
+from maple import (sap, values)
 from maple.error import messenger
 from statements import (
     stmt_end,
@@ -44,16 +47,57 @@ things.
 '''
 
 
-def set_execution_location(start_location=-1):
+def execute(run, start_location=-1, skip_lines=()) -> int:
+    """Execute a run of a program from the start. The run is only seen by
+    the thread (or asyncio task) that executes it, so any number of runs can
+    be executed at the same time. An end statement or an error only stops
+    this run rather than the interpreter.
+
+    Args:
+        run [sap.Run]: the run to execute
+        start_location: the line number to start executing from (eg. when
+            resuming from a checkpoint), defaults to -1 for the beginning
+        skip_lines: the line numbers that are not executed (see
+            set_execution_location()), defaults to an empty tuple
+
+    Returns:
+        int: the exit status of the run, which is also kept in the run
+
+    Raises:
+        None
+    """
+
+    # Make the run the one that is going while it executes
+    token = sap.CURRENT_RUN.set(run)
+    try:
+        set_execution_location(start_location, skip_lines)
+        run.exit_status = 0
+    # Anything that stops the run (eg. an end statement) sets its status
+    except messenger.ScriptExit as exit_call:
+        run.exit_status = 0 if exit_call.code is None else exit_call.code
+    finally:
+        sap.CURRENT_RUN.reset(token)
+
+    # Return the exit status
+    return run.exit_status
+
+
+def set_execution_location(start_location=-1, skip_lines=()):
     """Check to make sure that we are in the right place in the token tree.
     This is the first method to be called in the xylem module to make sure
     that we are executing the statements as need be.
 
+    Lines are executed in order from the start location (see
+    walk_statements()).
+
     Args:
         start_location: the line number to start executing from which is
             helpful in case something like a jump statement is called. This
             defaults to -1 which indicates that we are to start from the
             beginning of the tree.
+        skip_lines: the line numbers that are not executed, which is used
+            when a jump closes a loop that has lines hoisted out of it. This
+            defaults to an empty tuple so that every line is executed.
 
     Returns:
         N/A
@@ -62,27 +106,211 @@ def set_execution_location(start_location=-1):
         None
     """
 
-    # Get the tree
-    stmts = tree.get_tree()
-
-    # For each key (line number)/value (line tokens) pair in the tree
-    for line_no, line_tokens in stmts.items():
-        # Get an integer value of the line number so we can do comparisons as
-        # the line numbers in the trees are held as strings
-        line_no = int(line_no)
-        # If the start_location is not -1, we start somewhere specific in the
-        # tree.
-        if start_location != -1:
-            # If the start location is less than the line number, we have a
-            # statement that should be executed (ie. if the start location
-            # is 20 and the line number is 30, we should execute line 30).
-            if start_location <= line_no:
-                # execute_statements(line_tokens)
+    # Get the run that is going. If nothing has started one (eg. this is
+    # called on its own), run the planted tree with the global variables.
+    run = sap.CURRENT_RUN.get()
+    if run is None:
+        execute(sap.Run.from_globals())
+        return
+
+    # Execute each line in turn
+    for line_tokens in walk_statements(run, start_location, skip_lines):
+        call_statements(line_tokens)
+
+
+def walk_statements(run, start_location=-1, skip_lines=(),
+                    hand_back_jumps=False):
+    """Move through the lines of a program in the order they are executed,
+    handing back each line that needs executing. A jump statement that was
+    resolved when the script was loaded (see cambium.resolve_jumps()) just
+    moves the position in the tree so that jumping doesn't need to parse the
+    target or start over. Each jump taken is still counted as a statement
+    executed so that a loop of jumps runs into the limits of the run.
+
+    Args:
+        run [sap.Run]: the run of the program
+        start_location: the line number to start from, defaults to -1 for the
+            beginning of the tree
+        skip_lines: the line numbers that are not executed, defaults to an
+            empty tuple so that every line is executed
+        hand_back_jumps [bool]: whether None is handed back for each jump
+            taken so that whatever is executing the run gets control back
+            (eg. to end a slice), defaults to False
+
+    Returns:
+        list: the tokens of each line to execute, one at a time
+
+    Raises:
+        None
+    """
+
+    # Get the tree as a list of line number/line tokens pairs so that lines
+    # can be found by their position
+    stmts = run.program.lines
+    # Get the resolved jumps
+    jump_table = run.program.jump_table
+    # Get whether lines are being counted
+    profiling = run.profiling
+    # Keep the lines that are skipped with the run for checkpoints
+    run.skip_lines = skip_lines
+
+    # Start at the beginning of the tree
+    position = 0
+    # If the start_location is not -1, we start somewhere specific in the
+    # tree, that is, the first line that is equal to or greater than the
+    # start location (ie. if the start location is 25 and the lines are 20
+    # and 30, we should start executing at line 30).
+    if start_location != -1:
+        position = bisect.bisect_left(
+            [int(line_no) for line_no, _ in stmts],
+            start_location
+        )
+
+    # While there are still lines left to execute
+    while position < len(stmts):
+        # Get the line number and tokens and move on to the next line
+        line_no, line_tokens = stmts[position]
+        position += 1
+        # Skip any lines that have been hoisted out of the loop we are in
+        if line_no in skip_lines:
+            continue
+        # Count the line for the profile
+        if profiling:
+            run.line_counts[line_no] = run.line_counts.get(line_no, 0) + 1
+        # A resolved jump moves straight to its target
+        if line_no in jump_table:
+            position, skip_lines = jump_table[line_no]
+            run.skip_lines = skip_lines
+            run.statements_executed += 1
+            if hand_back_jumps:
+                yield None
+            continue
+        # Hand back the line to be executed
+        run.statements_executed += 1
+        yield line_tokens
+
+
+async def execute_async(run) -> int:
+    """Execute a run of a program from the start on an asyncio event loop.
+    Pause statements sleep with asyncio.sleep() and get statements wait on
+    the run's input (see sap.Run.read_line_async()) so that other runs carry
+    on in the meantime. Every other statement is executed in the same way as
+    execute() and the event loop is given a turn every
+    global_values.ASYNC_YIELD_LINES lines so that a busy run can't hold it up.
+
+    Args:
+        run [sap.Run]: the run to execute
+
+    Returns:
+        int: the exit status of the run, which is also kept in the run
+
+    Raises:
+        asyncio.CancelledError: if the run is cancelled
+    """
+
+    # Make the run the one that is going while it executes. Each asyncio
+    # task has its own copy of the context so runs in other tasks don't see
+    # it.
+    token = sap.CURRENT_RUN.set(run)
+    try:
+        for line_count, line_tokens in enumerate(
+                walk_statements(run, hand_back_jumps=True), 1):
+            # A jump that has been taken is only counted
+            if line_tokens is None:
+                pass
+            elif line_tokens[1]['token_value'] == 'pause':
+                await stmt_pause.stmt_pause_async(line_tokens)
+                continue
+            elif line_tokens[1]['token_value'] == 'get':
+                await stmt_get.stmt_get_async(line_tokens)
+                continue
+            else:
+                call_statements(line_tokens)
+            # Give the other runs a turn every so often
+            if line_count % global_values.ASYNC_YIELD_LINES == 0:
+                await asyncio.sleep(0)
+        run.exit_status = 0
+    # Anything that stops the run (eg. an end statement) sets its status
+    except messenger.ScriptExit as exit_call:
+        run.exit_status = 0 if exit_call.code is None else exit_call.code
+    finally:
+        sap.CURRENT_RUN.reset(token)
+
+    # Return the exit status
+    return run.exit_status
+
+
+def execute_slices(run, quantum: int):
+    """Execute a run of a program a slice at a time so that many runs can
+    share one thread (see scheduler.Scheduler). Each slice executes up to
+    quantum statements before handing control back. A pause statement ends
+    the slice early and hands back how long to wait instead of sleeping so
+    that the other runs carry on in the meantime, as does a get statement
+    while it waits for its input (see stmt_get.get_steps()). Every other
+    statement is executed in the same way as execute().
+
+    Args:
+        run [sap.Run]: the run to execute
+        quantum [int]: the most statements to execute in a slice
+
+    Returns:
+        float: the number of seconds to wait before the next slice (0 when
+            the slice just ran out of statements), one slice at a time. Once
+            the run is finished, its exit status is returned.
+
+    Raises:
+        None
+    """
+
+    # The run is only the one that is going while a slice is executing as
+    # the context belongs to whatever is executing the slices
+    token = sap.CURRENT_RUN.set(run)
+    try:
+        executed = 0
+        for line_tokens in walk_statements(run, hand_back_jumps=True):
+            # A jump that has been taken counts toward the slice so that a
+            # loop of jumps still hands control back
+            if line_tokens is None:
+                pass
+            # A pause hands its waits back rather than sleeping
+            elif line_tokens[1]['token_value'] == 'pause':
+                for text, seconds in stmt_pause.pause_steps(line_tokens):
+                    if text is not None:
+                        run.write(text)
+                    sap.CURRENT_RUN.reset(token)
+                    token = None
+                    yield seconds
+                    token = sap.CURRENT_RUN.set(run)
+                executed = 0
+                continue
+            # So does a get for as long as it is waiting for its input
+            elif line_tokens[1]['token_value'] == 'get':
+                for seconds in stmt_get.get_steps(line_tokens):
+                    sap.CURRENT_RUN.reset(token)
+                    token = None
+                    yield seconds
+                    token = sap.CURRENT_RUN.set(run)
+            else:
                 call_statements(line_tokens)
-        # Otherwise, we are starting at the beginning of the tree
-        else:
-            # execute_statements(line_tokens)
-            call_statements(line_tokens)
+            # Hand control back once the slice has run out of statements,
+            # jumps included
+            executed += 1
+            if executed >= quantum:
+                executed = 0
+                sap.CURRENT_RUN.reset(token)
+                token = None
+                yield 0
+                token = sap.CURRENT_RUN.set(run)
+        run.exit_status = 0
+    # Anything that stops the run (eg. an end statement) sets its status
+    except messenger.ScriptExit as exit_call:
+        run.exit_status = 0 if exit_call.code is None else exit_call.code
+    finally:
+        if token is not None:
+            sap.CURRENT_RUN.reset(token)
+
+    # Return the exit status
+    return run.exit_status
 
 
 def call_statements(tokens: list):
@@ -1,8 +1,5 @@
 #!/usr/bin/env python3
 
-# Standard library imports
-import sys
-
 # Language imports
 from maple.error import messenger
 
@@ -42,7 +39,7 @@ def stmt_end(tokens: list):
         N/A
 
     Raises:
-        None
+        ScriptExit: to end the run of the script
     """
 
     # Get the line number for error reporting
@@ -51,16 +48,14 @@ def stmt_end(tokens: list):
     full_loc = tokens[0]['full_line_of_code'].strip('\n')
     # Get the final token to check if it's a NEWLINE token
     final_token_type = tokens[-1]['token_type'][1]
+    # Get the number of tokens, leaving out a final NEWLINE token which is
+    # unnecessary. The token isn't removed as the tokens belong to the
+    # program, which is shared between runs.
+    token_count = len(tokens) - (final_token_type == 'NEWLINE')
 
-    # If the final token is a NEWLINE token...
-    if final_token_type == 'NEWLINE':
-        # Remove it. This last token is unnecessary and potentially complicates
-        # parsing.
-        tokens.pop(-1)
-
-    # If there are still more than two tokens after removing the NEWLINE, we
-    # can assume that there is an issue with the line of code
-    if len(tokens) > 2:
+    # If there are still more than two tokens without the NEWLINE, we can
+    # assume that there is an issue with the line of code
+    if token_count > 2:
         messenger.line_error(
             'The end statement contains more than just a line number and ' +
             f'the end statement: {full_loc}',
@@ -69,4 +64,4 @@ def stmt_end(tokens: list):
         )
     # At this point, we can assume that things are fine and do the work of the
     # end statement, that is, end the execution.
-    sys.exit(0)
+    raise messenger.ScriptExit(0)
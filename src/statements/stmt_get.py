@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 
 # Standard library imports
+import io
+import threading
 
 # Language imports
-from maple import (helpers, values)
+from etc import global_values
+from maple import (helpers, sap, values)
+from maple.error import messenger
 from statements import stmt_set
 
 '''Copyright 2024-2025 Bryan Smith.
@@ -45,6 +49,129 @@ def stmt_get(tokens: list):
         None
     """
 
+    # Note where the run is so that it can be resumed from this line (see
+    # interpreter/checkpoint.py)
+    run = sap.get_run()
+    if run.checkpointer is not None:
+        run.checkpointer.at_get(run, tokens)
+
+    # Get the variable value by an input call, reading from wherever the run
+    # gets its input
+    try:
+        variable_value = run.read_line(
+            tokens[4]['token_value'].strip('"')
+        )
+    # If the input has run out (eg. it was piped in), there is nothing to set
+    # the variable to
+    except EOFError:
+        variable_value = None
+
+    # Set the variable
+    store_input(tokens, variable_value)
+
+
+async def stmt_get_async(tokens: list):
+    """Get input for a script run on an asyncio event loop (see
+    xylem.execute_async()) and set a variable accordingly, letting other
+    scripts run while waiting for the input
+
+    Args:
+        tokens [list]: the list of tokens on the line with the get statement
+            call
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Wait for the variable value from wherever the run gets its input
+    try:
+        variable_value = await sap.get_run().read_line_async(
+            tokens[4]['token_value'].strip('"')
+        )
+    # If the input has run out, there is nothing to set the variable to
+    except EOFError:
+        variable_value = None
+
+    # Set the variable
+    store_input(tokens, variable_value)
+
+
+def get_steps(tokens: list):
+    """Get input for a script run a slice at a time (see
+    xylem.execute_slices()) and set a variable accordingly. The line is read
+    in a thread so that a script waiting for its input (eg. on a pipe) hands
+    back a number of seconds to wait, again and again until the line is in,
+    rather than holding up the scripts it shares a thread with. Input that is
+    already in memory (eg. a list of lines) is read without a thread.
+
+    Args:
+        tokens [list]: the list of tokens on the line with the get statement
+            call
+
+    Returns:
+        float: the seconds to wait before checking on the input again, one
+            check at a time
+
+    Raises:
+        None
+    """
+
+    # Input that is already in memory is read straight away
+    run = sap.get_run()
+    if isinstance(run.input_stream, io.StringIO):
+        stmt_get(tokens)
+        return
+
+    # Note where the run is so that it can be resumed from this line (see
+    # interpreter/checkpoint.py)
+    if run.checkpointer is not None:
+        run.checkpointer.at_get(run, tokens)
+
+    # Otherwise, read the line in a thread, keeping None if the input has run
+    # out
+    read = {'value': None}
+
+    def read_input():
+        try:
+            read['value'] = run.read_line(
+                tokens[4]['token_value'].strip('"')
+            )
+        except EOFError:
+            pass
+
+    reader = threading.Thread(target=read_input, daemon=True)
+    reader.start()
+    # Wait for the line without holding up the other scripts
+    while reader.is_alive():
+        yield global_values.SCHEDULER_INPUT_POLL
+
+    # Set the variable
+    store_input(tokens, read['value'])
+
+
+def store_input(tokens: list, variable_value):
+    """Check the get statement and set its variable to the input
+
+    Args:
+        tokens [list]: the list of tokens on the line with the get statement
+            call
+        variable_value: the line of input, None if the input has run out
+
+    Returns:
+        N/A
+
+    Raises:
+        ScriptExit: if the run is a filter and the input has run out
+    """
+
+    # A filter simply stops at the end of its input
+    run = sap.get_run()
+    if variable_value is None and run.filtering:
+        raise messenger.ScriptExit(0)
+
     # Get the line number
     line_number = tokens[0]['script_line_number']
     # Get the variable name that will house the input from the prompt
@@ -55,14 +182,28 @@ def stmt_get(tokens: list):
     # Get the assignment operator so that we can check that the assignment
     # operator is used.
     assignment_operator = tokens[3]['token_value']
-    # Get the variable value by an input call
-    variable_value = input(tokens[4]['token_value'].strip('"'))
+
+    # If the input has run out (eg. it was piped in), there is nothing to set
+    # the variable to
+    if variable_value is None:
+        messenger.line_error(
+            f'There is no input left for the variable {variable_name}.',
+            line_no=line_number,
+            error_code=28
+        )
 
     # Check the statement to make sure that it is syntactically correct
     stmt_set.stmt_check(
         variable_prefix, assignment_operator, line_number, variable_name
     )
 
+    # A filter keeps the line as it is, along with in hs_line, as it is text
+    # to be worked on rather than a value typed in
+    if run.filtering:
+        helpers.store_variable(values.VARIABLE_LINE, variable_value)
+        helpers.store_variable(variable_name, variable_value)
+        return
+
     # Substitute any variable values
     variable_value = helpers.substitute_values(variable_value, line_number)
 
@@ -71,4 +212,4 @@ def stmt_get(tokens: list):
     variable_value = helpers.calculate_value(variable_value)
 
     # Store the variable
-    values.VARIABLES[variable_name] = variable_value
+    helpers.store_variable(variable_name, variable_value)
@@ -4,7 +4,7 @@
 # import sys
 
 # Language imports
-from maple import (tree, xylem)
+from maple import (sap, xylem)
 from maple.error import messenger
 from etc import colourise
 
@@ -47,6 +47,10 @@ def stmt_jump(tokens: list):
         None
     """
 
+    # Jumps with a valid target are resolved when the script is loaded and
+    # taken by the xylem directly (see cambium.resolve_jumps()) so this is
+    # mostly reached to report an invalid target.
+
     # Get the line number
     line_number = tokens[2]['script_line_number']
     # Get the location
@@ -68,13 +72,15 @@ def stmt_jump(tokens: list):
             error_code=21
         )
 
+    # Get the program that is being run
+    program = sap.get_run().program
     # Get the script line numbers
-    script_line_numbers = tree.get_line_numbers()
+    script_line_numbers = program.line_numbers
     # Join the line numbers in the script for error reporting
     valid_line_numbers = ', '.join(script_line_numbers)
 
     # If the jump_location is not a verifiable line numbers...
-    if not tree.verify_line_number(jump_location):
+    if jump_location not in script_line_numbers:
         # Report an error
         messenger.line_error(
             'The line that you have requested be jumped to - ' +
@@ -85,5 +91,9 @@ def stmt_jump(tokens: list):
         )
 
     # If we've gotten here, set the execution location to the jump_location as
-    # we can assume that everything is okay.
-    xylem.set_execution_location(jump_location_integer)
+    # we can assume that everything is okay. If the jump closes a loop with
+    # lines hoisted out of it, those lines are skipped.
+    xylem.set_execution_location(
+        jump_location_integer,
+        program.hoisted_lines.get(line_number, ())
+    )
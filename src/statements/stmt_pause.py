@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 
 # Standard library imports
+import asyncio
 import time
 
 # Language imports
-from maple import (doctor, helpers, values)
+from maple import (doctor, helpers, sap, values)
 from maple.error import messenger
 from etc import colourise
 
@@ -48,7 +49,7 @@ def stat_moderator(
         line_number [str]: the script line number, helpful for error reporting
 
     Returns:
-        output [str]: the modified string that then gets printed
+        tuple: the steps of the pause, one at a time (see pause_steps())
 
     Raises:
         None
@@ -67,13 +68,8 @@ def stat_moderator(
             # For each number in a reversed list of numbers starting with the
             # pause_length.
             for number in reversed(range(pause_length)):
-                # Print the countdown
-                print(
-                    f'{str(number+1)}...',
-                    end='\r'
-                )
-                # Pause for a second
-                time.sleep(1)
+                # Print the countdown and pause for a second
+                yield f'{str(number+1)}...\r', 1
         case _:
             # Create a list of valid statmods for the write statement
             valid_statmods = ', '.join(values.VALID_STATMODS_PAUSE)
@@ -87,15 +83,18 @@ def stat_moderator(
             )
 
 
-def stmt_pause(tokens: list):
-    """Pause the execution of a script for a period of time.
+def pause_steps(tokens: list):
+    """Work out the steps of a pause, each of which is some text to write
+    (None if there isn't any) followed by a number of seconds to wait. The
+    steps are worked out here and carried out by stmt_pause() or
+    stmt_pause_async() so that a pause works the same way in both.
 
     Args:
-        tokens [list]: the list of tokens on the line with the write statement
+        tokens [list]: the list of tokens on the line with the pause statement
             call
 
     Returns:
-        N/A
+        tuple: the text to write and the seconds to wait, one step at a time
 
     Raises:
         None
@@ -106,23 +105,31 @@ def stmt_pause(tokens: list):
     # Get the line number
     line_number = tokens[0]['script_line_number']
 
-    # Substitute variables in the pause length
-    pause_length = helpers.substitute_values(pause_length, line_number)
-    # Calculate the expression if it needs to be calculated
-    pause_length = helpers.calculate_value(pause_length)
-
-    # If the pause is not numeric...
-    if not str(pause_length).isnumeric():
-        # Throw an error
-        messenger.line_error(
-            f'The length of the pause requested ({pause_length}) is not a ' +
-            'valid number.',
-            line_no=line_number,
-            error_code=14
-        )
+    # Get the lengths that were worked out when the script was loaded
+    folded_values = sap.get_run().program.folded_values
+
+    # If the length was worked out when the script was loaded, use it
+    if line_number in folded_values:
+        pause_length = folded_values[line_number]
+    # Otherwise, work out the length now
+    else:
+        # Substitute variables in the pause length
+        pause_length = helpers.substitute_values(pause_length, line_number)
+        # Calculate the expression if it needs to be calculated
+        pause_length = helpers.calculate_value(pause_length)
+
+        # If the pause is not numeric...
+        if not str(pause_length).isnumeric():
+            # Throw an error
+            messenger.line_error(
+                f'The length of the pause requested ({pause_length}) is ' +
+                'not a valid number.',
+                line_no=line_number,
+                error_code=14
+            )
 
-    # Convert the pause length to an integer
-    pause_length = int(pause_length)
+        # Convert the pause length to an integer
+        pause_length = int(pause_length)
 
     # Try to get the statmod
     try:
@@ -139,7 +146,58 @@ def stmt_pause(tokens: list):
     # If the operator is not None, that is, there is an operator...
     if stat_mod_op is not None:
         # Pass off the stat_moderator for the pause statement
-        stat_moderator(stat_mod_op, stat_mod_value, pause_length, line_number)
+        yield from stat_moderator(
+            stat_mod_op, stat_mod_value, pause_length, line_number
+        )
     else:
         # Pause the execution of the script if there is no statmod
-        time.sleep(pause_length)
+        yield None, pause_length
+
+
+def stmt_pause(tokens: list):
+    """Pause the execution of a script for a period of time.
+
+    Args:
+        tokens [list]: the list of tokens on the line with the pause statement
+            call
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    run = sap.get_run()
+    for step, (text, seconds) in enumerate(pause_steps(tokens)):
+        # Write out any text for the step
+        if text is not None:
+            run.write(text)
+        # Note where the run is so that it can be resumed partway through
+        # the pause (see interpreter/checkpoint.py)
+        if run.checkpointer is not None:
+            run.checkpointer.at_pause(run, tokens, step, seconds)
+        # Pause for the step
+        time.sleep(seconds)
+
+
+async def stmt_pause_async(tokens: list):
+    """Pause the execution of a script run on an asyncio event loop (see
+    xylem.execute_async()) for a period of time, letting other scripts run in
+    the meantime.
+
+    Args:
+        tokens [list]: the list of tokens on the line with the pause statement
+            call
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    for text, seconds in pause_steps(tokens):
+        # Write out any text for the step
+        if text is not None:
+            sap.get_run().write(text)
+        # Pause for the step
+        await asyncio.sleep(seconds)
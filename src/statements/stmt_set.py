@@ -3,7 +3,7 @@
 # Standard library imports
 
 # Language imports
-from maple import (helpers, values)
+from maple import (helpers, sap, values)
 from maple.error import messenger
 
 '''Copyright 2024-2025 Bryan Smith.
@@ -98,6 +98,17 @@ def stmt_set(tokens: list):
 
     # Get the line number
     line_number = tokens[0]['script_line_number']
+    # Get the program that is being run
+    program = sap.get_run().program
+
+    # If the value was worked out when the script was loaded, there is nothing
+    # left to check or calculate so store the variable and move along
+    if line_number in program.folded_values:
+        helpers.store_variable(
+            tokens[2]['token_value'], program.folded_values[line_number]
+        )
+        return
+
     # Get the full line of code
     # full_loc = tokens[0]['full_line_of_code'].strip('\n')
     # Get the variable name
@@ -116,6 +127,19 @@ def stmt_set(tokens: list):
         variable_prefix, assignment_operator, line_number, variable_name
     )
 
+    # If the value was compiled ahead of time, try to calculate it straight
+    # from the variables
+    calculated = False
+    if line_number in program.compiled_lines:
+        calculated, calculated_value = helpers.calculate_compiled(
+            program.compiled_lines[line_number]
+        )
+
+    # Store the variable if it was calculated
+    if calculated:
+        helpers.store_variable(variable_name, calculated_value)
+        return
+
     # Substitute any variable values
     variable_value = helpers.substitute_values(variable_value, line_number)
 
@@ -124,4 +148,4 @@ def stmt_set(tokens: list):
     variable_value = helpers.calculate_value(variable_value)
 
     # Store the variable
-    values.VARIABLES[variable_name] = variable_value
+    helpers.store_variable(variable_name, variable_value)
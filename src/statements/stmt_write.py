@@ -1,10 +1,7 @@
 #!/usr/bin/env python3
 
-# Standard library imports
-import sys
-
 # Language imports
-from maple import (doctor, helpers, values)
+from maple import (doctor, helpers, sap, values)
 from maple.error import messenger
 from etc import colourise
 
@@ -168,35 +165,42 @@ def stat_moderator(
     return output
 
 
-def stmt_write(tokens: list, newline=True):
-    """Write a string to the screen/console
+def render_output(tokens: list, line_number: str):
+    """Render the output of a write statement by substituting variables,
+    calculating any math expressions and applying the statmods
 
     Args:
         tokens [list]: the list of tokens on the line with the write statement
             call
-        newline: if True [the default], move to the next line and if False,
-            don't move to the next line. This allows the function to serve
-            both the write and writeln statement.
+        line_number [str]: the script line number, helpful for error reporting
 
     Returns:
-        N/A
+        output: the rendered output that then gets printed
 
     Raises:
         None
     """
 
-    # Get the string to be written to the screen
-    output = tokens[2]['token_value']
+    # If the output was compiled ahead of time, try to calculate it straight
+    # from the variables
+    calculated = False
+    compiled_lines = sap.get_run().program.compiled_lines
+    if line_number in compiled_lines:
+        calculated, output = helpers.calculate_compiled(
+            compiled_lines[line_number]
+        )
 
-    # Get the line number for error reporting
-    line_number = tokens[2]['script_line_number']
+    # Otherwise, work it out from the text
+    if not calculated:
+        # Get the string to be written to the screen
+        output = tokens[2]['token_value']
 
-    # Substitute any variables in the string
-    output = helpers.substitute_values(output, line_number)
+        # Substitute any variables in the string
+        output = helpers.substitute_values(output, line_number)
 
-    # Calculate the possible output in case it was a math
-    # expression
-    output = helpers.calculate_value(output)
+        # Calculate the possible output in case it was a math
+        # expression
+        output = helpers.calculate_value(output)
 
     # Try to get the statmod
     try:
@@ -217,11 +221,95 @@ def stmt_write(tokens: list, newline=True):
             stat_mod_op, stat_mod_value, output, line_number
         )
 
-    if newline:
-        print(output)
+    # Return the output
+    return output
+
+
+def render_cached_output(tokens: list, line_number: str):
+    """Render the output of a write statement, reusing the output from the
+    last time the line was executed if none of the variables that it
+    references have changed since
+
+    Args:
+        tokens [list]: the list of tokens on the line with the write statement
+            call
+        line_number [str]: the script line number, helpful for error reporting
+
+    Returns:
+        output: the rendered output that then gets printed
+
+    Raises:
+        None
+    """
+
+    # The cache belongs to the run
+    run = sap.get_run()
+    rendered_output = run.rendered_output
+
+    # Get the versions of the variables the line references
+    versions = tuple(
+        run.variable_versions.get(name, 0)
+        for name in run.program.cacheable_lines[line_number]
+    )
+
+    # Take the line out of the cache so that it goes back in as the most
+    # recently used line
+    cached = rendered_output.pop(line_number, None)
+
+    # If the variables haven't changed, reuse the output
+    if cached is not None and cached[0] == versions:
+        run.render_cache_stats['hits'] += 1
+        output = cached[1]
+    # Otherwise, render it again
     else:
-        print(output, end='')
-    # Flush the output: https://stackoverflow.com/questions/21886233/time-
-    # sleepx-not-working-as-it-should. Doing this allows the pause statement
-    # to work as it should.
-    sys.stdout.flush()
+        run.render_cache_stats['misses'] += 1
+        output = render_output(tokens, line_number)
+
+    # Hold the output unless it is too long to be worth holding
+    if len(str(output)) <= values.RENDER_CACHE_MAX_LENGTH:
+        rendered_output[line_number] = (versions, output)
+        # Drop the least recently used line if the cache is full
+        if len(rendered_output) > run.program.render_cache_size:
+            del rendered_output[next(iter(rendered_output))]
+
+    # Return the output
+    return output
+
+
+def stmt_write(tokens: list, newline=True):
+    """Write a string to the screen/console
+
+    Args:
+        tokens [list]: the list of tokens on the line with the write statement
+            call
+        newline: if True [the default], move to the next line and if False,
+            don't move to the next line. This allows the function to serve
+            both the write and writeln statement.
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+
+    # Get the line number for error reporting
+    line_number = tokens[2]['script_line_number']
+    # Get the run the output is written for
+    run = sap.get_run()
+
+    # If the output was rendered when the script was loaded, write it as is
+    if line_number in run.program.folded_values:
+        output = run.program.folded_values[line_number]
+    # If the output can be reused while its variables don't change, check
+    # for it in the cache
+    elif line_number in run.program.cacheable_lines:
+        output = render_cached_output(tokens, line_number)
+    # Otherwise, render the output now
+    else:
+        output = render_output(tokens, line_number)
+
+    # Write the output and flush it: https://stackoverflow.com/questions/
+    # 21886233/time-sleepx-not-working-as-it-should. Doing this allows the
+    # pause statement to work as it should.
+    run.write(f'{output}\n' if newline else f'{output}')
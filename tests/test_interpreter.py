@@ -0,0 +1,727 @@
+#!/usr/bin/env python3
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+This module runs tests to verify the interpreter's engine.
+'''
+
+# Standard library imports
+import asyncio
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+
+# Insert the src/ directory to the path so that we can keep the tests out of
+# src directory.
+sys.path.insert(0, '../src/')
+
+# Language imports
+from interpreter import (  # noqa: E402
+    batch, checkpoint, cluster, daemon, engine, forkserver, pool, sandbox,
+    scheduler, stream, subinterpreters
+)
+from maple import (sap, xylem)  # noqa: E402
+from maple.error import messenger  # noqa: E402
+
+unittest.TestLoader.sortTestMethodsUsing = None
+
+SAMPLE_GET_LINES = [
+        '10 get name = "Name? "',
+        '20 writeln "Hello #name"',
+        '30 end'
+    ]
+
+SAMPLE_COUNT_LINES = [
+        '10 set count = "0"',
+        '20 set count = "#count + 1"',
+        '30 get reply = "? "',
+        '40 jump 20',
+        '50 end'
+    ]
+
+
+class TestInterpreterBatch(unittest.TestCase):
+    """This class houses tests for the interpreter's Batch module
+    """
+
+    def test_0_run_records(self):
+        # Test that each record is run with its fields as the input and no
+        # variables from the record before, in the order of the records
+        records = batch.read_records(io.StringIO(
+            '{"name": "Ada", "age": 36}\n["Grace"]\n\n"Alan"\n'
+        ))
+        output = io.StringIO()
+        exit_status = batch.run_records(
+            '\n'.join([
+                '10 get name = ""',
+                '20 writeln "Hello #name"',
+                '30 end'
+            ]),
+            'hello.hs',
+            records,
+            output=output
+        )
+        self.assertEqual(exit_status, 0)
+        self.assertEqual(
+            output.getvalue(), 'Hello Ada\nHello Grace\nHello Alan\n'
+        )
+        self.assertEqual(
+            list(batch.read_records(io.StringIO('a,"b, c"\n'), 'x.csv')),
+            [['a', 'b, c']]
+        )
+        # A script that fails to load isn't run and fails the batch
+        output = io.StringIO()
+        exit_status = batch.run_records(
+            '10 writeln "Hello #name"', 'broken.hs', [['Ada']], output=output
+        )
+        self.assertEqual(exit_status, 1)
+        self.assertIn('[Code: 5]', output.getvalue())
+
+
+class TestInterpreterCheckpoint(unittest.TestCase):
+    """This class houses tests for the interpreter's Checkpoint module
+    """
+
+    def test_0_resume(self):
+        # Test that a resumed run carries on from the last get statement it
+        # reached, with its variables, past the input it had already read
+        source = '\n'.join([
+            '10 set count = "0"',
+            '20 set count = "#count + 1"',
+            '30 get reply = ""',
+            '40 writeln "#count #reply"',
+            '50 jump 20',
+            '60 end'
+        ])
+        with tempfile.TemporaryDirectory() as directory:
+            script_name = os.path.join(directory, 'count.hs')
+            program = engine.compile_program(source, script_name)
+            run = sap.Run(
+                program, output=io.StringIO(),
+                input_stream=io.StringIO('a\nb\n')
+            )
+            run.checkpointer = checkpoint.Checkpointer(
+                script_name, source, interval=0
+            )
+            xylem.execute(run)
+            self.assertTrue(run.get_output().getvalue().startswith(
+                '1 a\n2 b\n'
+            ))
+
+            # The checkpoint is kept if the run is interrupted
+            run.diagnostics.append({'error_code': 1})
+            run.checkpointer.finish(run)
+            resumed = sap.Run(
+                program, output=io.StringIO(),
+                input_stream=io.StringIO('a\nb\nc\n')
+            )
+            checkpoint.resume(resumed, script_name, source)
+            self.assertTrue(resumed.get_output().getvalue().startswith(
+                '3 c\n'
+            ))
+
+            # A checkpoint of a different script can't be resumed
+            with contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    checkpoint.load_checkpoint(script_name, source + ' ')
+
+    def test_1_resume_pause_loop(self):
+        # Test that a script that loops on a pause forever is checkpointed
+        # at its pause and resumed from the line after it
+        class StoppingCheckpointer(checkpoint.Checkpointer):
+            # Stops the run after a number of checkpoints, as if it crashed
+            def __init__(self, script_name, contents, stop_after):
+                super().__init__(script_name, contents, interval=0)
+                self.stop_after = stop_after
+
+            def save(self, run, line_number, pause):
+                super().save(run, line_number, pause)
+                self.stop_after -= 1
+                if self.stop_after == 0:
+                    raise messenger.ScriptExit(0)
+
+        source = '\n'.join([
+            '10 set count = "0"',
+            '20 set count = "#count + 1"',
+            '30 writeln "Tick #count"',
+            '40 pause "0"',
+            '50 jump 20',
+            '60 end'
+        ])
+        with tempfile.TemporaryDirectory() as directory:
+            script_name = os.path.join(directory, 'tick.hs')
+            program = engine.compile_program(source, script_name)
+            run = sap.Run(program, output=io.StringIO())
+            run.checkpointer = StoppingCheckpointer(script_name, source, 3)
+            xylem.execute(run)
+            self.assertEqual(
+                run.get_output().getvalue(), 'Tick 1\nTick 2\nTick 3\n'
+            )
+            resumed = sap.Run(program, output=io.StringIO())
+            resumed.checkpointer = StoppingCheckpointer(
+                script_name, source, 3
+            )
+            checkpoint.resume(resumed, script_name, source)
+        self.assertEqual(
+            resumed.get_output().getvalue(), 'Tick 4\nTick 5\n'
+        )
+        self.assertEqual(resumed.variables['count'], 5)
+
+
+class TestInterpreterCluster(unittest.TestCase):
+    """This class houses tests for the interpreter's Cluster module
+    """
+
+    def test_0_coordinator(self):
+        # Test that a worker with nothing left steals from the back of
+        # another worker's batch and that a lost worker's scripts are handed
+        # out again
+        class Writer:
+            def __init__(self):
+                self.messages = []
+
+            def write(self, data):
+                self.messages.append(
+                    (data[:1], json.loads(data[1 + daemon.LENGTH_BYTES:]))
+                )
+
+        with tempfile.TemporaryDirectory() as directory:
+            script_names = []
+            for number in range(6):
+                script_names.append(os.path.join(directory, f'{number}.hs'))
+                with open(script_names[-1], 'w') as script:
+                    script.write('10 writeln "Hi"\n20 end')
+            coordinator = cluster.Coordinator(
+                script_names, batch=4, show_output=False
+            )
+            coordinator.finished = asyncio.Event()
+            first = cluster.WorkerState('first', Writer())
+            second = cluster.WorkerState('second', Writer())
+            coordinator.workers = [first, second]
+            coordinator.assign(first)
+            coordinator.assign(second)
+            self.assertEqual(list(first.outstanding), [0, 1, 2, 3])
+            self.assertEqual(list(second.outstanding), [4, 5])
+
+            # The second worker finishes its batch and steals script 3
+            summary = pool.run_script(script_names[4])
+            for job_id in (4, 5):
+                coordinator.complete(
+                    second, {'job': job_id, 'summary': dict(summary)}
+                )
+            self.assertEqual(first.writer.messages[-1], (b'c', [3]))
+            self.assertEqual(list(second.outstanding), [3])
+
+            # The first worker is lost while running script 0
+            coordinator.workers.remove(first)
+            coordinator.requeue(first)
+            self.assertEqual(list(coordinator.pending), [0, 1, 2])
+            self.assertEqual(coordinator.jobs[0].attempts, 1)
+            self.assertEqual(coordinator.retried, 1)
+
+
+class TestInterpreterDaemon(unittest.TestCase):
+    """This class houses tests for the interpreter's Daemon module
+    """
+
+    def test_0_run_script(self):
+        # Test that a client gets the output of a script and is asked for its
+        # input
+        async def run_client(socket_path, script_name):
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            daemon.send(writer, b's', f'10\n{script_name}')
+            messages = []
+            while True:
+                kind, text = await daemon.receive(reader)
+                messages.append((kind, text))
+                if kind == b'i':
+                    daemon.send(writer, b'l', 'World\n')
+                if kind == b'x':
+                    writer.close()
+                    return messages
+
+        async def serve_client(socket_path, script_name):
+            server = await asyncio.start_unix_server(
+                daemon.Daemon(10).handle_client, path=socket_path
+            )
+            async with server:
+                return await run_client(socket_path, script_name)
+
+        with tempfile.TemporaryDirectory() as directory:
+            script_name = os.path.join(directory, 'hello.hs')
+            with open(script_name, 'w') as script:
+                script.write('\n'.join(SAMPLE_GET_LINES))
+            messages = asyncio.run(serve_client(
+                os.path.join(directory, 'daemon.sock'), script_name
+            ))
+        self.assertEqual(messages, [
+            (b'o', 'Name? '),
+            (b'i', ''),
+            (b'o', 'Hello World\n'),
+            (b'x', '0')
+        ])
+
+    def test_1_worker(self):
+        # Test that a worker process runs the script of each client it is
+        # handed and that only the user can connect to the daemon's socket
+        async def run_client(client_end, script_name):
+            reader, writer = await asyncio.open_unix_connection(
+                sock=client_end
+            )
+            daemon.send(writer, b's', f'10\n{script_name}')
+            messages = []
+            while True:
+                kind, text = await daemon.receive(reader)
+                messages.append((kind, text))
+                if kind == b'i':
+                    daemon.send(writer, b'l', 'World\n')
+                if kind == b'x':
+                    writer.close()
+                    return messages
+
+        async def serve_clients(worker, script_name):
+            results = []
+            for _ in range(2):
+                client_end, daemon_end = socket.socketpair()
+                results.append(await asyncio.gather(
+                    worker.serve(daemon_end),
+                    run_client(client_end, script_name)
+                ))
+            return results
+
+        with tempfile.TemporaryDirectory() as directory:
+            script_name = os.path.join(directory, 'hello.hs')
+            with open(script_name, 'w') as script:
+                script.write('\n'.join(SAMPLE_GET_LINES))
+            worker = daemon.Worker(10)
+            try:
+                results = asyncio.run(serve_clients(worker, script_name))
+            finally:
+                worker.stop()
+            socket_path = os.path.join(directory, 'daemon.sock')
+            with daemon.open_listener(socket_path):
+                mode = os.stat(socket_path).st_mode & 0o777
+        for ready, messages in results:
+            self.assertTrue(ready)
+            self.assertEqual(messages[-2:], [
+                (b'o', 'Hello World\n'),
+                (b'x', '0')
+            ])
+        self.assertEqual(mode, 0o600)
+
+
+class TestInterpreterEngine(unittest.TestCase):
+    """This class houses tests for the interpreter's Engine module
+    """
+
+    def test_0_run_program(self):
+        # Test that a program can be run many times, each with its own input
+        # and output
+        program = engine.compile_program('\n'.join(SAMPLE_GET_LINES))
+        output = io.StringIO()
+        result = engine.run_program(program, inputs=['World'], output=output)
+        self.assertEqual(result.exit_status, 0)
+        self.assertEqual(result.output, 'Name? Hello World\n')
+        self.assertEqual(output.getvalue(), result.output)
+        self.assertEqual(result.variables['name'], 'World')
+        result = engine.run_program(program, inputs='Maple\n')
+        self.assertEqual(result.output, 'Name? Hello Maple\n')
+        self.assertEqual(result.diagnostics, ())
+
+    def test_1_diagnostics(self):
+        # Test that errors are handed back rather than exiting, with an exit
+        # status that says the run failed
+        program = engine.compile_program('\n'.join(SAMPLE_GET_LINES))
+        result = engine.run_program(program)
+        self.assertEqual(result.exit_status, 1)
+        self.assertEqual(
+            [diagnostic['error_code'] for diagnostic in result.diagnostics],
+            [28]
+        )
+        # A loop of jumps is stopped rather than spinning forever
+        result = engine.run_program(
+            engine.load_program('10 jump 10\n20 end', check_cycles=False)
+        )
+        self.assertEqual(result.exit_status, 1)
+        self.assertEqual(result.diagnostics[-1]['error_code'], 22)
+        with self.assertRaises(engine.LoadError) as load_error:
+            engine.compile_program('10 writeln "Hello World"')
+        self.assertEqual(
+            load_error.exception.diagnostics[0]['error_code'], 5
+        )
+        # A loop with no way out is refused before anything is written,
+        # while a loop that pauses is only warned about
+        with self.assertRaises(engine.LoadError) as load_error:
+            engine.compile_program('10 writeln "x"\n20 jump 10\n30 end')
+        self.assertEqual(
+            [diagnostic['error_code']
+             for diagnostic in load_error.exception.diagnostics],
+            [27]
+        )
+        self.assertNotIn('x\n', load_error.exception.output)
+        program = engine.compile_program('10 pause "0"\n20 jump 10\n30 end')
+        self.assertEqual(
+            [diagnostic['error_code'] for diagnostic in program.diagnostics],
+            [27]
+        )
+
+    def test_2_run_program_async(self):
+        # Test that programs run on an event loop behave like they do when
+        # run on their own, all at the same time
+        program = engine.compile_program('\n'.join(
+            SAMPLE_GET_LINES[:1] + ['15 pause "0"'] + SAMPLE_GET_LINES[1:]
+        ))
+
+        async def run_programs():
+            return await asyncio.gather(*(
+                engine.run_program_async(program, inputs=[f'Run {number}'])
+                for number in range(10)
+            ))
+
+        results = asyncio.run(run_programs())
+        for number, result in enumerate(results):
+            self.assertEqual(
+                result.output,
+                engine.run_program(program, inputs=[f'Run {number}']).output
+            )
+
+    def test_3_run_program_async_timeout(self):
+        # Test that a run that takes too long is stopped with the same exit
+        # status as a run with any other error
+        program = engine.compile_program('10 pause "60"\n20 end')
+        result = asyncio.run(
+            engine.run_program_async(program, timeout=0.01)
+        )
+        self.assertEqual(result.exit_status, 1)
+        self.assertEqual(result.diagnostics[0]['error_code'], 29)
+        program = engine.compile_program('\n'.join(SAMPLE_GET_LINES))
+        result = asyncio.run(engine.run_program_async(program, timeout=5))
+        self.assertEqual(result.exit_status, 1)
+        self.assertEqual(result.diagnostics[0]['error_code'], 28)
+
+
+class TestInterpreterForkserver(unittest.TestCase):
+    """This class houses tests for the interpreter's Forkserver module
+    """
+
+    def test_0_run_child(self):
+        # Test that a child sends the output of a script and its exit status
+        # to the client
+        handlers = (
+            signal.getsignal(signal.SIGINT), signal.getsignal(signal.SIGTERM)
+        )
+        child_end, client_end = socket.socketpair()
+        try:
+            exit_status = forkserver.run_child(
+                child_end,
+                engine.compile_program('10 writeln "Hi"\n20 end'),
+                '',
+                10
+            )
+            messages = [forkserver.receive(client_end) for _ in range(2)]
+        finally:
+            client_end.close()
+            signal.signal(signal.SIGINT, handlers[0])
+            signal.signal(signal.SIGTERM, handlers[1])
+        self.assertEqual(exit_status, 0)
+        self.assertEqual(messages, [(b'o', 'Hi\n'), (b'x', '0')])
+
+    def test_1_idle_client(self):
+        # Test that a client that never sends its script doesn't hold up a
+        # client that does
+        with tempfile.TemporaryDirectory() as directory:
+            script_name = os.path.join(directory, 'hello.hs')
+            with open(script_name, 'w') as script:
+                script.write('10 writeln "Hi"\n20 end')
+            socket_path = os.path.join(directory, 'fork.sock')
+            pid = os.fork()
+            if pid == 0:
+                exit_status = 1
+                try:
+                    devnull = os.open(os.devnull, os.O_WRONLY)
+                    os.dup2(devnull, sys.stdout.fileno())
+                    exit_status = forkserver.serve(socket_path, 2)
+                finally:
+                    os._exit(exit_status)
+            idle = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                while True:
+                    try:
+                        idle.connect(socket_path)
+                        break
+                    except (FileNotFoundError, ConnectionRefusedError):
+                        threading.Event().wait(0.05)
+                # The server waits 10 seconds for the idle client's script
+                client.settimeout(5)
+                client.connect(socket_path)
+                client.sendall(daemon.encode_message(
+                    b's', f'10\n{script_name}'
+                ))
+                messages = [forkserver.receive(client) for _ in range(2)]
+            finally:
+                idle.close()
+                client.close()
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+        self.assertEqual(messages, [(b'o', 'Hi\n'), (b'x', '0')])
+
+
+class TestInterpreterPool(unittest.TestCase):
+    """This class houses tests for the interpreter's Pool module
+    """
+
+    def test_0_run_script(self):
+        # Test that a worker keeps the output of a script along with how it
+        # went, including a script that can't be loaded
+        with tempfile.TemporaryDirectory() as directory:
+            hello = os.path.join(directory, 'hello.hs')
+            with open(hello, 'w') as script:
+                script.write('10 writeln "Hi"\n20 end')
+            broken = os.path.join(directory, 'broken.hs')
+            with open(broken, 'w') as script:
+                script.write('10 writeln "Hi"')
+            summary = pool.run_script(hello)
+            self.assertEqual(summary['output'], 'Hi\n')
+            self.assertEqual(summary['errors'], 0)
+            summary = pool.run_script(broken)
+            self.assertEqual(summary['exit_status'], 1)
+            self.assertEqual(summary['errors'], 1)
+            self.assertIn('Code:', summary['output'])
+
+    def test_1_run_scripts(self):
+        # Test that a script passed more than once is summarised each time
+        # and that a failing script fails the whole run
+        with tempfile.TemporaryDirectory() as directory:
+            hello = os.path.join(directory, 'hello.hs')
+            with open(hello, 'w') as script:
+                script.write('10 writeln "Hi"\n20 end')
+            broken = os.path.join(directory, 'broken.hs')
+            with open(broken, 'w') as script:
+                script.write('10 writeln "Hi"')
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                exit_status = pool.run_scripts([hello, hello, broken], 2)
+        self.assertEqual(exit_status, 1)
+        summary = output.getvalue().split(':: SUMMARY')[1]
+        self.assertEqual(summary.count('hello.hs'), 2)
+        self.assertIn('broken.hs  exit 1', summary)
+
+
+class TestInterpreterSandbox(unittest.TestCase):
+    """This class houses tests for the interpreter's Sandbox module
+    """
+
+    def test_0_limits(self):
+        # Test that each limit stops the script with its own error code and
+        # that a script within its limits runs as usual
+        source = '\n'.join(SAMPLE_COUNT_LINES)
+        summary = sandbox.run_sandboxed(
+            source, inputs=['y'] * 1000, limits=sandbox.Limits(statements=50)
+        )
+        self.assertEqual(summary['limit'], 'statements')
+        self.assertIn('Code: 30', summary['output'])
+        summary = sandbox.run_sandboxed(
+            source, inputs=['y'] * 1000, limits=sandbox.Limits(output=20)
+        )
+        self.assertEqual(summary['limit'], 'output')
+        self.assertTrue(summary['output'].startswith('? ' * 10))
+        self.assertFalse(summary['output'].startswith('? ' * 11))
+        self.assertIn('Code: 35', summary['output'])
+        summary = sandbox.run_sandboxed(
+            '10 pause "5"\n20 end', limits=sandbox.Limits(timeout=0.2)
+        )
+        self.assertEqual(summary['limit'], 'timeout')
+        self.assertIn('Code: 29', summary['output'])
+        summary = sandbox.run_sandboxed(
+            '\n'.join(SAMPLE_GET_LINES), inputs=['World']
+        )
+        self.assertIsNone(summary['limit'])
+        self.assertEqual(summary['output'], 'Name? Hello World\n')
+
+    def test_1_no_eval(self):
+        # Test that a sandboxed calculation can't import modules, open files
+        # or reach them through the attributes of an object, so the
+        # expression is kept as it is, while arithmetic is still calculated
+        summary = sandbox.run_sandboxed(
+            '10 set x = "__import__(\'os\').getpid()"\n' +
+            '20 set y = "open(\'/etc/hostname\').read()"\n' +
+            '30 set z = "().__class__.__base__.__subclasses__()"\n' +
+            '40 set n = "6 * 7"\n' +
+            '50 writeln "#x"\n60 writeln "#y"\n70 writeln "#z"\n' +
+            '80 writeln "#n"\n90 end'
+        )
+        self.assertEqual(
+            summary['output'],
+            "__import__('os').getpid()\nopen('/etc/hostname').read()\n" +
+            '().__class__.__base__.__subclasses__()\n42\n'
+        )
+        # Nor can it climb out through the frames of a generator
+        with tempfile.TemporaryDirectory() as directory:
+            escaped = os.path.join(directory, 'escaped')
+            payload = '(lambda: [g := (g.gi_frame.f_back.f_back.f_back.' + \
+                "f_builtins for _ in [1]), g.send(None)][1])()['_'+" + \
+                f"'_import_'+'_']('os').system('touch {escaped}')"
+            summary = sandbox.run_sandboxed(f'10 writeln "{payload}"\n20 end')
+            self.assertFalse(os.path.exists(escaped))
+        self.assertEqual(summary['output'], f'{payload}\n')
+
+
+class TestInterpreterScheduler(unittest.TestCase):
+    """This class houses tests for the interpreter's Scheduler module
+    """
+
+    def test_0_take_turns(self):
+        # Test that runs take turns by priority and that a run that never
+        # finishes doesn't hold up the others
+        program = engine.compile_program('\n'.join(SAMPLE_COUNT_LINES))
+        runs = scheduler.Scheduler(quantum=10)
+        first = runs.add(program, inputs=['1'] * 1000)
+        second = runs.add(program, inputs=['1'] * 1000, priority=2)
+        hello = runs.add(engine.compile_program('10 writeln "Hi"\n20 end'))
+        runs.step()
+        accounting = runs.get_accounting()
+        self.assertEqual(accounting[first]['statements_executed'], 10)
+        self.assertEqual(accounting[second]['statements_executed'], 20)
+        self.assertTrue(accounting[hello]['finished'])
+
+    def test_1_stop_runs(self):
+        # Test that runs can be killed or stopped at their statement limit
+        program = engine.compile_program('\n'.join(SAMPLE_COUNT_LINES))
+        runs = scheduler.Scheduler(quantum=10)
+        killed = runs.add(program, inputs=['1'] * 1000)
+        limited = runs.add(program, inputs=['1'] * 1000, statement_limit=50)
+        runs.step()
+        runs.kill(killed)
+        results = runs.run()
+        for run_id in (killed, limited):
+            self.assertEqual(results[run_id].exit_status, 1)
+            self.assertEqual(results[run_id].diagnostics[0]['error_code'], 30)
+        # The limit is checked after each slice
+        self.assertLessEqual(
+            runs.get_accounting()[limited]['statements_executed'], 60
+        )
+
+    def test_2_wait_for_input(self):
+        # Test that a run waiting for its input doesn't hold up the others
+        read_end, write_end = os.pipe()
+        with open(read_end, 'r') as reader, open(write_end, 'w') as writer:
+            runs = scheduler.Scheduler(quantum=10)
+            waiting = runs.add(
+                engine.compile_program('\n'.join(SAMPLE_GET_LINES)),
+                inputs=reader
+            )
+            hello = runs.add(engine.compile_program('10 writeln "Hi"\n20 end'))
+            runs.step()
+            runs.step()
+            self.assertTrue(runs.get_accounting()[hello]['finished'])
+            self.assertFalse(runs.get_accounting()[waiting]['finished'])
+            writer.write('World\n')
+            writer.flush()
+            results = runs.run()
+        self.assertEqual(results[waiting].output, 'Name? Hello World\n')
+        self.assertEqual(results[waiting].exit_status, 0)
+
+    def test_3_jump_loop(self):
+        # Test that jumps count toward a run's turn and its statement limit,
+        # so a loop that is mostly (or only) jumps doesn't hold up the others
+        runs = scheduler.Scheduler(quantum=10)
+        looping = runs.add(
+            engine.load_program(
+                '10 writeln "x"\n20 jump 10\n30 end', check_cycles=False
+            ),
+            statement_limit=1000
+        )
+        jumping = runs.add(
+            engine.load_program('10 jump 10\n20 end', check_cycles=False),
+            statement_limit=1000
+        )
+        hello = runs.add(engine.compile_program('10 writeln "Hi"\n20 end'))
+        runs.step()
+        accounting = runs.get_accounting()
+        self.assertEqual(accounting[looping]['statements_executed'], 10)
+        self.assertFalse(accounting[looping]['finished'])
+        self.assertTrue(accounting[hello]['finished'])
+        results = runs.run()
+        for run_id in (looping, jumping):
+            self.assertEqual(results[run_id].exit_status, 1)
+
+
+class TestInterpreterStream(unittest.TestCase):
+    """This class houses tests for the interpreter's Stream module
+    """
+
+    def test_0_execute_stream(self):
+        # Test that a script starts executing before the rest of it arrives
+        # and that a jump forward waits for its line
+        read_end, write_end = os.pipe()
+        with open(read_end, 'r') as reader, open(write_end, 'w') as writer:
+            run = sap.Run(
+                engine.compile_program('10 end'), output=io.StringIO()
+            )
+            thread = threading.Thread(
+                target=stream.execute_stream,
+                args=(run, stream.StreamedScript(reader))
+            )
+            writer.write('10 writeln "First"\n20 jump 40\n')
+            writer.flush()
+            thread.start()
+            for _ in range(500):
+                if run.get_output().getvalue():
+                    break
+                thread.join(0.01)
+            self.assertEqual(run.get_output().getvalue(), 'First\n')
+            writer.write('30 writeln "Skipped"\n40 writeln "Last"\n50 end\n')
+            writer.close()
+            thread.join()
+        self.assertEqual(run.exit_status, 0)
+        self.assertEqual(run.get_output().getvalue(), 'First\nLast\n')
+
+
+class TestInterpreterSubinterpreters(unittest.TestCase):
+    """This class houses tests for the interpreter's Subinterpreters module
+    """
+
+    def test_0_submit(self):
+        # Test that a script is run in a sub-interpreter and that errors are
+        # handed back
+        with tempfile.TemporaryDirectory() as directory:
+            hello = os.path.join(directory, 'hello.hs')
+            with open(hello, 'w') as script:
+                script.write('10 writeln "Hi"\n20 end')
+            with subinterpreters.SubinterpreterPool(1) as executor:
+                summary = executor.submit(pool.run_script, hello).result()
+                failed = executor.submit(engine.open_inputs, 1)
+                with self.assertRaises(subinterpreters.SubinterpreterError):
+                    failed.result()
+        self.assertEqual(summary['output'], 'Hi\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,7 +25,10 @@ This module runs tests to verify Maple's parsing.
 '''
 
 # Standard library imports
+import contextlib
+import io
 import sys
+import tempfile
 import unittest
 
 # Insert the src/ directory to the path so that we can keep the tests out of
@@ -33,7 +36,11 @@ import unittest
 sys.path.insert(0, '../src/')
 
 # Language imports
-from maple import (arborist, helpers, planter, values)  # noqa: E402
+from etc import global_values  # noqa: E402
+from maple import (  # noqa: E402
+    arborist, cambium, helpers, phloem, planter, sap, seed, seedbank, tree,
+    values, xylem
+)
 
 unittest.TestLoader.sortTestMethodsUsing = None
 
@@ -43,6 +50,43 @@ SAMPLE_LINES = [
         '30 end'
     ]
 
+SAMPLE_LOOP_LINES = [
+        '10 set count = "1"',
+        '20 writeln "Count: #count"',
+        '30 jump 60',
+        '40 writeln "Never written"',
+        '50 end',
+        '60 set count = "#count + 1"',
+        '70 jump 20',
+        '80 end'
+    ]
+
+
+def plant(lines_of_code: list) -> dict:
+    # Plant a fresh token tree for the lines of code, leaving the TOKEN_LIST
+    # empty afterwards so that other tests start from a clean slate
+    tree.set_tokens([])
+    planter.build_tokens(lines_of_code)
+    token_tree = planter.build_tree()
+    tree.set_tokens([])
+    return token_tree
+
+
+def run_hoisted(lines_of_code: list, inputs: str, hoist: bool) -> tuple:
+    # Plant the lines and run them with their input, hoisting invariants out
+    # of their loops or not, and hand back what was hoisted and the output
+    plant(lines_of_code)
+    cambium.fold_constants()
+    hoisted_lines = cambium.hoist_invariants() if hoist else {}
+    cambium.resolve_jumps()
+    run = sap.Run(
+        seed.Program.from_tree(),
+        output=io.StringIO(),
+        input_stream=io.StringIO(inputs)
+    )
+    xylem.execute(run)
+    return hoisted_lines, run.output.getvalue()
+
 
 class TestMapleArborist(unittest.TestCase):
     """This class houses tests for the Maple parser's Arborist module
@@ -99,6 +143,254 @@ class TestMapleArborist(unittest.TestCase):
             'Comments have not been pruned'
         )
 
+    def test_6_find_unreachable_lines(self):
+        # Test that lines after an end and a jump are found as unreachable
+        self.assertEqual(
+            arborist.find_unreachable_lines(plant(SAMPLE_LOOP_LINES)),
+            [['40', '50'], ['80']],
+            'Unreachable lines have not been found'
+        )
+
+
+class TestMapleCambium(unittest.TestCase):
+    """This class houses tests for the Maple parser's Cambium module
+    """
+
+    def test_0_fold_calculation(self):
+        # Test that only safe expressions are calculated at load time
+        self.assertEqual(cambium.fold_calculation('"2+3"'), (True, 5))
+        self.assertEqual(
+            cambium.fold_calculation('"Hello World"'), (True, 'Hello World')
+        )
+        self.assertEqual(
+            cambium.fold_calculation('"print(1)"'), (False, None)
+        )
+        self.assertEqual(cambium.fold_calculation('"1/0"'), (False, None))
+
+    def test_1_fold_constants(self):
+        # Test that constants are propagated through set chains and into
+        # write statements, statmods included
+        token_tree = plant([
+            '10 set a = "2"',
+            '20 set b = "#a * 3"',
+            '30 writeln "b equals #b" -> "upper"',
+            '40 get a = "Value? "',
+            '50 writeln "#a"',
+            '60 end'
+        ])
+        self.assertEqual(
+            cambium.fold_constants(token_tree),
+            {'10': 2, '20': 6, '30': 'B EQUALS 6'},
+            'Constants have not been folded'
+        )
+
+    def test_2_fold_loop(self):
+        # Test that a variable changed in a loop is not treated as constant
+        token_tree = plant(SAMPLE_LOOP_LINES)
+        self.assertEqual(
+            cambium.fold_constants(token_tree),
+            {'10': 1},
+            'A loop variable has been folded'
+        )
+
+    def test_3_hoist_invariants(self):
+        # Test that only the set statements that don't change from one pass
+        # of a loop to the next are hoisted out of it
+        token_tree = plant([
+            '10 set count = "0"',
+            '20 set limit = "3 * 10"',
+            '30 set count = "#count + 1"',
+            '40 get name = "Name? "',
+            '50 set greeting = "Hello #name"',
+            '60 writeln "#greeting #count of #limit"',
+            '70 jump 20',
+            '80 end'
+        ])
+        cambium.fold_constants(token_tree)
+        self.assertEqual(
+            cambium.hoist_invariants(token_tree),
+            {'70': ['20']},
+            'The wrong lines have been hoisted'
+        )
+
+    def test_4_eliminate_dead_stores(self):
+        # Test that set statements overwritten before they are read are
+        # removed, but not those whose value could be read by a get
+        token_tree = plant([
+            '10 set a = "1"',
+            '20 set a = "2"',
+            '30 writeln "#a"',
+            '40 set b = "3"',
+            '50 get c = "Value? "',
+            '60 set d = "4"',
+            '70 end'
+        ])
+        cambium.fold_constants(token_tree)
+        self.assertEqual(
+            cambium.eliminate_dead_stores(token_tree),
+            {'10': '10 set a = "1"', '60': '60 set d = "4"'},
+            'The wrong set statements have been eliminated'
+        )
+        self.assertNotIn('10', token_tree, 'A dead store was not removed')
+
+    def test_5_resolve_jumps(self):
+        # Test that jumps are resolved to positions in the tree and that a
+        # chain of jumps is threaded through to where it ends up
+        token_tree = plant([
+            '10 jump 30',
+            '20 writeln "Skipped"',
+            '30 jump 50',
+            '40 writeln "Landed"',
+            '50 end'
+        ])
+        self.assertEqual(
+            cambium.resolve_jumps(token_tree),
+            {'10': (4, ()), '30': (4, ())},
+            'The jumps have not been resolved properly'
+        )
+        # A jump that only leads round a cycle of jumps isn't resolved
+        token_tree = plant([
+            '10 jump 10',
+            '20 jump 40',
+            '30 writeln "Skipped"',
+            '40 jump 20',
+            '50 end'
+        ])
+        self.assertEqual(
+            cambium.resolve_jumps(token_tree),
+            {},
+            'A cycle of jumps has been resolved'
+        )
+
+    def test_6_find_cacheable_writes(self):
+        # Test that only write statements that can't have side effects or
+        # warnings are cached
+        token_tree = plant([
+            '10 get name = "Name? "',
+            '20 writeln "Hello #name"',
+            '30 writeln "print(#name)"',
+            '40 writeln "#name" -> "red|upper"',
+            '50 end'
+        ])
+        cambium.fold_constants(token_tree)
+        self.assertEqual(
+            cambium.find_cacheable_writes(token_tree),
+            {'20': ('name',)},
+            'The wrong write statements are cacheable'
+        )
+
+    def test_7_compile_arithmetic(self):
+        # Test that only arithmetic on variables is compiled
+        self.assertEqual(
+            cambium.compile_arithmetic('"#total + #n * 2"')[1],
+            ('total', 'n'),
+            'The arithmetic has not been compiled'
+        )
+        self.assertIsNone(
+            cambium.compile_arithmetic('"2#n"'),
+            'A variable written straight after a number was compiled'
+        )
+        self.assertIsNone(
+            cambium.compile_arithmetic('"Hello #name"'),
+            'Text was compiled'
+        )
+
+    def test_8_hoist_multiple_entries(self):
+        # Test that nothing is hoisted out of a loop that can be entered
+        # other than through its header, even if that way in is never taken
+        lines_of_code = [
+            '10 jump 40',
+            '20 writeln "Never written"',
+            '30 jump 60',
+            '40 set limit = "3 * 10"',
+            '50 get name = "Name? "',
+            '60 writeln "Hello #name, the limit is #limit"',
+            '70 jump 40',
+            '80 end'
+        ]
+        hoisted_lines, output = run_hoisted(lines_of_code, 'a\nb\n', True)
+        self.assertEqual(hoisted_lines, {}, 'A line has been hoisted')
+        self.assertEqual(
+            output,
+            run_hoisted(lines_of_code, 'a\nb\n', False)[1],
+            'Hoisting has changed the output'
+        )
+
+    def test_9_hoist_changing_read(self):
+        # Test that a set statement that reads a variable changed in the loop
+        # isn't hoisted, while the constant that changes it is
+        lines_of_code = [
+            '10 set step = "2"',
+            '20 set total = "#step * 10"',
+            '30 get name = "Name? "',
+            '40 writeln "#name #total"',
+            '50 set step = "3"',
+            '60 jump 20',
+            '70 end'
+        ]
+        hoisted_lines, output = run_hoisted(lines_of_code, 'a\nb\n', True)
+        self.assertEqual(
+            hoisted_lines, {'60': ['50']}, 'The wrong lines have been hoisted'
+        )
+        self.assertIn('a 20\n', output)
+        self.assertIn('b 30\n', output)
+        self.assertEqual(
+            output,
+            run_hoisted(lines_of_code, 'a\nb\n', False)[1],
+            'Hoisting has changed the output'
+        )
+
+    def test_10_hoist_jump_into_loop(self):
+        # Test that nothing is hoisted out of a loop that is first entered by
+        # a jump into its body, which would skip the header's first pass
+        lines_of_code = [
+            '10 jump 40',
+            '20 set limit = "3 * 10"',
+            '30 writeln "Limit #limit"',
+            '40 get name = "Name? "',
+            '50 writeln "Hello #name"',
+            '60 jump 20',
+            '70 end'
+        ]
+        hoisted_lines, output = run_hoisted(lines_of_code, 'a\nb\n', True)
+        self.assertEqual(hoisted_lines, {}, 'A line has been hoisted')
+        self.assertIn('Limit 30\n', output)
+        self.assertEqual(
+            output,
+            run_hoisted(lines_of_code, 'a\nb\n', False)[1],
+            'Hoisting has changed the output'
+        )
+
+    def test_11_apply_profile(self):
+        # Test that a hot line is compiled but that a profile whose counts
+        # aren't whole numbers is warned about rather than used
+        lines_of_code = [
+            '10 get n = "? "',
+            '20 set total = "#n * 2"',
+            '30 end'
+        ]
+        plant(lines_of_code)
+        self.assertIn(
+            '20',
+            cambium.apply_profile({'line_counts': {'20': 100}}),
+            'The hot line has not been compiled'
+        )
+        plant(lines_of_code)
+        loader = sap.Run(None, output=io.StringIO())
+        token = sap.CURRENT_RUN.set(loader)
+        try:
+            compiled_lines = cambium.apply_profile(
+                {'line_counts': {'20': 'lots'}}
+            )
+        finally:
+            sap.CURRENT_RUN.reset(token)
+        self.assertEqual(compiled_lines, {}, 'A bad profile has been used')
+        self.assertEqual(
+            [diagnostic['error_code'] for diagnostic in loader.diagnostics],
+            [37],
+            'The bad profile has not been warned about'
+        )
+
 
 class TestMapleHelpers(unittest.TestCase):
     """This class houses tests for the Maple parser's helpers module
@@ -137,6 +429,101 @@ class TestMapleHelpers(unittest.TestCase):
             line_for_parsing, valid_expression
         )
 
+    def test_2_store_variable(self):
+        # Test that a variable's version only moves on when its value changes
+        helpers.store_variable('count', 1)
+        version = values.VARIABLE_VERSIONS['count']
+        helpers.store_variable('count', 1)
+        self.assertEqual(
+            values.VARIABLE_VERSIONS['count'], version,
+            'The version changed without the value changing'
+        )
+        helpers.store_variable('count', 1.0)
+        self.assertEqual(
+            values.VARIABLE_VERSIONS['count'], version + 1,
+            'The version did not change with the value'
+        )
+
+    def test_3_calculate_compiled(self):
+        # Test that a compiled expression gives the same result as the text
+        # and is left alone for anything that isn't a number
+        compiled = cambium.compile_arithmetic('"#a - #b"')
+        values.VARIABLES['a'] = 3
+        values.VARIABLES['b'] = -2
+        self.assertEqual(
+            helpers.calculate_compiled(compiled),
+            (True, helpers.calculate_value('3 - -2'))
+        )
+        values.VARIABLES['b'] = 'two'
+        self.assertEqual(helpers.calculate_compiled(compiled), (False, None))
+
+
+class TestMaplePhloem(unittest.TestCase):
+    """This class houses tests for the Maple parser's Phloem module
+    """
+
+    def test_0_basic_blocks(self):
+        # Test that the lines are split into blocks at jumps, jump targets
+        # and end statements
+        flow_graph = phloem.build_flow_graph(plant(SAMPLE_LOOP_LINES))
+        self.assertEqual(
+            [block['lines'] for block in flow_graph['blocks']],
+            [['10'], ['20', '30'], ['40', '50'], ['60', '70'], ['80']],
+            'Lines are not split into the right blocks'
+        )
+
+    def test_1_edges(self):
+        # Test that the successors and predecessors follow the jumps
+        flow_graph = phloem.build_flow_graph(plant(SAMPLE_LOOP_LINES))
+        self.assertEqual(
+            [block['successors'] for block in flow_graph['blocks']],
+            [[1], [3], [], [1], []],
+            'Block successors are not correct'
+        )
+        self.assertEqual(
+            [block['predecessors'] for block in flow_graph['blocks']],
+            [[], [0, 3], [], [1], []],
+            'Block predecessors are not correct'
+        )
+
+    def test_2_live_variables(self):
+        # Test that a variable read around a loop is live at the end of the
+        # loop but not once the script ends
+        flow_graph = phloem.build_flow_graph(plant(SAMPLE_LOOP_LINES))
+        live_out = phloem.find_live_variables(flow_graph)
+        self.assertEqual(live_out[3], {'count'}, 'count should be live')
+        self.assertEqual(live_out[4], set(), 'Nothing is live after end')
+
+    def test_3_find_inescapable_cycles(self):
+        # Test that cycles with no end are found, including one with a
+        # pause, but not one with a get
+        token_tree = plant([
+            '10 set a = "1"',
+            '20 writeln "#a"',
+            '30 jump 20',
+            '40 get b = "? "',
+            '50 jump 40',
+            '60 pause "1"',
+            '70 jump 60',
+            '80 end'
+        ])
+        flow_graph = phloem.build_flow_graph(token_tree)
+        self.assertEqual(
+            phloem.find_inescapable_cycles(flow_graph, token_tree),
+            [['20', '30'], ['60', '70']],
+            'The wrong cycles have been found'
+        )
+
+    def test_4_dot_output(self):
+        # Test that the DOT output contains an edge for the backward jump
+        token_tree = plant(SAMPLE_LOOP_LINES)
+        flow_graph = phloem.build_flow_graph(token_tree)
+        self.assertIn(
+            'B3 -> B1;',
+            phloem.flow_graph_to_dot(flow_graph, token_tree),
+            'The DOT output is missing an edge'
+        )
+
 
 class TestMaplePlanter(unittest.TestCase):
     """This class houses tests for the Maple parser's Planter module
@@ -299,5 +686,170 @@ class TestMaplePlanter(unittest.TestCase):
         )
 
 
+class TestMapleSap(unittest.TestCase):
+    """This class houses tests for the Maple parser's Sap module
+    """
+
+    def test_0_separate_runs(self):
+        # Test that each run of a program keeps its own variables and output
+        plant([
+            '10 set sap_total = "1"',
+            '20 writeln "Total: #sap_total"',
+            '30 set sap_total = "#sap_total + 1"',
+            '40 end'
+        ])
+        program = seed.Program.from_tree('total')
+        first_run = sap.Run(program, output=io.StringIO())
+        second_run = sap.Run(program, output=io.StringIO())
+        xylem.execute(first_run)
+        xylem.execute(second_run)
+        self.assertEqual(first_run.output.getvalue(), 'Total: 1\n')
+        self.assertEqual(second_run.output.getvalue(), 'Total: 1\n')
+        self.assertEqual(first_run.variables['sap_total'], 2)
+        self.assertNotIn('sap_total', values.VARIABLES)
+
+    def test_1_end_run(self):
+        # Test that an end statement or an error ends the run and not the
+        # interpreter
+        plant([
+            '10 writeln "Before"',
+            '20 end',
+            '30 writeln "After"',
+            '40 end'
+        ])
+        run = sap.Run(seed.Program.from_tree(), output=io.StringIO())
+        self.assertEqual(xylem.execute(run), 0)
+        self.assertEqual(run.output.getvalue(), 'Before\n')
+        plant([
+            '10 jump 50',
+            '20 end'
+        ])
+        run = sap.Run(seed.Program.from_tree(), output=io.StringIO())
+        self.assertEqual(xylem.execute(run), 0)
+        self.assertIn('Code: 23', run.output.getvalue())
+
+    def test_2_filter_run(self):
+        # Test that a filter reads each line as it is without a prompt, keeps
+        # it in hs_line and stops at the end of its input
+        plant([
+            '10 get text = "Line? "',
+            '20 writeln "> #hs_line"',
+            '30 jump 10',
+            '40 end'
+        ])
+        run = sap.Run(
+            seed.Program.from_tree(),
+            output=io.StringIO(),
+            input_stream=io.StringIO('first\n1 + 2\n'),
+            filtering=True
+        )
+        self.assertEqual(xylem.execute(run), 0)
+        self.assertEqual(run.output.getvalue(), '> first\n> 1 + 2\n')
+        self.assertEqual(run.variables['text'], '1 + 2')
+
+
+class TestMapleSeed(unittest.TestCase):
+    """This class houses tests for the Maple parser's Seed module
+    """
+
+    def test_0_program_is_immutable(self):
+        # Test that a program can't be changed, even by planting another tree
+        plant(SAMPLE_LINES)
+        cambium.fold_constants()
+        program = seed.Program.from_tree('sample')
+        with self.assertRaises(AttributeError):
+            program.name = 'changed'
+        with self.assertRaises(TypeError):
+            program.folded_values['20'] = 'Changed'
+        with self.assertRaises(AttributeError):
+            program.token_tree['20'].append({})
+        plant(SAMPLE_LOOP_LINES)
+        self.assertEqual(program.line_numbers, ('10', '20', '30'))
+        self.assertEqual(program.folded_values['20'], 'Hello World')
+
+
+class TestMapleSeedbank(unittest.TestCase):
+    """This class houses tests for the Maple parser's Seedbank module
+    """
+
+    def test_0_is_deterministic_script(self):
+        # Test that scripts reading input or the time are not deterministic
+        self.assertTrue(
+            seedbank.is_deterministic_script(plant(SAMPLE_LOOP_LINES)),
+            'A script with only set and write statements is deterministic'
+        )
+        self.assertFalse(
+            seedbank.is_deterministic_script(plant([
+                '10 writeln "#hs_ac_current_time"',
+                '20 end'
+            ])),
+            'A script that reads the time is not deterministic'
+        )
+        self.assertFalse(
+            seedbank.is_deterministic_script(plant([
+                '10 get a = "? "',
+                '20 end'
+            ])),
+            'A script that gets input is not deterministic'
+        )
+
+    def test_1_store_and_replay_output(self):
+        # Test that a stored output is written back out with its exit status
+        with tempfile.TemporaryDirectory() as cache_dir:
+            default_cache_dir = global_values.OUTPUT_CACHE_DIR
+            global_values.OUTPUT_CACHE_DIR = cache_dir
+            try:
+                cache_key = seedbank.get_cache_key('10 end')
+                self.assertFalse(seedbank.replay_output(cache_key))
+                seedbank.store_output(cache_key, 'Hello World\n', 0)
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    with self.assertRaises(SystemExit) as exit_call:
+                        seedbank.replay_output(cache_key)
+            finally:
+                global_values.OUTPUT_CACHE_DIR = default_cache_dir
+        self.assertEqual(output.getvalue(), 'Hello World\n')
+        self.assertEqual(exit_call.exception.code, 0)
+
+    def test_2_snapshot(self):
+        # Test that a run started from a snapshot skips the statements before
+        # the first get statement but writes and ends up the same
+        plant([
+            '10 set seed_total = "2"',
+            '20 writeln "Total: #seed_total"',
+            '30 get seed_reply = "? "',
+            '40 writeln "#seed_reply #seed_total"',
+            '50 end'
+        ])
+        program = seed.Program.from_tree('snapshot')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            default_cache_dir = global_values.OUTPUT_CACHE_DIR
+            global_values.OUTPUT_CACHE_DIR = cache_dir
+            try:
+                cache_key = seedbank.get_cache_key('snapshot')
+                self.assertIsNone(seedbank.load_snapshot(cache_key, 'a.hs'))
+                first_run = sap.Run(
+                    program, output=io.StringIO(),
+                    input_stream=io.StringIO('Hi\n')
+                )
+                seedbank.take_snapshot(first_run, cache_key)
+                snapshot = seedbank.load_snapshot(cache_key, 'a.hs')
+                second_run = sap.Run(
+                    snapshot['program'], output=io.StringIO(),
+                    input_stream=io.StringIO('Hi\n')
+                )
+                seedbank.start_from_snapshot(second_run, snapshot)
+            finally:
+                global_values.OUTPUT_CACHE_DIR = default_cache_dir
+        self.assertEqual(snapshot['line_number'], '30')
+        self.assertEqual(first_run.output.getvalue(), 'Total: 2\n? Hi 2\n')
+        self.assertEqual(
+            second_run.output.getvalue(), first_run.output.getvalue()
+        )
+        self.assertEqual(
+            second_run.statements_executed, first_run.statements_executed
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
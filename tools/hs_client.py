@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import os
+import sys
+
+# The socket module is left out for its C half, as the rest of it (and the
+# interpreter's etc.global_values) take longer to import than the client
+# takes to run
+import _socket
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A thin client that runs a script on the daemon (see the -w flag of the
+interpreter and src/interpreter/daemon.py). It only imports what it needs to
+talk to the socket so it starts quickly, passing the output of the script on
+as it arrives and the input to the script as it is asked for. If the daemon
+isn't running, the script is run by the interpreter as usual.
+'''
+
+# Find the source of the interpreter next to the tools/ directory
+source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                          'src')
+
+# Get the system arguments
+sys_args = sys.argv[1:]
+
+# Get the options and arguments, -S and -t. This is done by hand rather than
+# with getopt as importing getopt takes longer than the rest of the client.
+opts = []
+while len(sys_args) > 1 and sys_args[0] in ('-S', '-t'):
+    opts.append((sys_args[0], sys_args[1]))
+    sys_args = sys_args[2:]
+args = sys_args
+
+# Set the default socket and the default number of seconds to wait on the
+# daemon, as DAEMON_SOCKET and DAEMON_TIMEOUT in src/etc/global_values.py
+socket_path = os.environ.get(
+    'HELASUNO_SOCKET',
+    os.path.join(
+        os.environ.get('XDG_RUNTIME_DIR', '/tmp'),
+        f'helasuno-{os.getuid()}.sock'
+    )
+)
+timeout = 300
+
+# Loop over the options
+for option in opts:
+    # Match case with the options. Here, we look at option[0] as the opts
+    # are tuples of the form (option, value).
+    match option[0]:
+        # Match the -S flag
+        case '-S':
+            socket_path = option[1]
+        # Match the -t flag
+        case '-t':
+            # Check to see if it's numeric
+            if not option[1].isnumeric() or int(option[1]) < 1:
+                # Print an error
+                print('The timeout needs to be a number that is at least 1')
+                # Abandon ship
+                sys.exit(0)
+            timeout = int(option[1])
+
+# Make sure there is a script to run
+if len(args) != 1:
+    print('Pass the script to run, eg. hs_client.py script.hs')
+    sys.exit(0)
+script_name = os.path.abspath(args[0])
+
+# Connect to the daemon, running the script as usual if it isn't running
+connection = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+try:
+    # Give the daemon a second longer than the script so that it can report
+    # a script that ran out of time
+    connection.settimeout(timeout + 1)
+    connection.connect(socket_path)
+except OSError:
+    connection.close()
+    os.execv(sys.executable, [sys.executable, source_dir, script_name])
+
+
+def send(kind: bytes, text: str):
+    """Send a message to the daemon (see src/interpreter/daemon.py)
+
+    Args:
+        kind [bytes]: the kind of message (eg. b'l' for a line of input)
+        text [str]: the text of the message
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    payload = text.encode('utf-8')
+    connection.sendall(kind + len(payload).to_bytes(4) + payload)
+
+
+# Send the script, giving the daemon the timeout it has to run it in
+send(b's', f'{timeout}\n{script_name}')
+
+
+def receive(length: int) -> bytes:
+    """Read a number of bytes from the daemon
+
+    Args:
+        length [int]: the number of bytes
+
+    Returns:
+        bytes: the bytes, fewer if the daemon has gone away
+
+    Raises:
+        TimeoutError: if the daemon goes quiet for longer than the timeout
+    """
+    received = b''
+    while len(received) < length:
+        chunk = connection.recv(length - len(received))
+        if not chunk:
+            break
+        received += chunk
+    return received
+
+
+# Pass on the output and input until the daemon sends the exit status. The
+# timeout is for the daemon going quiet, not for waiting on input.
+exit_status = 1
+try:
+    while len(header := receive(5)) == 5:
+        text = receive(int.from_bytes(header[1:])).decode('utf-8', 'replace')
+        match header[:1]:
+            # Output from the script
+            case b'o':
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            # The script is asking for a line of input
+            case b'i':
+                send(b'l', sys.stdin.readline())
+            # The script has finished
+            case b'x':
+                exit_status = int(text)
+                break
+except TimeoutError:
+    print(f'The daemon did not answer within {timeout} seconds')
+except KeyboardInterrupt:
+    print()
+finally:
+    connection.close()
+
+# Exit in the same way as the script did
+sys.exit(exit_status)
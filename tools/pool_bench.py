@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import concurrent.futures
+import getopt
+import os
+import sys
+import time
+import warnings
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A simple script to compare running a script many times over on a pool of
+worker processes (the -j flag) and on a pool of sub-interpreters (the -i
+flag), measuring how many runs each gets through a second and how much memory
+each uses once it is warmed up. Memory is read from /proc so it is only
+measured on Linux.
+'''
+
+# Find the source of the interpreter next to the tools/ directory
+source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                          'src')
+sys.path.insert(0, source_dir)
+
+# Language imports
+from interpreter import (pool, subinterpreters)  # noqa: E402
+
+# The script that is run if one isn't passed. It counts to 100, writing out
+# each number, so that each run has some work to do.
+SAMPLE_SCRIPT = '10 set count = "0"\n' + ''.join(
+    f'{line_number} set count = "#count + 1"\n' +
+    f'{line_number + 10} writeln "#count"\n'
+    for line_number in range(20, 2020, 20)
+) + '2020 end\n'
+
+# Get the system arguments
+sys_args = sys.argv[1:]
+# Set the options here, -n and -w
+short_opts = 'n:w:'
+
+# Get the options and arguments
+opts, args = getopt.getopt(sys_args, short_opts)
+
+# Set a default number of runs
+runs = 200
+# Set a default number of workers
+workers = os.cpu_count()
+
+# Loop over the options
+for option in opts:
+    # Check to see if it's numeric
+    if not option[1].isnumeric() or int(option[1]) < 1:
+        # Print an error
+        print('The number of runs and workers needs to be at least 1')
+        # Abandon ship
+        sys.exit(0)
+    # Match case with the options. Here, we look at option[0] as the opts
+    # are tuples of the form (option, value).
+    match option[0]:
+        # Match the -n flag
+        case '-n':
+            runs = int(option[1])
+        # Match the -w flag
+        case '-w':
+            workers = int(option[1])
+
+
+def get_memory(pids: list) -> int:
+    """Get the memory (resident set size) used by a number of processes
+
+    Args:
+        pids [list]: the process IDs
+
+    Returns:
+        int: the memory in kilobytes, 0 if it can't be read
+
+    Raises:
+        None
+    """
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status', 'r') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except OSError:
+            return 0
+    return total
+
+
+def bench(label: str, executor, worker_pids):
+    """Time a number of runs of the script on a pool and print out how it
+    went
+
+    Args:
+        label [str]: the name of the pool
+        executor: the pool
+        worker_pids: a function that gets the process IDs of the pool
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    with executor:
+        # Warm up each worker before timing anything
+        list(executor.map(pool.run_script, [script_name] * workers))
+
+        start_time = time.perf_counter()
+        list(executor.map(pool.run_script, [script_name] * runs))
+        run_time = time.perf_counter() - start_time
+
+        memory = get_memory([os.getpid()] + worker_pids(executor))
+
+    print(label)
+    print(f'{"Runs/s:".rjust(12)} {runs / run_time:,.1f}')
+    if memory:
+        print(f'{"Memory:".rjust(12)} {memory / 1024:,.1f} MiB')
+
+
+# Write the script to a file for the workers to open, defaulting to the
+# sample script
+if args:
+    script_name = os.path.abspath(args[0])
+    script_path = None
+else:
+    script_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        f'.pool_bench_{os.getpid()}.hs'
+    )
+    with open(script_path, 'w') as script:
+        script.write(SAMPLE_SCRIPT)
+    script_name = script_path
+
+# Calculating text like "1 is 1" warns each time it is calculated, which
+# would bury the results
+warnings.simplefilter('ignore', SyntaxWarning)
+
+print(f'Benchmarking {runs:,} runs on {workers} workers\n')
+try:
+    # The worker processes of a process pool aren't public so they are read
+    # from the pool itself
+    bench(
+        'Processes',
+        concurrent.futures.ProcessPoolExecutor(workers),
+        lambda executor: list(executor._processes)
+    )
+    print()
+    # Sub-interpreters are all within this process
+    bench(
+        'Sub-interpreters',
+        subinterpreters.SubinterpreterPool(workers),
+        lambda executor: []
+    )
+finally:
+    if script_path is not None:
+        os.remove(script_path)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+# Standard library imports
+import getopt
+import os
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+'''Copyright 2024-2025 Bryan Smith.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the “Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED “AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+-- Description --
+A simple script to measure how long it takes to run a script over and over
+again, both within one process using the engine (see interpreter/engine.py)
+and by starting the interpreter for each run.
+'''
+
+# Find the source of the interpreter next to the tools/ directory
+source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                          'src')
+sys.path.insert(0, source_dir)
+
+# Language imports
+from interpreter import engine  # noqa: E402
+
+# The script that is run if one isn't passed
+SAMPLE_SCRIPT = '10 set greeting = "Hello"\n' + \
+    '20 writeln "#greeting World"\n' + \
+    '30 end\n'
+
+# Get the system arguments
+sys_args = sys.argv[1:]
+# Set the options here, -n and -s
+short_opts = 'n:s:'
+
+# Get the options and arguments
+opts, args = getopt.getopt(sys_args, short_opts)
+
+# Set a default number of runs within the one process
+engine_runs = 10000
+# Set a default number of runs that start the interpreter
+process_runs = 20
+
+# Loop over the options
+for option in opts:
+    # Check to see if it's numeric
+    if not option[1].isnumeric() or int(option[1]) < 2:
+        # Print an error
+        print('The number of runs needs to be a number that is at least 2')
+        # Abandon ship
+        sys.exit(0)
+    # Match case with the options. Here, we look at option[0] as the opts
+    # are tuples of the form (option, value).
+    match option[0]:
+        # Match the -n flag
+        case '-n':
+            engine_runs = int(option[1])
+        # Match the -s flag
+        case '-s':
+            process_runs = int(option[1])
+
+# Get the script to run, defaulting to the sample script
+if args:
+    script_name = args[0]
+    try:
+        with open(script_name, 'r') as script:
+            source = script.read()
+    # If the file isn't found, notify the user and abandon ship
+    except FileNotFoundError:
+        print(f'{script_name} is not a valid script')
+        sys.exit(0)
+else:
+    script_name = '[sample script]'
+    source = SAMPLE_SCRIPT
+
+
+def print_times(label: str, times: list):
+    """Print out the average, median and standard deviation of a list of
+    times in microseconds
+
+    Args:
+        label [str]: what was timed
+        times [list]: the times in seconds
+
+    Returns:
+        N/A
+
+    Raises:
+        None
+    """
+    print(f'{label} ({len(times):,} runs)')
+    print(f'{"Average:".rjust(12)} {statistics.fmean(times) * 1e6:,.1f} µs')
+    print(f'{"Median:".rjust(12)} {statistics.median(times) * 1e6:,.1f} µs')
+    print(f'{"Stdev:".rjust(12)} {statistics.stdev(times) * 1e6:,.1f} µs')
+
+
+print(f'Benchmarking {script_name}\n')
+
+# Calculating text like "1 is 1" warns each time it is calculated, which
+# would bury the results when the script is run thousands of times
+warnings.simplefilter('ignore', SyntaxWarning)
+
+# Time loading the script once
+start_time = time.perf_counter()
+program = engine.compile_program(source, script_name)
+print(f'Compile: {(time.perf_counter() - start_time) * 1e6:,.1f} µs\n')
+
+# Time each run within this process. The first run is left out as it warms
+# up anything that is only done once.
+engine.run_program(program)
+engine_times = []
+for _ in range(engine_runs):
+    start_time = time.perf_counter()
+    engine.run_program(program)
+    engine_times.append(time.perf_counter() - start_time)
+print_times('In process', engine_times)
+
+# Time each run when the interpreter is started for the run. The script is
+# written to a file for the interpreter to open and the output cache is
+# turned off so that the script is executed every time.
+script_path = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), f'.run_bench_{os.getpid()}.hs'
+)
+with open(script_path, 'w') as script:
+    script.write(source)
+process_times = []
+try:
+    for _ in range(process_runs):
+        start_time = time.perf_counter()
+        subprocess.run(
+            [sys.executable, source_dir, '-n', script_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        process_times.append(time.perf_counter() - start_time)
+finally:
+    os.remove(script_path)
+print()
+print_times('New process', process_times)
+
+# Print out how much is saved by running within the process
+speed_up = statistics.median(process_times) / statistics.median(engine_times)
+print(f'\nRunning in process is {speed_up:,.0f}x faster per run')